@@ -1,37 +1,47 @@
 # app.py
 import streamlit as st
 import pandas as pd
-import joblib
 import altair as alt
-from supabase import create_client, Client
 import os
+import sys
 from dotenv import load_dotenv
 
-load_dotenv()
+# Make the project's src package importable when launched via `streamlit run app/...`
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))  # pipeline modules import utils.* directly
+from src.analytics import DashboardAggregates
+from src.config.config_loader import load_config
+from src.data_access import get_client
+from src.artifact_registry import get_artifact_registry
+from src.model_predict import get_model_pair, get_prediction_cache
+from src.utils.exceptions import PredictionError
+from src.what_if import build_scenario_grid, score_frame
 
-# Load model and preprocessor
-model = joblib.load("artifacts/model.pkl")
-preprocessor = joblib.load("artifacts/preprocessor.pkl")
+load_dotenv()
 
 # Connect to Supabase
 url = os.getenv("SUPABASE_URL")
 key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
-
-def load_all_data_from_supabase(supabase_url, supabase_key, table_name='transformed_customer_data'):
-    supabase = create_client(supabase_url, supabase_key)
-
-    all_rows = []
-    batch_size = 1000
-    offset = 0
-    while True:
-        response = supabase.table(table_name).select("*").range(offset, offset + batch_size - 1).execute()
-        data = response.data
-        if not data:
-            break
-        all_rows.extend(data)
-        offset += batch_size
-    return pd.DataFrame(all_rows)
+supabase = get_client(url, key)  # Pooled and shared across reruns/sessions
+
+@st.cache_resource
+def get_dashboard_aggregates() -> DashboardAggregates:
+    # One aggregate cache per server process, shared by every session and rerun
+    analytics_config = load_config(os.path.join("src", "config", "config.yaml")).get("analytics", {})
+    return DashboardAggregates(
+        supabase,
+        table=analytics_config.get("table", "transformed_customer_data"),
+        refresh_interval_s=analytics_config.get("refresh_interval_s", 60),
+        page_size=analytics_config.get("page_size", 1000),
+    )
+
+CATEGORY_OPTIONS = {
+    "product_category": ['electronics', 'books', 'home', 'clothing', 'beauty'],
+    "payment_method": ['credit card', 'debit card', 'upi', 'cash on delivery'],
+    "customer_segment": ['new', 'returning', 'loyal'],
+    "region": ['north', 'south', 'east', 'west'],
+}
 
 # Streamlit page config
 st.set_page_config(page_title="Customer Lifetime Value Dashboard", layout="wide")
@@ -42,7 +52,7 @@ st.markdown(
 )
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🔎 Prediction", "📊 Analytics Dashboard", "📘 About"])
+tab1, batch_tab, tab2, tab3 = st.tabs(["🔎 Prediction", "🧮 Batch What-If", "📊 Analytics Dashboard", "📘 About"])
 
 # ------------- PREDICTION TAB ----------------
 with tab1:
@@ -51,10 +61,10 @@ with tab1:
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
         purchase_amount = st.number_input("💰 Purchase Amount", value=100.0)
-        product_category = st.selectbox("📦 Product Category", ['electronics', 'books', 'home', 'clothing', 'beauty'])
-        payment_method = st.selectbox("💳 Payment Method", ['credit card', 'debit card', 'upi', 'cash on delivery'])
-        customer_segment = st.selectbox("👥 Customer Segment", ['new', 'returning', 'loyal'])
-        region = st.selectbox("🌍 Region", ['north', 'south', 'east', 'west'])
+        product_category = st.selectbox("📦 Product Category", CATEGORY_OPTIONS["product_category"])
+        payment_method = st.selectbox("💳 Payment Method", CATEGORY_OPTIONS["payment_method"])
+        customer_segment = st.selectbox("👥 Customer Segment", CATEGORY_OPTIONS["customer_segment"])
+        region = st.selectbox("🌍 Region", CATEGORY_OPTIONS["region"])
         predict_button = st.button("🚀 Predict CLV")
 
     if predict_button:
@@ -67,8 +77,19 @@ with tab1:
         }
 
         input_df = pd.DataFrame([input_data])
-        transformed = preprocessor.transform(input_df)
-        prediction = model.predict(transformed)[0]
+
+        # Loaded once per process and hot-reloaded when training writes new artifacts
+        model, preprocessor = get_model_pair()
+
+        prediction_cache = get_prediction_cache()
+        if prediction_cache is not None:
+            # Repeated feature combinations skip the forest entirely
+            prediction = prediction_cache.predict(
+                input_df, lambda X: model.predict(preprocessor.transform(X))
+            )[0]
+        else:
+            transformed = preprocessor.transform(input_df)
+            prediction = model.predict(transformed)[0]
 
         st.markdown("---")
         st.success("Prediction completed successfully!")
@@ -78,52 +99,98 @@ with tab1:
             unsafe_allow_html=True
         )
 
+# ------------- BATCH WHAT-IF TAB ----------------
+with batch_tab:
+    st.subheader("🧮 Score Many Customers at Once")
+
+    source = st.radio("Input", ["Scenario grid", "Upload CSV"], horizontal=True)
+    batch_input = None
+
+    if source == "Upload CSV":
+        uploaded = st.file_uploader(
+            "CSV with purchase_amount, product_category, payment_method, customer_segment, region", type="csv"
+        )
+        if uploaded is not None:
+            batch_input = pd.read_csv(uploaded)
+    else:
+        grid_categories = {
+            col: st.multiselect(col.replace("_", " ").title(), options, default=options)
+            for col, options in CATEGORY_OPTIONS.items()
+        }
+        amount_col1, amount_col2, amount_col3 = st.columns(3)
+        amount_min = amount_col1.number_input("Min Purchase Amount", value=10.0)
+        amount_max = amount_col2.number_input("Max Purchase Amount", value=1000.0)
+        amount_steps = amount_col3.number_input("Amount Steps", min_value=1, value=50, step=1)
+        if all(grid_categories.values()):
+            batch_input = build_scenario_grid(grid_categories, amount_min, amount_max, amount_steps)
+            st.caption(f"{len(batch_input):,} scenarios")
+
+    if batch_input is not None and st.button("🚀 Score All"):
+        try:
+            predictions, batch_stats = score_frame(batch_input, *get_model_pair())
+            # Kept in session state so the download button's rerun does not rescore
+            st.session_state["what_if_results"] = batch_input.assign(predicted_clv=predictions)
+            st.session_state["what_if_stats"] = batch_stats
+        except PredictionError as e:
+            st.error(str(e))
+
+    if "what_if_results" in st.session_state:
+        results = st.session_state["what_if_results"]
+        batch_stats = st.session_state["what_if_stats"]
+        st.success(
+            f"Scored {batch_stats['rows']:,} rows ({batch_stats['distinct_rows']:,} distinct) "
+            f"in {batch_stats['elapsed_s']:.2f}s"
+        )
+        st.dataframe(results.head(1000), use_container_width=True)
+        st.download_button(
+            "⬇️ Download Predictions (CSV)",
+            results.to_csv(index=False).encode("utf-8"),
+            file_name="clv_predictions.csv",
+            mime="text/csv",
+        )
+
 # ------------- ANALYTICS DASHBOARD TAB ----------------
 with tab2:
     st.subheader("📊 Customer Analytics")
     custom_palette = ['#87CEEB', '#1E3A8A', '#2E8B57', '#FFD700', '#FF6347']
 
-    df = load_all_data_from_supabase(url,key)
-    if not df.empty:
+    aggregates = get_dashboard_aggregates().get()
+    if aggregates:
 
         # Bar Chart: Customers by Payment Method
         st.markdown("#### 🏦 Customers by Payment Method")
         method_chart = (
-            alt.Chart(df)
+            alt.Chart(aggregates["payment_method"])
             .mark_bar(size=40)
             .encode(
-                x=alt.X("count()", title="Number of Customers"),
+                x=alt.X("count:Q", title="Number of Customers"),
                 y=alt.Y("payment_method:N", title="Payment Method", sort="-x"),
                 color=alt.Color("payment_method:N", scale=alt.Scale(range=custom_palette)),
-                tooltip=["payment_method", "count()"]
+                tooltip=["payment_method", "count"]
             )
             .properties(height=300)
         )
         st.altair_chart(method_chart, use_container_width=True)
 
-        # Line Chart: Monthly Sales (assuming `purchase_date` column exists)
-        if "invoice_date" in df.columns:
-            df["invoice_date"] = pd.to_datetime(df["invoice_date"])
-            monthly_sales = df.groupby(df["invoice_date"].dt.to_period("M"))["purchase_amount"].sum().reset_index()
-            monthly_sales["invoice_date"] = monthly_sales["invoice_date"].astype(str)
-
-            st.markdown("#### 📈 Monthly Sales Trend")
-            line_chart = (
-                alt.Chart(monthly_sales)
-                .mark_line(color="#FF6347", point=alt.OverlayMarkDef(color="#FFD700", size=60))
-                .encode(
-                    x="invoice_date:T",
-                    y="purchase_amount:Q",
-                    tooltip=["invoice_date", "purchase_amount"]
-                )
-                .properties(height=300)
+        # Line Chart: Monthly Sales
+        monthly_sales = aggregates["monthly_sales"]
+
+        st.markdown("#### 📈 Monthly Sales Trend")
+        line_chart = (
+            alt.Chart(monthly_sales)
+            .mark_line(color="#FF6347", point=alt.OverlayMarkDef(color="#FFD700", size=60))
+            .encode(
+                x="invoice_date:T",
+                y="purchase_amount:Q",
+                tooltip=["invoice_date", "purchase_amount"]
             )
-            st.altair_chart(line_chart, use_container_width=True)
+            .properties(height=300)
+        )
+        st.altair_chart(line_chart, use_container_width=True)
 
         # Pie Chart: Product Category Distribution
         st.markdown("#### 🛍️ Product Category Distribution")
-        category_counts = df["product_category"].value_counts().reset_index()
-        category_counts.columns = ["product_category", "count"]
+        category_counts = aggregates["product_category"]
         pie_chart = alt.Chart(category_counts).mark_arc(innerRadius=30).encode(
             theta="count:Q",
             color=alt.Color("product_category:N", scale=alt.Scale(range=custom_palette)),
@@ -133,8 +200,8 @@ with tab2:
 
         # Top Customer Segments
         st.markdown("#### 🧑‍🤝‍🧑 Top Customer Segments")
-        segment_chart = alt.Chart(df).mark_bar().encode(
-            x=alt.X("count()", title="Customers"),
+        segment_chart = alt.Chart(aggregates["customer_segment"]).mark_bar().encode(
+            x=alt.X("count:Q", title="Customers"),
             y=alt.Y("customer_segment:N", sort="-x"),
             color=alt.Color("customer_segment:N", scale=alt.Scale(range=custom_palette))
         )
@@ -157,3 +224,7 @@ with tab3:
     #### Created by Sujato Dutta
     Connect on [LinkedIn](https://linkedin.com/in/sujato-dutta)
     """, unsafe_allow_html=True)
+
+    with st.expander("⚙️ Loaded model artifacts"):
+        # Load time, RSS growth and content hash of each artifact in this process
+        st.json(get_artifact_registry().stats())
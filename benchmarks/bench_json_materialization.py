@@ -0,0 +1,99 @@
+# bench_json_materialization.py
+#
+# Compares pd.DataFrame(list of row dicts) against ColumnarFrameBuilder on
+# synthetic Supabase-shaped pages. Run from the project root:
+#
+#   python benchmarks/bench_json_materialization.py --rows 1000000
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_access import ColumnarFrameBuilder
+
+CATEGORY_VALUES = {
+    "product_category": ["Electronics", "Clothing", "Home", "Books", "Sports", "Beauty"],
+    "payment_method": ["Credit Card", "Debit Card", "PayPal", "Cash", "Bank Transfer"],
+    "customer_segment": ["Regular", "Premium", "VIP", "New"],
+    "region": ["North", "South", "East", "West"],
+}
+
+def make_pages(n_rows: int, page_size: int, seed: int = 42):
+    """
+    Yields the list-of-dicts pages a paginated REST read returns, one at a
+    time, so only what a strategy keeps alive counts towards its peak.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2023-01-01", periods=730).strftime("%Y-%m-%d").to_numpy()
+    for start in range(0, n_rows, page_size):
+        size = min(page_size, n_rows - start)
+        ids = np.arange(start, start + size)
+        amounts = rng.gamma(2.0, 60.0, size).round(2)
+        day = rng.integers(0, len(dates), size)
+        picks = {col: rng.integers(0, len(values), size) for col, values in CATEGORY_VALUES.items()}
+        yield [
+            {
+                "invoice_id": f"INV{ids[i]:08d}",
+                "customer_id": f"CUST{ids[i] % 50_000:06d}",
+                "invoice_date": dates[day[i]],
+                "purchase_amount": float(amounts[i]),
+                **{col: CATEGORY_VALUES[col][picks[col][i]] for col in CATEGORY_VALUES},
+            }
+            for i in range(size)
+        ]
+
+def materialize_rows(pages) -> pd.DataFrame:
+    # The previous ingestion path: one list of every row dict, then categories
+    all_data = []
+    for page in pages:
+        all_data.extend(page)
+    df = pd.DataFrame(all_data)
+    for col in CATEGORY_VALUES:
+        df[col] = df[col].astype("category")
+    return df
+
+def materialize_columnar(pages) -> pd.DataFrame:
+    builder = ColumnarFrameBuilder()
+    for page in pages:
+        builder.append(page)
+    return builder.build()
+
+def measure(fn, n_rows: int, page_size: int) -> dict:
+    """
+    Times fn over pre-generated pages, then measures its peak Python heap
+    (tracemalloc) in a second run over lazily generated pages.
+    """
+    pages = list(make_pages(n_rows, page_size))
+    start = time.perf_counter()
+    fn(pages)
+    elapsed = time.perf_counter() - start
+    del pages
+
+    tracemalloc.start()
+    df = fn(make_pages(n_rows, page_size))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "peak_mb": round(peak / 1024 ** 2, 1),
+        "frame_mb": round(float(df.memory_usage(deep=True).sum()) / 1024 ** 2, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON page to DataFrame materialization benchmark")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name, fn in [("list_of_dicts", materialize_rows), ("columnar", materialize_columnar)]:
+        print(f"{name:>14}: {measure(fn, args.rows, args.page_size)}")
+
+if __name__ == "__main__":
+    main()
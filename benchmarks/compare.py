@@ -0,0 +1,69 @@
+# compare.py
+#
+# Compares two run_benchmarks.py result files and exits non-zero when any
+# stage got slower or used more memory than the allowed tolerance:
+#
+#   python benchmarks/compare.py baseline.json current.json --tolerance 0.15
+
+import argparse
+import json
+import sys
+
+# Metrics checked for regressions: (result key, smallest absolute change that counts)
+METRICS = [("wall_s", 0.05), ("peak_rss_delta_mb", 16.0)]
+
+def load_results(path: str) -> tuple:
+    with open(path, "r") as f:
+        report = json.load(f)
+    return report, {(r["size"], r["stage"]): r for r in report["results"]}
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    :return: One row per (size, stage, metric) present in both runs, with the
+             relative change and whether it counts as a regression
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        for metric, min_delta in METRICS:
+            before, after = baseline[key].get(metric), current[key].get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before > 0 else 0.0
+            regressed = after - before > min_delta and change > tolerance
+            rows.append({
+                "size": key[0], "stage": key[1], "metric": metric,
+                "baseline": before, "current": after, "change": change, "regressed": regressed,
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative increase (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    baseline_report, baseline = load_results(args.baseline)
+    current_report, current = load_results(args.current)
+    print(f"baseline: {baseline_report.get('commit')} ({baseline_report.get('timestamp')})")
+    print(f"current:  {current_report.get('commit')} ({current_report.get('timestamp')})")
+    if baseline_report.get("environment") != current_report.get("environment"):
+        print("warning: runs come from different environments; timings may not be comparable")
+
+    rows = compare(baseline, current, args.tolerance)
+    print(f"\n{'size':>10}  {'stage':<24}{'metric':<20}{'baseline':>12}{'current':>12}{'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['size']:>10}  {row['stage']:<24}{row['metric']:<20}"
+            f"{row['baseline']:>12.3f}{row['current']:>12.3f}{row['change']:>+9.1%}{flag}"
+        )
+
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# fake_supabase.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+class FakeAPIError(Exception):
+    """
+    Error raised for requests a real PostgREST server would reject.
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+class FakeResponse:
+    def __init__(self, data: list, count: int = None):
+        self.data = data
+        self.count = count
+
+class FakeTable:
+    """
+    One in-memory table held as a DataFrame.
+
+    Upserts and inserts are buffered and merged on the next read, and sorted
+    orders are cached per column, so paging through millions of rows costs
+    roughly what a real server's index scan would rather than a full sort per
+    request.
+
+    :param unique_columns: Columns with a unique constraint. When given, an
+                           upsert on any other column fails like PostgREST's
+                           42P10; None accepts every on_conflict column.
+    """
+
+    def __init__(self, frame: pd.DataFrame = None, unique_columns=None):
+        self.frame = frame.reset_index(drop=True) if frame is not None else pd.DataFrame()
+        self.unique_columns = None if unique_columns is None else set(unique_columns)
+        self._pending = []  # (rows, upsert key or None for a plain insert)
+        self._sorted = {}
+        self.lock = threading.Lock()
+
+    def upsert(self, rows: list, key: str):
+        if key is not None and self.unique_columns is not None and key not in self.unique_columns:
+            raise FakeAPIError(
+                "42P10", "there is no unique or exclusion constraint matching the ON CONFLICT specification"
+            )
+        with self.lock:
+            self._pending.append((pd.DataFrame(rows), key))
+
+    def snapshot(self) -> pd.DataFrame:
+        with self.lock:
+            if self._pending:
+                # Consecutive writes with the same key are merged in one step
+                frame, start = self.frame, 0
+                while start < len(self._pending):
+                    key = self._pending[start][1]
+                    end = start
+                    while end < len(self._pending) and self._pending[end][1] == key:
+                        end += 1
+                    frame = pd.concat([frame, *(rows for rows, _ in self._pending[start:end])], ignore_index=True)
+                    if key is not None:
+                        frame = frame.drop_duplicates(key, keep="last")
+                    start = end
+                self.frame = frame.reset_index(drop=True)
+                self._pending = []
+                self._sorted = {}
+            return self.frame
+
+    def sorted_positions(self, column: str):
+        """
+        :return: (row positions in column order, column values in that order)
+        """
+        frame = self.snapshot()
+        with self.lock:
+            if column not in self._sorted:
+                values = frame[column].to_numpy()
+                order = np.argsort(values, kind="stable")
+                self._sorted[column] = (order, values[order])
+            return self._sorted[column]
+
+    def delete(self, keep: np.ndarray):
+        frame = self.snapshot()
+        with self.lock:
+            self.frame = frame.loc[keep].reset_index(drop=True)
+            self._sorted = {}
+
+class FakeQuery:
+    """
+    The subset of the postgrest query builder used by TableReader/TableWriter.
+    """
+
+    def __init__(self, table: FakeTable):
+        self.table = table
+        self.columns = None
+        self.count = None
+        self.filters = []
+        self.order_column = None
+        self.descending = False
+        self.bounds = None
+        self.max_rows = None
+        self.action = "select"
+        self.payload = None
+        self.upsert_key = None
+
+    def select(self, columns: str = "*", count: str = None):
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        self.count = count
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.order_column, self.descending = column, desc
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end + 1)
+        return self
+
+    def limit(self, n: int):
+        self.max_rows = n
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(("gt", column, value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(("gte", column, value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(("lt", column, value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(("lte", column, value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(("neq", column, value))
+        return self
+
+    def upsert(self, rows: list, on_conflict: str = "id"):
+        self.action, self.payload, self.upsert_key = "upsert", rows, on_conflict
+        return self
+
+    def insert(self, rows: list):
+        return self.upsert(rows, on_conflict=None)
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def execute(self) -> FakeResponse:
+        if self.action == "upsert":
+            self.table.upsert(self.payload, self.upsert_key)
+            return FakeResponse(self.payload)
+
+        frame = self.table.snapshot()
+        if frame.empty:
+            return FakeResponse([], 0 if self.count else None)
+
+        if self.action == "delete":
+            self.table.delete(~self._mask(frame, np.arange(len(frame)), self.filters))
+            return FakeResponse([])
+
+        positions, filters = self._scan(frame)
+        positions = positions[self._mask(frame, positions, filters)]
+        total = len(positions)
+
+        if self.bounds is not None:
+            positions = positions[self.bounds[0]:self.bounds[1]]
+        if self.max_rows is not None:
+            positions = positions[:self.max_rows]
+
+        rows = frame.iloc[positions]
+        if self.columns is not None:
+            rows = rows[self.columns]
+        # Row dicts with plain Python values, as decoded from a JSON response
+        data = rows.astype(object).where(rows.notna(), None).to_dict(orient="records")
+        return FakeResponse(data, total if self.count else None)
+
+    def _scan(self, frame: pd.DataFrame):
+        """
+        Applies filters on the order column by binary search over its cached
+        sort order.
+        :return: (candidate positions in result order, filters still to apply)
+        """
+        if self.order_column is None:
+            return np.arange(len(frame)), self.filters
+
+        order, values = self.table.sorted_positions(self.order_column)
+        lower, upper, remaining = 0, len(order), []
+        for op, column, value in self.filters:
+            if column != self.order_column or op == "neq":
+                remaining.append((op, column, value))
+            elif op == "gt":
+                lower = max(lower, np.searchsorted(values, value, side="right"))
+            elif op == "gte":
+                lower = max(lower, np.searchsorted(values, value, side="left"))
+            elif op == "lt":
+                upper = min(upper, np.searchsorted(values, value, side="left"))
+            elif op == "lte":
+                upper = min(upper, np.searchsorted(values, value, side="right"))
+
+        positions = order[lower:max(lower, upper)]
+        return (positions[::-1] if self.descending else positions), remaining
+
+    @staticmethod
+    def _mask(frame: pd.DataFrame, positions: np.ndarray, filters: list) -> np.ndarray:
+        mask = np.ones(len(positions), dtype=bool)
+        for op, column, value in filters:
+            values = frame[column].to_numpy()[positions]
+            if op == "gt":
+                mask &= values > value
+            elif op == "gte":
+                mask &= values >= value
+            elif op == "lt":
+                mask &= values < value
+            elif op == "lte":
+                mask &= values <= value
+            elif op == "neq":
+                mask &= values != value
+        return mask
+
+class FakeSupabaseClient:
+    """
+    Local stand-in for supabase.Client, injectable wherever a client is
+    accepted (DataExtractor, DataLoader, SupabaseIngestor).
+
+
+    :param unique_columns: Table name -> columns with a unique constraint (see FakeTable)
+    """
+
+    def __init__(self, tables: dict = None, unique_columns: dict = None):
+        self.unique_columns = unique_columns or {}
+        self.tables = {
+            name: FakeTable(frame, self.unique_columns.get(name)) for name, frame in (tables or {}).items()
+        }
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = FakeTable(unique_columns=self.unique_columns.get(name))
+            table = self.tables[name]
+        return FakeQuery(table)
@@ -0,0 +1,316 @@
+# run_benchmarks.py
+#
+# Times the ETL, feature, training and inference hot paths on synthetic data
+# and writes one JSON result file per run. From the project root:
+#
+#   python benchmarks/run_benchmarks.py --sizes 10k,1m,10m
+#   python benchmarks/compare.py benchmarks/results/<baseline>.json benchmarks/results/<current>.json
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.utils.instrumentation import RssSampler
+from src.batch_predict import FEATURE_COLUMNS
+from src.compiled_model import FeatureLayout
+from src.config.config_loader import load_config
+from src.feature_engineering import FeatureEngineer
+from src.model_predict import predict_clv, reset_model_state
+from src.model_train import train_model
+from src.pipeline.extract import DataExtractor
+from src.pipeline.load import DataLoader
+from src.pipeline.transform import DataTransformer
+from src.preprocessor import PreprocessorBuilder
+from src.training_matrix import build_design_matrix
+
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "src", "config", "config.yaml")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+# Stages whose cost grows much faster than the rest run on at most this many
+# rows per size (the rows actually used are recorded); --no-row-limits lifts them
+DEFAULT_ROW_LIMITS = {
+    "extract": 1_000_000,
+    "load": 1_000_000,
+    "train_model": 200_000,
+    "predict_batch": 1_000_000,
+}
+
+# Small, fixed search so training time tracks the code rather than the config
+BENCHMARK_SEARCH_CONFIG = {
+    "mode": "random",
+    "n_candidates": 2,
+    "cv": 2,
+    "random_state": 42,
+    "n_jobs": -1,
+    "param_space": {
+        "n_estimators": [50],
+        "max_depth": [10, 20],
+        "min_samples_split": [2],
+        "min_samples_leaf": [1],
+    },
+}
+
+SINGLE_ROW_CALLS = 200
+
+class BenchmarkContext:
+    """
+    Inputs shared by the stages of one size. Each stage's output is produced on
+    first use, so selecting a late stage runs its prerequisites untimed.
+    """
+
+    def __init__(self, raw: pd.DataFrame, workdir: str, row_limits: dict):
+        self.raw = raw
+        self.workdir = workdir
+        self.row_limits = row_limits
+        self.outputs = {}
+
+    def rows_for(self, stage: str) -> int:
+        return min(len(self.raw), self.row_limits.get(stage, len(self.raw)))
+
+    def get(self, key: str):
+        if key not in self.outputs:
+            stage = next(stage for stage in STAGES if stage["output"] == key)
+            self.outputs[key] = stage["setup"](self)()
+        return self.outputs[key]
+
+def _extract(ctx):
+    config = load_config(CONFIG_PATH)
+    client = FakeSupabaseClient({config["supabase"]["raw_table_name"]: ctx.raw.iloc[:ctx.rows_for("extract")]})
+    # Build the fake server's key index outside the timed call
+    table = client.tables[config["supabase"]["raw_table_name"]]
+    table.sorted_positions(config.get("extract", {}).get("key_column", "invoice_id"))
+    extractor = DataExtractor(CONFIG_PATH, client=client)
+    return lambda: extractor.extract_raw_data()
+
+def _transform(ctx):
+    transformer = DataTransformer(CONFIG_PATH)
+    return lambda: transformer.transform(ctx.raw)
+
+def _load(ctx):
+    cleaned = ctx.get("cleaned").iloc[:ctx.rows_for("load")]
+    loader = DataLoader(CONFIG_PATH, client=FakeSupabaseClient())
+    return lambda: loader.load_data(cleaned)
+
+def _add_clv_feature(ctx):
+    cleaned = ctx.get("cleaned")
+    return lambda: FeatureEngineer().add_clv_feature(cleaned)
+
+def _preprocessor_fit(ctx):
+    features = ctx.get("features")
+    artifact_path = os.path.join(ctx.workdir, "artifacts", "preprocessor.pkl")
+
+    def run():
+        PreprocessorBuilder(artifact_path).build_and_save(features)
+        return joblib.load(artifact_path)
+    return run
+
+def _preprocessor_transform(ctx):
+    features, preprocessor = ctx.get("features"), ctx.get("preprocessor")
+    return lambda: preprocessor.transform(features[FEATURE_COLUMNS])
+
+def _design_matrix(ctx):
+    features, preprocessor = ctx.get("features"), ctx.get("preprocessor")
+    layout = FeatureLayout.from_preprocessor(preprocessor)
+    return lambda: build_design_matrix(features, layout)
+
+def _train_model(ctx):
+    n_rows = ctx.rows_for("train_model")
+    X = ctx.get("design_matrix")[:n_rows]
+    y = ctx.get("features")["customer_lifetime_value"].to_numpy(dtype=np.float64)[:n_rows]
+
+    def run():
+        model, _ = train_model(X, y, BENCHMARK_SEARCH_CONFIG)
+        # predict_clv serves artifacts/model.pkl relative to the working directory
+        joblib.dump(model, os.path.join(ctx.workdir, "artifacts", "model.pkl"))
+        return model
+    return run
+
+def _prediction_inputs(ctx, n_rows: int) -> pd.DataFrame:
+    ctx.get("model")
+    predict_clv(ctx.get("features")[FEATURE_COLUMNS].iloc[:1], use_cache=False)  # warm: load artifacts
+    return ctx.get("features")[FEATURE_COLUMNS].iloc[:n_rows]
+
+def _predict_single(ctx):
+    inputs = _prediction_inputs(ctx, SINGLE_ROW_CALLS)
+    latencies = []
+
+    def run():
+        for i in range(len(inputs)):
+            start = time.perf_counter()
+            predict_clv(inputs.iloc[i:i + 1], use_cache=False)
+            latencies.append(time.perf_counter() - start)
+        latencies_ms = np.array(latencies) * 1000
+        return {
+            "calls": len(latencies),
+            "latency_p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+            "latency_p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        }
+    return run
+
+def _predict_batch(ctx):
+    inputs = _prediction_inputs(ctx, ctx.rows_for("predict_batch"))
+    return lambda: predict_clv(inputs, use_cache=False)
+
+# In pipeline order; "setup" builds the timed callable, "output" names its result
+STAGES = [
+    {"name": "extract", "setup": _extract, "output": "extracted"},
+    {"name": "transform", "setup": _transform, "output": "cleaned"},
+    {"name": "load", "setup": _load, "output": "loaded"},
+    {"name": "add_clv_feature", "setup": _add_clv_feature, "output": "features"},
+    {"name": "preprocessor_fit", "setup": _preprocessor_fit, "output": "preprocessor"},
+    {"name": "preprocessor_transform", "setup": _preprocessor_transform, "output": "preprocessed"},
+    {"name": "design_matrix", "setup": _design_matrix, "output": "design_matrix"},
+    {"name": "train_model", "setup": _train_model, "output": "model"},
+    {"name": "predict_single", "setup": _predict_single, "output": "single_latency"},
+    {"name": "predict_batch", "setup": _predict_batch, "output": "predictions"},
+]
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    if value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+def time_stage(ctx: BenchmarkContext, stage: dict, repeat: int) -> dict:
+    """
+    Runs one stage `repeat` times and keeps the fastest wall time and the
+    highest memory peak.
+    """
+    timings, peaks, output = [], [], None
+    for _ in range(repeat):
+        run = stage["setup"](ctx)
+        output = None
+        gc.collect()
+        # Peak reported relative to the stage's starting RSS, so memory the
+        # allocator kept from earlier stages and reuses does not show up
+        with RssSampler(interval_s=0.005) as sampler:
+            cpu_start, start = time.process_time(), time.perf_counter()
+            output = run()
+            wall_s, cpu_s = time.perf_counter() - start, time.process_time() - cpu_start
+        timings.append((wall_s, cpu_s))
+        peaks.append(sampler.peak_mb - sampler.baseline_mb)
+
+    ctx.outputs[stage["output"]] = output
+    wall_s, cpu_s = min(timings)
+    rows = SINGLE_ROW_CALLS if stage["name"] == "predict_single" else ctx.rows_for(stage["name"])
+    result = {
+        "stage": stage["name"],
+        "rows": rows,
+        "wall_s": round(wall_s, 4),
+        "cpu_s": round(cpu_s, 4),
+        "rows_per_s": round(rows / wall_s, 1) if wall_s > 0 else None,
+        "peak_rss_delta_mb": round(max(peaks), 1),
+    }
+    if stage["name"] == "predict_single":
+        result.update(output)
+    return result
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+def run_benchmarks(sizes: list, stages: list, repeat: int = 1, row_limits: dict = None, seed: int = 42) -> dict:
+    row_limits = DEFAULT_ROW_LIMITS if row_limits is None else row_limits
+    report = {
+        **git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__,
+        },
+        "settings": {"sizes": sizes, "stages": stages, "repeat": repeat, "row_limits": row_limits, "seed": seed},
+        "results": [],
+    }
+
+    original_cwd = os.getcwd()
+    for n_rows in sizes:
+        raw = generate_transactions(n_rows, seed=seed)
+        with tempfile.TemporaryDirectory(prefix="clv-bench-") as workdir:
+            os.makedirs(os.path.join(workdir, "artifacts"))
+            os.chdir(workdir)
+            # predict_clv's artifacts and cache belong to the previous size's workdir
+            reset_model_state()
+            try:
+                ctx = BenchmarkContext(raw, workdir, row_limits)
+                for stage in STAGES:
+                    if stage["name"] not in stages:
+                        continue
+                    result = {"size": n_rows, **time_stage(ctx, stage, repeat)}
+                    report["results"].append(result)
+                    print(json.dumps(result), flush=True)
+            finally:
+                reset_model_state()
+                os.chdir(original_cwd)
+        del raw
+        gc.collect()
+
+    return report
+
+def main():
+    stage_names = [stage["name"] for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Benchmark the CLV pipeline hot paths on synthetic data")
+    parser.add_argument("--sizes", default="10k,1m,10m", help="Comma-separated row counts, e.g. 10k,1m,10m")
+    parser.add_argument("--stages", default=",".join(stage_names), help=f"Comma-separated subset of: {', '.join(stage_names)}")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-row-limits", action="store_true", help="Run every stage on the full size")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's INFO logs")
+    args = parser.parse_args()
+
+    stages = [name.strip() for name in args.stages.split(",") if name.strip()]
+    unknown = sorted(set(stages) - set(stage_names))
+    if unknown:
+        parser.error(f"Unknown stages: {unknown}")
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    report = run_benchmarks(
+        [parse_size(size) for size in args.sizes.split(",")],
+        stages,
+        repeat=args.repeat,
+        row_limits={} if args.no_row_limits else DEFAULT_ROW_LIMITS,
+        seed=args.seed,
+    )
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{(report['commit'] or 'nogit')[:8]}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# synthetic_data.py
+
+import numpy as np
+import pandas as pd
+
+# Value mix observed in data/customer_transactions.csv
+CATEGORY_WEIGHTS = {
+    "product_category": {"Books": 0.21, "Home": 0.203, "Clothing": 0.197, "Beauty": 0.196, "Electronics": 0.194},
+    "payment_method": {"Debit Card": 0.259, "Cash on Delivery": 0.255, "UPI": 0.247, "Credit Card": 0.239},
+    "customer_segment": {"New": 0.336, "Returning": 0.333, "Loyal": 0.331},
+    "region": {"North": 0.254, "South": 0.251, "West": 0.25, "East": 0.245},
+}
+
+# Roughly 10 transactions per customer, as in the sample file
+ROWS_PER_CUSTOMER = 10
+
+def generate_transactions(n_rows: int, seed: int = 42, dirty_fraction: float = 0.001) -> pd.DataFrame:
+    """
+    Synthetic raw transactions with the columns, value mix and types of
+    data/customer_transactions.csv as read from Supabase (dates and ids as strings).
+
+    :param dirty_fraction: Share of rows given a missing purchase_amount or a
+                           non-canonical spelling (e.g. ' upi'), so the
+                           transform step has cleaning work to do
+    """
+    rng = np.random.default_rng(seed)
+    n_customers = max(n_rows // ROWS_PER_CUSTOMER, 1)
+
+    customer_ids = pd.Series(rng.integers(0, n_customers, n_rows)).astype(str)
+    dates = pd.date_range("2024-01-01", "2024-06-28").strftime("%Y-%m-%d")
+    invoice_dates = pd.Categorical.from_codes(rng.integers(0, len(dates), n_rows), categories=dates)
+
+    # Right-skewed like the sample (median ~70, mean ~100), clipped to its range
+    amounts = np.clip(rng.exponential(100.0, n_rows), 0, 950).round(2)
+
+    df = pd.DataFrame({
+        "customer_id": "CUST_" + customer_ids,
+        "invoice_id": "INV_" + pd.Series(np.arange(n_rows)).astype(str),
+        "invoice_date": invoice_dates.astype(str),
+        "purchase_amount": amounts,
+    })
+    for col, weights in CATEGORY_WEIGHTS.items():
+        values = np.array(list(weights), dtype=object)
+        probabilities = np.array(list(weights.values()))
+        df[col] = values[rng.choice(len(values), n_rows, p=probabilities / probabilities.sum())]
+
+    n_dirty = int(n_rows * dirty_fraction)
+    if n_dirty:
+        dirty = rng.choice(n_rows, n_dirty, replace=False)
+        half = n_dirty // 2
+        df.loc[dirty[:half], "purchase_amount"] = np.nan
+        df.loc[dirty[half:], "payment_method"] = " " + df.loc[dirty[half:], "payment_method"].str.lower()
+
+    return df
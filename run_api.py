@@ -0,0 +1,16 @@
+# run_api.py
+
+import os
+import uvicorn
+from src.config.config_loader import load_config
+from src.serving.model_server import create_app
+
+if __name__ == "__main__":
+    config_path = os.path.join("src", "config", "config.yaml")
+    serving_config = load_config(config_path).get("serving", {})
+
+    uvicorn.run(
+        create_app(config_path=config_path),
+        host=serving_config.get("host", "0.0.0.0"),
+        port=serving_config.get("port", 8000),
+    )
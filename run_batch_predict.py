@@ -0,0 +1,26 @@
+# run_batch_predict.py
+
+import argparse
+import sys
+from src.batch_predict import score_file
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def run_batch_prediction():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of transactions with the CLV model.")
+    parser.add_argument("--input", default="data/customer_transactions.csv", help="CSV or Parquet input file")
+    parser.add_argument("--output", default="artifacts/predictions.parquet", help="Parquet output file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per scoring chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    try:
+        stats = score_file(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers)
+        logger.info(f"Batch prediction finished: {stats}")
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_batch_prediction()
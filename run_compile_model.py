@@ -0,0 +1,37 @@
+# run_compile_model.py
+
+import argparse
+import sys
+import pandas as pd
+from src.compiled_model import CompiledForest
+from src.model_predict import load_model, load_preprocessor
+from src.pipeline.transform import normalize_categorical
+from src.utils.logger import get_logger
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+def run_compile_model():
+    parser = argparse.ArgumentParser(description="Export the CLV model as a precomputed lookup-table model.")
+    parser.add_argument("--output", default="artifacts/compiled_model.npz", help="Output .npz file")
+    parser.add_argument("--parity-data", default="data/customer_transactions.csv", help="CSV used for the parity check")
+    args = parser.parse_args()
+
+    try:
+        model = load_model()
+        preprocessor = load_preprocessor()
+        compiled = CompiledForest.compile(model, preprocessor)
+
+        # Refuse to export a compiled model that disagrees with model.predict
+        parity_df = pd.read_csv(args.parity_data)
+        for col in CATEGORICAL_COLUMNS:
+            parity_df[col] = normalize_categorical(parity_df[col])
+        compiled.verify_parity(model, preprocessor, parity_df)
+
+        compiled.save(args.output)
+    except Exception as e:
+        logger.error(f"Model compilation failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_compile_model()
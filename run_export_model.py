@@ -0,0 +1,41 @@
+# run_export_model.py
+
+import argparse
+import shutil
+import sys
+import pandas as pd
+from src.model_artifact import ArrayForestModel, save_model_arrays
+from src.model_predict import load_model, load_preprocessor, MODEL_ARRAYS_PATH
+from src.pipeline.transform import normalize_categorical
+from src.utils.logger import get_logger
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+def run_export_model():
+    parser = argparse.ArgumentParser(description="Convert artifacts/model.pkl to the memory-mapped array format.")
+    parser.add_argument("--output", default=MODEL_ARRAYS_PATH, help="Output directory")
+    parser.add_argument("--check-data", default="data/customer_transactions.csv", help="CSV used to check predictions match")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="Allowed max abs difference vs the pickled model")
+    args = parser.parse_args()
+
+    try:
+        model = load_model()
+        preprocessor = load_preprocessor()
+        save_model_arrays(model, preprocessor, args.output)
+
+        check_df = pd.read_csv(args.check_data)
+        for col in CATEGORICAL_COLUMNS:
+            check_df[col] = normalize_categorical(check_df[col])
+        try:
+            ArrayForestModel.load(args.output).verify_parity(model, preprocessor, check_df, atol=args.tolerance)
+        except Exception:
+            # Don't leave arrays behind that disagree with model.pkl
+            shutil.rmtree(args.output, ignore_errors=True)
+            raise
+    except Exception as e:
+        logger.error(f"Model export failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_export_model()
@@ -1,25 +1,41 @@
 # run_feature_engineering.py
 
 import os
+from src.config.config_loader import load_config
 from src.data_ingestion import SupabaseIngestor
 from src.feature_engineering import FeatureEngineer
+from src.feature_store import CustomerFeatureStore
+from src.utils.instrumentation import instrumented, track_stage
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@instrumented("feature_engineering", rows=len)
 def run_feature_engineering():
     logger.info("Starting data ingestion & feature engineering pipeline...")
 
     # Load data from Supabase
     config_path = os.path.join("src", "config", "config.yaml")
-    ingestor = SupabaseIngestor(config_path)
-    df = ingestor.load_data()
+    with track_stage("ingest") as stage:
+        ingestor = SupabaseIngestor(config_path)
+        df = ingestor.load_data()
+        stage.rows = len(df)
 
     logger.info(f"Loaded {df.shape[0]} records. Starting feature engineering...")
 
+    # Persistent per-customer aggregates, updated from new transactions only
+    store_config = load_config(config_path).get("feature_store", {})
+    feature_store = None
+    if store_config.get("enabled", False):
+        feature_store = CustomerFeatureStore(store_config.get("path", "artifacts/feature_store"))
+
     # Perform feature engineering
-    fe = FeatureEngineer()
-    df = fe.add_clv_feature(df)  # Adds the target column 'customer_lifetime_value'
+    fe = FeatureEngineer(feature_store=feature_store)
+    if feature_store is not None:
+        with track_stage("refresh_feature_store") as stage:
+            stage.rows = fe.refresh_feature_store(df)
+    with track_stage("add_clv_feature", rows=len(df)):
+        df = fe.add_clv_feature(df)  # Adds the target column 'customer_lifetime_value'
 
     logger.info("Feature engineering completed successfully.")
 
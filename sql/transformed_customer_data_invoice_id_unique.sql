@@ -0,0 +1,6 @@
+-- Required before setting etl.mode: incremental in src/config/config.yaml.
+-- Incremental ETL upserts with ON CONFLICT (invoice_id), which needs a unique
+-- constraint on that column. Remove any duplicate invoice_ids first.
+
+ALTER TABLE public.transformed_customer_data
+    ADD CONSTRAINT transformed_customer_data_invoice_id_key UNIQUE (invoice_id);
@@ -0,0 +1,121 @@
+# analytics.py
+
+import threading
+import time
+
+import pandas as pd
+
+from src.data_access import TableReader
+from src.utils.logger import get_logger
+from src.utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+AGGREGATE_COLUMNS = ["invoice_date", "purchase_amount", "payment_method", "product_category", "customer_segment"]
+
+def aggregate_rows(df: pd.DataFrame) -> dict:
+    """
+    Reduces transaction rows to the dashboard's aggregates: counts per payment
+    method, category and segment, and purchase_amount summed per month.
+    """
+    months = pd.to_datetime(df["invoice_date"]).dt.strftime("%Y-%m")
+    return {
+        "payment_method": df["payment_method"].value_counts(),
+        "product_category": df["product_category"].value_counts(),
+        "customer_segment": df["customer_segment"].value_counts(),
+        "monthly_sales": df["purchase_amount"].groupby(months).sum(),
+    }
+
+def merge_aggregates(left: dict, right: dict) -> dict:
+    if not left:
+        return right
+    return {name: left[name].add(right[name], fill_value=0) for name in left}
+
+class DashboardAggregates:
+    """
+    Cache of the dashboard aggregates, shared by every session of the app.
+
+    The table's change token is checked at most once per refresh_interval_s.
+    When rows were only appended after the last seen invoice_date (the
+    previous tail checksum still matches and the new rows account for the
+    whole count increase), just those rows are fetched and folded in; any
+    other change, such as an edit alongside the appends, recomputes from a
+    full scan. Either way only the aggregate columns are downloaded, page by page,
+    and no row-level frame is kept.
+    """
+
+    def __init__(self, client, table: str = "transformed_customer_data", refresh_interval_s: float = 60, page_size: int = 1000):
+        self.client = client
+        self.table = table
+        self.reader = TableReader(client, table)
+        self.refresh_interval_s = refresh_interval_s
+        self.page_size = page_size
+
+        self._aggregates = {}
+        self._frames = {}
+        self._token = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        """
+        :return: Chart-ready DataFrames keyed by aggregate name (empty dict if the table is empty)
+        """
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_interval_s:
+                self._refresh()
+            return self._frames
+
+    def _refresh(self):
+        try:
+            token = self.reader.change_token("invoice_date")
+        except Exception as e:
+            logger.error("Failed to read change token from Supabase.")
+            raise ProjectBaseError("Supabase analytics query failed.") from e
+        self._checked_at = time.monotonic()
+        if token == self._token:
+            return
+
+        start = time.perf_counter()
+        previous = self._token
+        if self._is_append(previous, token):
+            delta, n_rows = self._scan(since=previous["max_invoice_date"])
+            if n_rows == token["row_count"] - previous["row_count"]:
+                self._set(merge_aggregates(self._aggregates, delta), token)
+                logger.info(f"Folded {n_rows} new rows into dashboard aggregates in {time.perf_counter() - start:.2f}s")
+                return
+
+        aggregates, n_rows = self._scan()
+        self._set(aggregates, token)
+        logger.info(f"Recomputed dashboard aggregates from {n_rows} rows in {time.perf_counter() - start:.2f}s")
+
+    def _is_append(self, previous: dict, token: dict) -> bool:
+        if not previous or not previous["max_invoice_date"] or token["row_count"] <= previous["row_count"]:
+            return False
+        # Edits to rows already folded in would be missed by the delta scan
+        checksum = self.reader.tail_checksum("invoice_date", until=previous["max_invoice_date"])
+        if checksum != previous["tail_sha256"]:
+            logger.info("Rows up to the last seen invoice_date changed; recomputing dashboard aggregates.")
+            return False
+        return True
+
+    def _set(self, aggregates: dict, token: dict):
+        self._aggregates, self._token = aggregates, token
+        self._frames = {
+            name: series.rename_axis("invoice_date" if name == "monthly_sales" else name)
+            .reset_index(name="purchase_amount" if name == "monthly_sales" else "count")
+            for name, series in aggregates.items()
+        }
+
+    def _scan(self, since: str = None):
+        """
+        Aggregates the table page by page.
+        :param since: Only rows with invoice_date strictly after this value
+        :return: (aggregates, rows scanned)
+        """
+        aggregates, n_rows = {}, 0
+        filters = (lambda query: query.gt("invoice_date", since)) if since is not None else None
+        for rows in self.reader.iter_pages(",".join(AGGREGATE_COLUMNS), self.page_size, filters, order="invoice_id"):
+            aggregates = merge_aggregates(aggregates, aggregate_rows(pd.DataFrame(rows)))
+            n_rows += len(rows)
+        return aggregates, n_rows
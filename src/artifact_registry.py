@@ -0,0 +1,177 @@
+# artifact_registry.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import joblib
+
+from src.prediction_cache import file_fingerprint
+from src.utils.instrumentation import current_rss_mb
+from src.utils.exceptions import ArtifactMismatchError
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+
+_registry = None
+
+def _write_atomic(path: str, write, mode: str = "wb"):
+    # Temp file in the target directory, so os.replace is a same-filesystem rename
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_dump(value, path: str):
+    """
+    joblib.dump that readers never see half-written: the pickle goes to a temp
+    file next to path and is renamed over it.
+    """
+    _write_atomic(path, lambda f: joblib.dump(value, f))
+
+def write_manifest(manifest_path: str, artifacts: dict):
+    """
+    Records which artifact files belong together, with their SHA-256. Written
+    last, after every listed file is in place, so a manifest never names a
+    file that is still being written.
+
+    :param artifacts: Name (e.g. "model") -> file path
+    """
+    base = os.path.dirname(manifest_path) or "."
+    manifest = {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "version": time.strftime("%Y%m%dT%H%M%S"),
+        "artifacts": {
+            name: {"file": os.path.relpath(path, base), "sha256": file_fingerprint([path])}
+            for name, path in artifacts.items()
+        },
+    }
+    _write_atomic(manifest_path, lambda f: json.dump(manifest, f, indent=2), mode="w")
+    logger.info(f"Artifact manifest {manifest['version']} written to {manifest_path}")
+
+def load_manifest_artifacts(manifest_path: str, loader) -> dict:
+    """
+    Loads every artifact named in the manifest, checking each against its
+    recorded hash. Each file is hashed and loaded through one open handle, so
+    a concurrent os.replace cannot swap it in between.
+
+    :param loader: Called as loader(file object) for each artifact
+    :return: Name -> loaded value, plus "version"
+    """
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(manifest_path) or "."
+    loaded = {"version": manifest["version"]}
+    for name, entry in manifest["artifacts"].items():
+        with open(os.path.join(base, entry["file"]), "rb") as f:
+            digest = hashlib.sha256()
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+            if digest.hexdigest() != entry["sha256"]:
+                raise ArtifactMismatchError(
+                    f"{entry['file']} does not match manifest {manifest['version']}; a newer save is in progress"
+                )
+            f.seek(0)
+            loaded[name] = loader(f)
+    return loaded
+
+def _watched_file(path: str) -> str:
+    # Array-format models are directories; their manifest is rewritten on every save
+    return os.path.join(path, "manifest.json") if os.path.isdir(path) else path
+
+class ArtifactRegistry:
+    """
+    Loads each artifact once per process and hands out the same object until
+    the file on disk changes.
+
+    Every get() stats the file; only when mtime/size differ is its SHA-256
+    recomputed, and only a different hash triggers a reload, so touching a file
+    or rewriting identical bytes keeps the loaded object.
+    """
+
+    def __init__(self):
+        self._entries = {}  # path -> {"value", "stat", "sha256", load info}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, loader):
+        """
+        :param loader: Called as loader(path) on first use and whenever the artifact changes
+        """
+        watched = _watched_file(path)
+        stat = os.stat(watched)
+        stat = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["stat"] == stat:
+                return entry["value"]
+
+            sha256 = file_fingerprint([watched])
+            if entry is not None and entry["sha256"] == sha256:
+                entry["stat"] = stat
+                return entry["value"]
+
+            rss_before = current_rss_mb()
+            start = time.perf_counter()
+            value = loader(path)
+            load_time_s = time.perf_counter() - start
+            memory_mb = current_rss_mb() - rss_before
+
+            self._entries[path] = {
+                "value": value,
+                "stat": stat,
+                "sha256": sha256,
+                "load_time_s": load_time_s,
+                "memory_mb": memory_mb,
+                "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "loads": (entry["loads"] + 1) if entry is not None else 1,
+            }
+            action = "Reloaded changed" if entry is not None else "Loaded"
+            logger.info(f"{action} artifact {path} in {load_time_s * 1000:.0f} ms (+{memory_mb:.1f} MB RSS)")
+            return value
+
+    def peek(self, path: str):
+        """
+        :return: The currently loaded value for path, or None, without checking the file
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            return entry["value"] if entry is not None else None
+
+    def stats(self) -> dict:
+        """
+        Load time, RSS growth, hash and load count per loaded artifact.
+        """
+        with self._lock:
+            return {
+                path: {key: value for key, value in entry.items() if key not in ("value", "stat")}
+                for path, entry in self._entries.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def get_artifact_registry() -> ArtifactRegistry:
+    """
+    Returns the process-wide artifact registry.
+    """
+    global _registry
+    if _registry is None:
+        _registry = ArtifactRegistry()
+    return _registry
@@ -0,0 +1,121 @@
+# batch_predict.py
+
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.model_predict import load_model, load_preprocessor, MODEL_PATH, PREPROCESSOR_PATH
+from src.pipeline.transform import normalize_categorical
+from src.utils.logger import get_logger
+from src.utils.exceptions import PredictionError
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+FEATURE_COLUMNS = ["purchase_amount"] + CATEGORICAL_COLUMNS
+
+# Per-process artifacts. Loaded once in the parent; forked workers inherit them
+# copy-on-write, spawned workers load their own copy in _init_worker.
+_MODEL = None
+_PREPROCESSOR = None
+
+def _init_worker(model_path: str, preprocessor_path: str):
+    global _MODEL, _PREPROCESSOR
+    if _MODEL is None:
+        _MODEL = load_model(model_path)
+    if _PREPROCESSOR is None:
+        _PREPROCESSOR = load_preprocessor(preprocessor_path)
+
+def _score_chunk(chunk: pd.DataFrame):
+    features = chunk[FEATURE_COLUMNS].copy()
+    for col in CATEGORICAL_COLUMNS:
+        features[col] = normalize_categorical(features[col])
+    return _MODEL.predict(_PREPROCESSOR.transform(features))
+
+def iter_input_chunks(input_path: str, chunk_size: int):
+    """
+    Streams a CSV or Parquet file as DataFrame chunks of at most chunk_size rows.
+    """
+    if input_path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 100_000,
+    workers: int = None,
+    model_path: str = MODEL_PATH,
+    preprocessor_path: str = PREPROCESSOR_PATH,
+) -> dict:
+    """
+    Scores every row of input_path and writes the input columns plus
+    'predicted_clv' to a Parquet file.
+
+    Chunks are scored on a process pool sharing one loaded model; at most
+    2 * workers chunks are held in memory, and results are written in input order.
+
+    :return: Dict with rows scored, elapsed seconds and rows/sec
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    total_rows = 0
+    writer = None
+
+    try:
+        logger.info(f"Batch scoring {input_path} -> {output_path} ({workers} workers, {chunk_size} rows/chunk)")
+        _init_worker(model_path, preprocessor_path)
+
+        def write(chunk: pd.DataFrame, predictions):
+            nonlocal writer, total_rows
+            table = pa.Table.from_pandas(chunk.assign(predicted_clv=predictions), preserve_index=False)
+            if writer is None:
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            total_rows += len(chunk)
+            logger.info(f"Scored {total_rows} rows so far")
+
+        if workers == 1:
+            for chunk in iter_input_chunks(input_path, chunk_size):
+                write(chunk, _score_chunk(chunk))
+        else:
+            context = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(model_path, preprocessor_path),
+            ) as pool:
+                pending = deque()
+                for chunk in iter_input_chunks(input_path, chunk_size):
+                    pending.append((chunk, pool.submit(_score_chunk, chunk)))
+                    if len(pending) >= 2 * workers:
+                        done_chunk, future = pending.popleft()
+                        write(done_chunk, future.result())
+
+                while pending:
+                    done_chunk, future = pending.popleft()
+                    write(done_chunk, future.result())
+
+    except Exception as e:
+        logger.error(f"Batch scoring failed: {e}")
+        raise PredictionError(f"Batch scoring failed: {e}")
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = total_rows / elapsed if elapsed > 0 else float("inf")
+    logger.info(f"Scored {total_rows} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+    return {"rows": total_rows, "elapsed_s": elapsed, "rows_per_sec": rows_per_sec}
@@ -0,0 +1,302 @@
+# compiled_model.py
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+from src.utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+NUMERIC_FEATURE = "purchase_amount"
+
+def flatten_forest(model) -> dict:
+    """
+    Concatenates every tree of a fitted RandomForestRegressor into contiguous
+    node arrays. Child indices are global; leaves have left == right == -1.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        offset += tree.node_count
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+
+def traverse(nodes: dict, X: np.ndarray, roots=None, chunk_size: int = 8192) -> np.ndarray:
+    """
+    Walks all rows of X (float32) down the given trees level by level, vectorized
+    over rows x trees.
+
+    :return: Leaf values with shape (n_rows, n_trees)
+    """
+    roots = nodes["roots"] if roots is None else np.asarray(roots)
+    feature, threshold = nodes["feature"], nodes["threshold"]
+    left, right, value = nodes["left"], nodes["right"], nodes["value"]
+    out = np.empty((len(X), len(roots)))
+
+    for start in range(0, len(X), chunk_size):
+        X_chunk = X[start:start + chunk_size]
+        node = np.broadcast_to(roots, (len(X_chunk), len(roots))).copy()
+
+        active = left[node] != -1
+        while active.any():
+            current = node[active]
+            go_left = X_chunk[np.nonzero(active)[0], feature[current]] <= threshold[current]
+            node[active] = np.where(go_left, left[current], right[current])
+            active[active] = left[node[active]] != -1
+
+        out[start:start + chunk_size] = value[node]
+    return out
+
+def _is_passthrough(transformer) -> bool:
+    # Fitted ColumnTransformers store 'passthrough' as an identity FunctionTransformer
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return type(transformer).__name__ == "FunctionTransformer" and transformer.func is None
+
+class FeatureLayout:
+    """
+    Reproduces PreprocessorBuilder's ColumnTransformer ('num' passthrough or
+    StandardScaler of purchase_amount + 'cat' OneHotEncoder) as plain index
+    arithmetic.
+    """
+
+    def __init__(
+        self,
+        n_features: int,
+        numeric_index: int,
+        categorical_columns: list,
+        vocabulary: list,
+        offsets: list,
+        numeric_mean: float = 0.0,
+        numeric_scale: float = 1.0,
+    ):
+        self.n_features = n_features
+        self.numeric_index = numeric_index
+        self.categorical_columns = categorical_columns
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.numeric_mean = numeric_mean
+        self.numeric_scale = numeric_scale
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor) -> "FeatureLayout":
+        transformers = {name: (transformer, columns) for name, transformer, columns in preprocessor.transformers_}
+        if set(transformers) - {"remainder"} != {"num", "cat"}:
+            raise ProjectBaseError("Compiled model supports only the 'num' + 'cat' preprocessor layout.")
+
+        numeric, numeric_columns = transformers["num"]
+        encoder, categorical_columns = transformers["cat"]
+        if list(numeric_columns) != [NUMERIC_FEATURE]:
+            raise ProjectBaseError(f"Compiled model expects '{NUMERIC_FEATURE}' as the only numeric column.")
+
+        # Older artifacts standardize purchase_amount; both cases are affine
+        numeric_mean, numeric_scale = 0.0, 1.0
+        if not _is_passthrough(numeric):
+            if type(numeric).__name__ != "StandardScaler":
+                raise ProjectBaseError(f"Compiled model does not support numeric transformer {numeric!r}.")
+            if numeric.mean_ is not None:
+                numeric_mean = float(numeric.mean_[0])
+            if numeric.scale_ is not None:
+                numeric_scale = float(numeric.scale_[0])
+
+        if getattr(encoder, "drop", None) is not None:
+            raise ProjectBaseError("Compiled model does not support OneHotEncoder(drop=...).")
+
+        vocabulary = [[str(c) for c in categories] for categories in encoder.categories_]
+        offsets, position = [], preprocessor.output_indices_["cat"].start
+        for categories in vocabulary:
+            offsets.append(position)
+            position += len(categories)
+
+        n_features = max(preprocessor.output_indices_["num"].stop, position)
+        return cls(
+            n_features,
+            preprocessor.output_indices_["num"].start,
+            list(categorical_columns),
+            vocabulary,
+            offsets,
+            numeric_mean,
+            numeric_scale,
+        )
+
+    def scale_amounts(self, amounts) -> np.ndarray:
+        """
+        Applies the numeric transform in float64, then rounds to float32 exactly
+        as the forest sees its inputs.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        return ((amounts - self.numeric_mean) / self.numeric_scale).astype(np.float32)
+
+    def category_codes(self, input_data: pd.DataFrame) -> np.ndarray:
+        """
+        :return: (n_rows, n_categorical) int codes into the vocabulary, -1 if unknown
+        """
+        return np.column_stack([
+            _vocabulary_codes(input_data[col], categories)
+            for col, categories in zip(self.categorical_columns, self.vocabulary)
+        ]).astype(np.int64)
+
+    def encode(self, amounts: np.ndarray, codes: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Builds the dense float32 design matrix the forest was trained on.
+        :param amounts: Already-scaled amounts (see scale_amounts)
+        :param out: Optional zero-filled (n_rows, n_features) float32 array to fill in place
+        """
+        X = np.zeros((len(amounts), self.n_features), dtype=np.float32) if out is None else out
+        X[:, self.numeric_index] = amounts
+        rows = np.arange(len(amounts))
+        for i, offset in enumerate(self.offsets):
+            known = codes[:, i] >= 0
+            X[rows[known], offset + codes[known, i]] = 1.0
+        return X
+
+    def to_dict(self) -> dict:
+        return {
+            "n_features": self.n_features,
+            "numeric_index": self.numeric_index,
+            "categorical_columns": self.categorical_columns,
+            "vocabulary": self.vocabulary,
+            "offsets": self.offsets,
+            "numeric_mean": self.numeric_mean,
+            "numeric_scale": self.numeric_scale,
+        }
+
+def _vocabulary_codes(series: pd.Series, categories: list) -> np.ndarray:
+    """
+    Codes of series values in categories (-1 if unknown), compared as strings.
+    Category-dtype columns are mapped through their (few) categories instead of
+    converting every row to str.
+    """
+    vocabulary = pd.Index(categories)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.append(vocabulary.get_indexer(series.cat.categories.astype(str)), vocabulary.get_indexer(["nan"]))
+        # Missing values have code -1, which picks the trailing "nan" entry
+        return lookup[series.cat.codes.to_numpy()]
+    return vocabulary.get_indexer(series.astype(str))
+
+def _interval_representatives(cuts: np.ndarray) -> np.ndarray:
+    """
+    One float32 value per interval (-inf, c0], (c0, c1], ..., (c_last, inf):
+    the largest float32 not above each cut, plus one just above the last cut.
+    """
+    reps = cuts.astype(np.float32)
+    too_high = reps.astype(np.float64) > cuts
+    reps[too_high] = np.nextafter(reps[too_high], np.float32(-np.inf))
+    last = np.nextafter(np.float32(cuts[-1]) if len(cuts) else np.float32(0), np.float32(np.inf))
+    return np.append(reps, last)
+
+class CompiledForest:
+    """
+    Lookup-table form of RandomForestRegressor + the CLV preprocessor.
+
+    Because the categorical space is tiny, predictions are precomputed for every
+    combination of known categories and every interval between the forest's
+    purchase_amount split thresholds. Scoring is then a vocabulary lookup, one
+    np.searchsorted and a table read. Rows with unseen categories fall back to
+    a vectorized walk over the flattened node arrays.
+    """
+
+    def __init__(self, nodes: dict, layout: FeatureLayout, cuts: np.ndarray, table: np.ndarray):
+        self.nodes = nodes
+        self.layout = layout
+        self.cuts = cuts
+        self.table = table
+        self.strides = np.cumprod([1] + [len(v) for v in layout.vocabulary[:0:-1]])[::-1].astype(np.int64)
+
+    @classmethod
+    def compile(cls, model, preprocessor) -> "CompiledForest":
+        start = time.perf_counter()
+        nodes = flatten_forest(model)
+        layout = FeatureLayout.from_preprocessor(preprocessor)
+
+        is_split = nodes["left"] != -1
+        amount_split = is_split & (nodes["feature"] == layout.numeric_index)
+        cuts = np.unique(nodes["threshold"][amount_split])
+        global_reps = _interval_representatives(cuts)
+
+        # Every known category combination, in row-major order of the vocabulary
+        grids = np.meshgrid(*[np.arange(len(v)) for v in layout.vocabulary], indexing="ij")
+        combo_codes = np.column_stack([g.ravel() for g in grids])
+        n_combos = len(combo_codes)
+
+        # Per tree: evaluate on that tree's own (few) amount intervals, then
+        # spread onto the global interval grid. Each global interval lies inside
+        # exactly one interval of every tree.
+        table = np.zeros((n_combos, len(global_reps)))
+        tree_ends = np.append(nodes["roots"][1:], len(nodes["value"]))
+        for root, end in zip(nodes["roots"], tree_ends):
+            tree_cuts = np.unique(nodes["threshold"][root:end][amount_split[root:end]])
+            tree_reps = _interval_representatives(tree_cuts)
+            X = layout.encode(np.tile(tree_reps, n_combos), np.repeat(combo_codes, len(tree_reps), axis=0))
+            leaf_values = traverse(nodes, X, roots=[root])[:, 0].reshape(n_combos, len(tree_reps))
+            table += leaf_values[:, np.searchsorted(tree_cuts, global_reps.astype(np.float64), side="left")]
+
+        table /= len(nodes["roots"])
+        logger.info(
+            f"Compiled {len(nodes['roots'])} trees into a {n_combos} x {len(global_reps)} lookup table "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return cls(nodes, layout, cuts, table)
+
+    def predict(self, input_data: pd.DataFrame) -> np.ndarray:
+        # Match sklearn, which compares float32 features against the thresholds
+        amounts = self.layout.scale_amounts(input_data[NUMERIC_FEATURE].to_numpy(dtype=np.float64))
+        codes = self.layout.category_codes(input_data)
+
+        known = (codes >= 0).all(axis=1)
+        combo = np.where(known, (np.maximum(codes, 0) * self.strides).sum(axis=1), 0)
+        interval = np.searchsorted(self.cuts, amounts.astype(np.float64), side="left")
+        predictions = self.table[combo, interval]
+
+        if not known.all():
+            X = self.layout.encode(amounts[~known], codes[~known])
+            predictions[~known] = traverse(self.nodes, X).mean(axis=1)
+        return predictions
+
+    def verify_parity(self, model, preprocessor, input_data: pd.DataFrame, atol: float = 1e-6) -> float:
+        """
+        Compares against preprocessor.transform + model.predict on input_data.
+        :return: Maximum absolute difference; raises ProjectBaseError above atol
+        """
+        expected = model.predict(preprocessor.transform(input_data))
+        max_diff = float(np.max(np.abs(self.predict(input_data) - expected))) if len(input_data) else 0.0
+        logger.info(f"Compiled model parity on {len(input_data)} rows: max abs diff = {max_diff:.3g}")
+        if max_diff > atol:
+            raise ProjectBaseError(f"Compiled model deviates from model.predict by {max_diff}")
+        return max_diff
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            cuts=self.cuts,
+            table=self.table,
+            layout=np.array(json.dumps(self.layout.to_dict())),
+            **self.nodes,
+        )
+        logger.info(f"Compiled model saved to: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path) as data:
+            layout = FeatureLayout(**json.loads(str(data["layout"])))
+            nodes = {key: data[key] for key in ("feature", "threshold", "left", "right", "value", "roots")}
+            return cls(nodes, layout, data["cuts"], data["table"])
@@ -0,0 +1,392 @@
+# data_access.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from operator import itemgetter
+
+import httpx
+import numpy as np
+import pandas as pd
+from supabase import create_client, Client, ClientOptions
+
+from src.config.config_loader import load_config
+from src.utils.logger import get_logger
+from src.utils.schema import TRANSACTION_SCHEMA
+
+logger = get_logger(__name__)
+
+CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+class RequestStats:
+    """
+    Timing of every Supabase request made through TableReader/TableWriter,
+    per operation (e.g. "select", "upsert"), with a rolling latency window.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.window = window
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, elapsed_s: float, rows: int):
+        with self._lock:
+            stats = self._operations.setdefault(
+                operation, {"requests": 0, "rows": 0, "total_s": 0.0, "latencies": deque(maxlen=self.window)}
+            )
+            stats["requests"] += 1
+            stats["rows"] += rows
+            stats["total_s"] += elapsed_s
+            stats["latencies"].append(elapsed_s)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {}
+            for operation, stats in self._operations.items():
+                latencies_ms = np.fromiter(stats["latencies"], dtype=float) * 1000
+                p50, p99 = np.percentile(latencies_ms, [50, 99]) if len(latencies_ms) else (0.0, 0.0)
+                snapshot[operation] = {
+                    "requests": stats["requests"],
+                    "rows": stats["rows"],
+                    "total_s": stats["total_s"],
+                    "latency_p50_ms": float(p50),
+                    "latency_p99_ms": float(p99),
+                }
+            return snapshot
+
+request_stats = RequestStats()
+
+def get_client(url: str = None, key: str = None, config_path: str = CONFIG_PATH) -> Client:
+    """
+    Returns the process-wide Supabase client for (url, key), creating it on first use.
+
+    All clients share the pool settings in the data_access config section: one
+    httpx.Client with keep-alive and a bounded number of connections, so TLS
+    handshakes are paid once per connection rather than once per component.
+    :param url, key: Default to supabase.url / supabase.key in config
+    """
+    config = load_config(config_path or CONFIG_PATH)
+    url = url or config["supabase"]["url"]
+    key = key or config["supabase"]["key"]
+
+    with _clients_lock:
+        if (url, key) not in _clients:
+            access_config = config.get("data_access", {})
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=access_config.get("max_connections", 10),
+                    max_keepalive_connections=access_config.get("max_keepalive_connections", 10),
+                    keepalive_expiry=access_config.get("keepalive_expiry_s", 30),
+                ),
+                timeout=access_config.get("timeout_s", 120),
+            )
+            _clients[(url, key)] = create_client(url, key, options=ClientOptions(httpx_client=http_client))
+            logger.info(f"Connected to Supabase: {url}")
+        return _clients[(url, key)]
+
+def _execute(query, operation: str):
+    start = time.perf_counter()
+    response = query.execute()
+    request_stats.record(operation, time.perf_counter() - start, len(response.data or []))
+    return response
+
+class ColumnarFrameBuilder:
+    """
+    Accumulates pages of row dicts as typed per-column arrays and concatenates
+    them once at the end, instead of keeping every row dict alive until a
+    single pd.DataFrame(all_rows) call.
+
+    Declared columns get their schema dtype; 'category' columns are stored as
+    int32 codes into a per-column vocabulary, so repeated strings are kept once.
+    Columns not in the schema are kept as object arrays. Missing keys become
+    None/NaN.
+    """
+
+    def __init__(self, schema: dict = None):
+        self.schema = TRANSACTION_SCHEMA if schema is None else schema
+        self.columns = None
+        self._pages = {}
+        self._vocabularies = {}
+        self.n_rows = 0
+
+    def append(self, rows: list):
+        if not rows:
+            return
+        if self.columns is None:
+            extra = [col for col in rows[0] if col not in self.schema]
+            self.columns = [col for col in self.schema if col in rows[0]] + extra
+            self._pages = {col: [] for col in self.columns}
+            self._vocabularies = {col: {} for col in self.columns if self.schema.get(col) == "category"}
+
+        try:
+            # Transpose in one C-level pass when every row has every column
+            getter = itemgetter(*self.columns)
+            columns = list(zip(*map(getter, rows))) if len(self.columns) > 1 else [list(map(getter, rows))]
+        except KeyError:
+            columns = [[row.get(col) for row in rows] for col in self.columns]
+
+        for col, values in zip(self.columns, columns):
+            dtype = self.schema.get(col, "object")
+            if dtype == "category":
+                vocabulary = self._vocabularies[col]
+                codes = [vocabulary.setdefault(value, len(vocabulary)) for value in values]
+                self._pages[col].append(np.array(codes, dtype=np.int32))
+            else:
+                # None becomes NaN for float columns
+                self._pages[col].append(np.array(values, dtype=dtype))
+        self.n_rows += len(rows)
+
+    def build(self) -> pd.DataFrame:
+        if self.columns is None:
+            return pd.DataFrame()
+
+        data = {}
+        for col in self.columns:
+            pages, self._pages[col] = self._pages[col], []
+            values = np.concatenate(pages) if len(pages) > 1 else pages[0]
+            if self.schema.get(col) == "category":
+                data[col] = self._to_categorical(values, self._vocabularies[col])
+            else:
+                data[col] = values
+        return pd.DataFrame(data, columns=self.columns)
+
+    @staticmethod
+    def _to_categorical(codes: np.ndarray, vocabulary: dict) -> pd.Categorical:
+        # Sorted categories and -1 for nulls, matching pd.Categorical(values)
+        labels = list(vocabulary)
+        non_null = [i for i, label in enumerate(labels) if label is not None]
+        order = sorted(non_null, key=lambda i: labels[i])
+        remap = np.full(len(labels), -1, dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
+        return pd.Categorical.from_codes(remap[codes], categories=[labels[i] for i in order])
+
+class TableReader:
+    """
+    Paginated, timed reads of one table.
+    """
+
+    def __init__(self, client: Client, table: str):
+        self.client = client
+        self.table = table
+
+    def query(self, columns: str = "*", **select_options):
+        return self.client.table(self.table).select(columns, **select_options)
+
+    def execute(self, query, operation: str = "select"):
+        return _execute(query, operation)
+
+    def iter_pages(self, columns: str = "*", page_size: int = 1000, filters=None, order: str = None):
+        """
+        Yields the table as lists of row dicts using range pagination.
+        :param filters: Optional function applied to each page's query (e.g. a gte filter)
+        :param order: Column to order by; needed for stable pages under filters
+        """
+        offset = 0
+        while True:
+            query = self.query(columns)
+            if filters is not None:
+                query = filters(query)
+            if order is not None:
+                query = query.order(order)
+            rows = self.execute(query.range(offset, offset + page_size - 1)).data
+            if not rows:
+                break
+
+            yield rows
+            offset += page_size
+
+    def read_frame(self, columns: str = "*", page_size: int = 1000, filters=None, order: str = None) -> pd.DataFrame:
+        """
+        Reads all pages into one DataFrame via ColumnarFrameBuilder.
+        """
+        builder = ColumnarFrameBuilder()
+        for rows in self.iter_pages(columns, page_size, filters, order):
+            builder.append(rows)
+        return builder.build()
+
+    def iter_keyset_pages(self, key_column: str, page_size: int = 1000, max_workers: int = 4, filters=None):
+        """
+        Yields the table as DataFrame chunks, one per keyset page, in key order.
+
+        Page boundaries are discovered by a cheap scan over the key column only;
+        the full rows of each page are then fetched concurrently on a bounded
+        thread pool, so at most ``2 * max_workers`` pages are held at once.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = deque()
+            for lower, upper in self._scan_page_bounds(key_column, page_size, filters):
+                pending.append(pool.submit(self._fetch_key_range, key_column, lower, upper, filters))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _scan_page_bounds(self, key_column: str, page_size: int, filters=None):
+        """
+        Walks the key column in order and yields (lower, upper] bounds per page.
+        """
+        cursor = None
+        while True:
+            query = self.query(key_column)
+            if filters is not None:
+                query = filters(query)
+            if cursor is not None:
+                query = query.gt(key_column, cursor)
+            keys = self.execute(query.order(key_column).limit(page_size), "select_keys").data
+
+            # Stop on an empty page rather than a short one: the server may cap
+            # rows per request below page_size.
+            if not keys:
+                break
+
+            upper = keys[-1][key_column]
+            yield cursor, upper
+            cursor = upper
+
+    def _fetch_key_range(self, key_column: str, lower, upper, filters=None) -> pd.DataFrame:
+        query = self.query()
+        if filters is not None:
+            query = filters(query)
+        if lower is not None:
+            query = query.gt(key_column, lower)
+        rows = self.execute(query.lte(key_column, upper).order(key_column)).data
+
+        builder = ColumnarFrameBuilder()
+        builder.append(rows)
+        chunk = builder.build()
+        logger.info(f"Fetched page ({lower}, {upper}] with {len(chunk)} rows")
+        return chunk
+
+    def change_token(self, date_column: str = "invoice_date", count_column: str = "invoice_id", tail_rows: int = 1000) -> dict:
+        """
+        Row count, latest date_column value and a SHA-256 of the tail_rows most
+        recent rows, read with two small requests.
+
+        Count and max date alone miss in-place upserts; the tail checksum
+        catches those that touch recent rows (where corrections usually land),
+        but an edit to an older row that leaves count and tail unchanged still
+        goes unnoticed.
+        """
+        count_response = self.execute(self.query(count_column, count="exact").limit(1), "count")
+        latest, tail_sha256 = self._tail(date_column, tail_rows)
+        return {"row_count": count_response.count, f"max_{date_column}": latest, "tail_sha256": tail_sha256}
+
+    def tail_checksum(self, date_column: str = "invoice_date", tail_rows: int = 1000, until=None) -> str:
+        """
+        The tail_sha256 of change_token, over the rows with date_column <= until.
+        Equal to an earlier token's checksum (taken with until = its max date)
+        when nothing in that tail changed since, i.e. the table was only
+        appended to.
+        """
+        return self._tail(date_column, tail_rows, until)[1]
+
+    def _tail(self, date_column: str, tail_rows: int, until=None):
+        query = self.query()
+        if until is not None:
+            query = query.lte(date_column, until)
+        tail = self.execute(query.order(date_column, desc=True).limit(max(tail_rows, 1))).data
+        latest = tail[0][date_column] if tail else None
+
+        # Row order among equal dates is not guaranteed, so hash the rows sorted
+        digest = hashlib.sha256()
+        for row in sorted(json.dumps(row, sort_keys=True, default=str) for row in tail):
+            digest.update(row.encode())
+        return latest, digest.hexdigest()
+
+class TableWriter:
+    """
+    Batched, concurrent, retried inserts or upserts into one table.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        table: str,
+        upsert_key: str = "invoice_id",
+        batch_size: int = 500,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.client = client
+        self.table = table
+        self.upsert_key = upsert_key
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def delete_all(self, column: str = "customer_id"):
+        _execute(self.client.table(self.table).delete().neq(column, ""), "delete")
+
+    def write(self, df, upsert: bool = True) -> float:
+        """
+        Uploads df (or each chunk of an iterable of frames) in batches with up to
+        max_concurrency requests in flight.
+
+        The next batch is serialized on the calling thread while earlier ones are
+        uploading.
+
+        :param upsert: Write each batch as an upsert on the upsert key, so a
+                       retried batch never duplicates rows; this needs a unique
+                       constraint on that column. With False batches are plain
+                       inserts, which work on any table (e.g. right after
+                       delete_all), but a batch whose response is lost after
+                       the server committed it is inserted again on retry.
+        :return: Upload throughput in rows/sec
+        """
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        start = time.perf_counter()
+        max_queued = 2 * self.max_concurrency
+        total_rows = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            in_flight = set()
+            for frame in frames:
+                for i in range(0, len(frame), self.batch_size):
+                    batch = frame.iloc[i:i+self.batch_size].to_dict(orient="records")
+                    in_flight.add(pool.submit(self._send_batch, batch, total_rows, upsert))
+                    total_rows += len(batch)
+
+                    if len(in_flight) >= max_queued:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+
+            for future in in_flight:
+                future.result()
+
+        elapsed = time.perf_counter() - start
+        rows_per_sec = total_rows / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"Uploaded {total_rows} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+        return rows_per_sec
+
+    def _send_batch(self, batch: list, offset: int, upsert: bool = True) -> int:
+        """
+        Inserts or upserts one batch, retrying with exponential backoff on failure.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                table = self.client.table(self.table)
+                if upsert:
+                    _execute(table.upsert(batch, on_conflict=self.upsert_key), "upsert")
+                else:
+                    _execute(table.insert(batch), "insert")
+                return len(batch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(
+                    f"Batch at offset {offset} failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}. "
+                    f"Retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
@@ -1,13 +1,19 @@
+import json
+import os
+
 import pandas as pd
-from supabase import create_client, Client
+import pyarrow.parquet as pq
+from supabase import Client
 from config.config_loader import load_config
+from src.data_access import get_client, ColumnarFrameBuilder, TableReader
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
+from utils.schema import CATEGORICAL_COLUMNS
 
 logger = get_logger(__name__)
 
 class SupabaseIngestor:
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, client: Client = None):
         config = load_config(config_path)
         sb_config = config['supabase']
 
@@ -15,35 +21,62 @@ class SupabaseIngestor:
         self.supabase_key = sb_config['key']
         self.transformed_table_name = sb_config['transformed_table_name']
 
-        self.client: Client = create_client(self.supabase_url, self.supabase_key)
+        cache_config = config.get('ingestion', {})
+        self.cache_enabled = cache_config.get('cache_enabled', False)
+        self.cache_dir = cache_config.get('cache_dir', 'artifacts/cache')
+        self.checksum_rows = cache_config.get('checksum_rows', 1000)
+
+        self.client: Client = client if client is not None else get_client(self.supabase_url, self.supabase_key, config_path)
+        self.reader = TableReader(self.client, self.transformed_table_name)
+
+    def load_data(self, batch_size: int = 1000, use_cache: bool = None) -> pd.DataFrame:
+        """
+        Loads the transformed table, serving it from the local Parquet snapshot
+        when the table's freshness token (row count, max invoice_date and a
+        checksum of the most recent rows) is unchanged.
+
+        :param batch_size: Rows per page when fetching from Supabase
+        :param use_cache: Overrides ingestion.cache_enabled from config
+        """
+        use_cache = self.cache_enabled if use_cache is None else use_cache
 
-    def load_data(self, batch_size: int = 1000) -> pd.DataFrame:
+        token = None
+        if use_cache:
+            token = self._freshness_token()
+            cached = self._read_cache(token)
+            if cached is not None:
+                return cached
+
+        df = self._fetch_all(batch_size)
+
+        if use_cache and not df.empty:
+            self._write_cache(df, token)
+        return df
+
+    def _fetch_all(self, batch_size: int) -> pd.DataFrame:
         try:
             logger.info(f"Fetching data from Supabase table: {self.transformed_table_name}")
-            all_data = []
+            # Pages are converted to typed columns as they arrive (see ColumnarFrameBuilder)
+            builder = ColumnarFrameBuilder()
             offset = 0
 
-            while True:
-                response = (
-                    self.client.table(self.transformed_table_name)
-                    .select("*")
-                    .range(offset, offset + batch_size - 1)
-                    .execute()
-                )
-
-                data_batch = response.data
-                if not data_batch:
-                    break
-
-                all_data.extend(data_batch)
+            for data_batch in self.reader.iter_pages(page_size=batch_size):
+                builder.append(data_batch)
                 logger.info(f"Fetched batch with {len(data_batch)} records (offset: {offset})")
                 offset += batch_size
 
-            if not all_data:
+            if builder.n_rows == 0:
                 logger.warning("No data returned from Supabase.")
                 return pd.DataFrame()
 
-            df = pd.DataFrame(all_data)
+            df = builder.build()
+
+            # Keep the low-cardinality text columns as small integer codes through
+            # feature engineering and preprocessing
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns:
+                    df[col] = df[col].astype("category")
+
             logger.info(f"Ingested total of {len(df)} records from Supabase.")
             return df
 
@@ -51,6 +84,62 @@ class SupabaseIngestor:
             logger.error("Failed to ingest data from Supabase.")
             raise ProjectBaseError("Supabase ingestion failed.") from e
 
+    def _freshness_token(self) -> dict:
+        """
+        Cheap change detector for the transformed table: a count and one page of
+        the most recent rows instead of a full download (see TableReader.change_token).
+        """
+        try:
+            token = self.reader.change_token("invoice_date", tail_rows=self.checksum_rows)
+        except Exception as e:
+            logger.error("Failed to read freshness token from Supabase.")
+            raise ProjectBaseError("Supabase ingestion failed.") from e
+
+        return {"table": self.transformed_table_name, **token}
+
+    def _cache_paths(self):
+        base = os.path.join(self.cache_dir, self.transformed_table_name)
+        return f"{base}.parquet", f"{base}.meta.json"
+
+    def _read_cache(self, token: dict):
+        data_path, meta_path = self._cache_paths()
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            logger.info("No local snapshot found; fetching from Supabase.")
+            return None
+
+        try:
+            with open(meta_path, "r") as f:
+                cached_token = json.load(f)
+            if cached_token != token:
+                logger.info(f"Local snapshot is stale ({cached_token} != {token}); re-fetching.")
+                return None
+
+            # Memory-mapped read: pages come from the OS page cache on repeat runs
+            df = pq.read_table(data_path, memory_map=True).to_pandas()
+            logger.info(f"Loaded {len(df)} records from local snapshot: {data_path}")
+            return df
+
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable local snapshot at {data_path}: {e}")
+            return None
+
+    def _write_cache(self, df: pd.DataFrame, token: dict):
+        data_path, meta_path = self._cache_paths()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            # Write data before metadata so a crash can only leave a stale token
+            df.to_parquet(f"{data_path}.tmp", engine="pyarrow", index=False)
+            os.replace(f"{data_path}.tmp", data_path)
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump(token, f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+
+            logger.info(f"Saved local snapshot of {len(df)} records to: {data_path}")
+
+        except Exception as e:
+            logger.warning(f"Could not write local snapshot to {data_path}: {e}")
+
 
 if __name__ == "__main__":
     config_path = "src/config/config.yaml"  # Update if different
@@ -1,14 +1,46 @@
 # src/feature_engineering.py
 
+import numpy as np
 import pandas as pd
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
 
 logger = get_logger(__name__)
 
+NS_PER_DAY = 86_400 * 10**9
+
 class FeatureEngineer:
-    def __init__(self):
-        pass
+    def __init__(self, feature_store=None):
+        """
+        :param feature_store: Optional CustomerFeatureStore holding running
+                              per-customer aggregates
+        """
+        self.feature_store = feature_store
+
+    def refresh_feature_store(self, df: pd.DataFrame) -> int:
+        """
+        Folds only the transactions the feature store has not seen yet into it.
+        :return: Number of new transactions applied
+        """
+        if self.feature_store is None:
+            raise ProjectBaseError("No feature store configured for FeatureEngineer.")
+
+        logger.info("Refreshing customer feature store.")
+        return self.feature_store.update(df)
+
+    def lookup_customer_aggregates(self, customer_ids) -> pd.DataFrame:
+        """
+        Reads stored aggregates by customer key and derives mean/std spend from them.
+        """
+        if self.feature_store is None:
+            raise ProjectBaseError("No feature store configured for FeatureEngineer.")
+
+        aggregates = self.feature_store.lookup(customer_ids).copy()
+        counts = aggregates['count']
+        aggregates['monetary_mean'] = aggregates['total'] / counts
+        variance = (aggregates['sum_sq'] - counts * aggregates['monetary_mean'] ** 2) / (counts - 1)
+        aggregates['monetary_std'] = np.sqrt(variance.clip(lower=0)).where(counts > 1, 0.0)
+        return aggregates
 
     def add_clv_feature(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -17,10 +49,15 @@ class FeatureEngineer:
         try:
             logger.info("Starting feature engineering: Calculating CLV.")
 
-            clv_df = df.groupby('customer_id')['purchase_amount'].sum().reset_index()
-            clv_df.rename(columns={'purchase_amount': 'customer_lifetime_value'}, inplace=True)
+            # Segment sum over integer customer codes, broadcast back by position
+            # (no groupby/merge round trip); rows without a customer_id get NaN
+            codes, customers = pd.factorize(df['customer_id'])
+            known = codes >= 0
+            amounts = df['purchase_amount'].to_numpy(dtype=float)
+            totals = np.bincount(codes[known], weights=amounts[known], minlength=len(customers))
 
-            df = df.merge(clv_df, on='customer_id', how='left')
+            df = df.copy()
+            df['customer_lifetime_value'] = pd.api.extensions.take(totals, codes, allow_fill=True)
 
             logger.info("Feature 'customer_lifetime_value' added successfully.")
             return df
@@ -28,3 +65,112 @@ class FeatureEngineer:
         except Exception as e:
             logger.error("CLV calculation failed.")
             raise ProjectBaseError("CLV calculation failed.") from e
+
+    def compute_customer_features(self, df: pd.DataFrame, reference_date=None) -> pd.DataFrame:
+        """
+        Computes per-customer RFM-style features in one sort plus NumPy segment
+        reductions (linear in the number of transactions, no Python loops):
+
+        - frequency, monetary_total, monetary_mean, monetary_std
+        - recency_days (from reference_date), tenure_days, first/last purchase
+        - interpurchase_gap_mean / interpurchase_gap_std (days)
+        - share_<category>: fraction of spend per product_category
+
+        Library helper for analysis and future models: the training pipeline
+        does not use these columns, since monetary_total (and frequency *
+        monetary_mean) reproduce the CLV target exactly.
+
+        :param df: Transactions with customer_id, invoice_date, purchase_amount, product_category
+        :param reference_date: Date recency is measured from; defaults to the latest invoice_date
+        :return: DataFrame with one row per customer_id
+        """
+        try:
+            logger.info("Starting feature engineering: Calculating customer RFM features.")
+
+            # pd.factorize codes a missing id as -1, which would index the last customer
+            known = df['customer_id'].notna()
+            if not known.all():
+                logger.warning(f"Ignoring {int((~known).sum())} transactions without a customer_id.")
+                df = df.loc[known]
+
+            codes, customers = pd.factorize(df['customer_id'], sort=True)
+            n_customers = len(customers)
+            amounts = df['purchase_amount'].to_numpy(dtype=float)
+            dates = pd.to_datetime(df['invoice_date']).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+            # Single sort by (customer, date); every segment below is contiguous
+            order = np.lexsort((dates, codes))
+            codes_s, dates_s, amounts_s = codes[order], dates[order], amounts[order]
+            starts = np.flatnonzero(np.r_[True, codes_s[1:] != codes_s[:-1]])
+            ends = np.r_[starts[1:], len(codes_s)]
+
+            frequency = ends - starts
+            monetary_total = np.add.reduceat(amounts_s, starts)
+            monetary_mean = monetary_total / frequency
+
+            # Two-pass sample std for numerical stability; single purchases get 0
+            sq_dev = np.add.reduceat((amounts_s - np.repeat(monetary_mean, frequency)) ** 2, starts)
+            monetary_std = np.sqrt(np.divide(sq_dev, frequency - 1, out=np.zeros(n_customers), where=frequency > 1))
+
+            first_ns, last_ns = dates_s[starts], dates_s[ends - 1]
+            reference_ns = (
+                pd.Timestamp(reference_date).value if reference_date is not None else dates_s.max()
+            )
+            recency_days = (reference_ns - last_ns) / NS_PER_DAY
+            tenure_days = (last_ns - first_ns) / NS_PER_DAY
+
+            # Gaps between consecutive purchases of the same customer
+            gaps = np.diff(dates_s) / NS_PER_DAY
+            same_customer = codes_s[1:] == codes_s[:-1]
+            gap_codes, gaps = codes_s[1:][same_customer], gaps[same_customer]
+            n_gaps = frequency - 1
+            gap_mean = np.divide(tenure_days, n_gaps, out=np.zeros(n_customers), where=n_gaps > 0)
+            gap_sq_dev = np.bincount(gap_codes, weights=(gaps - gap_mean[gap_codes]) ** 2, minlength=n_customers)
+            gap_std = np.sqrt(np.divide(gap_sq_dev, n_gaps - 1, out=np.zeros(n_customers), where=n_gaps > 1))
+
+            features = pd.DataFrame({
+                'customer_id': customers,
+                'frequency': frequency,
+                'monetary_total': monetary_total,
+                'monetary_mean': monetary_mean,
+                'monetary_std': monetary_std,
+                'recency_days': recency_days,
+                'tenure_days': tenure_days,
+                'first_purchase': pd.to_datetime(first_ns),
+                'last_purchase': pd.to_datetime(last_ns),
+                'interpurchase_gap_mean': gap_mean,
+                'interpurchase_gap_std': gap_std,
+            })
+
+            # Spend share per category from one bincount over (customer, category) cells
+            cat_codes, categories = pd.factorize(df['product_category'], sort=True, use_na_sentinel=False)
+            spend = np.bincount(
+                codes * len(categories) + cat_codes, weights=amounts, minlength=n_customers * len(categories)
+            ).reshape(n_customers, len(categories))
+            shares = np.divide(spend, monetary_total[:, None], out=np.zeros_like(spend), where=monetary_total[:, None] != 0)
+            for i, category in enumerate(categories):
+                features[f'share_{category}'] = shares[:, i]
+
+            logger.info(f"Computed {features.shape[1] - 1} features for {n_customers} customers.")
+            return features
+
+        except Exception as e:
+            logger.error("Customer feature calculation failed.")
+            raise ProjectBaseError("Customer feature calculation failed.") from e
+
+    def add_customer_features(self, df: pd.DataFrame, reference_date=None) -> pd.DataFrame:
+        """
+        Broadcasts the per-customer features from compute_customer_features onto
+        every transaction row by positional take (no merge). Rows without a
+        customer_id get missing values. Not called by run_feature_engineering;
+        see compute_customer_features.
+        """
+        features = self.compute_customer_features(df, reference_date)
+
+        # Feature rows are ordered by the same sorted customer codes (-1 = no id)
+        positions, _ = pd.factorize(df['customer_id'], sort=True)
+
+        df = df.copy()
+        for col in features.columns.drop('customer_id'):
+            df[col] = pd.api.extensions.take(features[col].to_numpy(), positions, allow_fill=True)
+        return df
@@ -0,0 +1,193 @@
+# src/feature_store.py
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.logger import get_logger
+from utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+WATERMARK_KEY = b"clv.feature_store.watermark"
+
+class CustomerFeatureStore:
+    """
+    Persistent per-customer running aggregates, keyed by customer_id (as a string).
+
+    Updates only fold in transactions newer than the store's watermark, so a
+    daily refresh costs time proportional to the new rows, and lookups by
+    customer key are hash-index reads.
+    """
+
+    def __init__(self, path: str = "artifacts/feature_store"):
+        self.path = path
+        self.data_path = os.path.join(path, "customer_aggregates.parquet")
+
+        self.aggregates = self._empty()
+        self.watermark = None  # {"invoice_date": ISO timestamp, "invoice_ids": [ids on that date]}
+
+        if os.path.exists(self.data_path):
+            self._load()
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Folds transactions that are not yet in the store into the aggregates and
+        persists the result. Rows at or before the watermark are skipped, so
+        passing the full table again is safe.
+
+        :param df: Transactions with customer_id, invoice_id, invoice_date, purchase_amount
+        :return: Number of new transactions applied
+        """
+        try:
+            dates = pd.to_datetime(df["invoice_date"])
+            new_rows = self._unseen_mask(df, dates)
+            delta = df.loc[new_rows]
+            delta_dates = dates[new_rows]
+
+            if delta.empty:
+                logger.info("Feature store is up to date; no new transactions.")
+                return 0
+
+            self.aggregates = self._merge(self.aggregates, self._aggregate(delta, delta_dates))
+            self._advance_watermark(delta, delta_dates)
+            self._save()
+
+            logger.info(
+                f"Feature store updated with {len(delta)} transactions; "
+                f"{len(self.aggregates)} customers stored."
+            )
+            return len(delta)
+
+        except Exception as e:
+            logger.error(f"Feature store update failed: {e}")
+            raise ProjectBaseError(f"Feature store update failed: {e}")
+
+    def get(self, customer_id):
+        """
+        Returns the aggregates and derived features for one customer, or None.
+        """
+        customer_id = str(customer_id)
+        if customer_id not in self.aggregates.index:
+            return None
+        row = self.aggregates.loc[customer_id]
+        return {**row.to_dict(), "mean_amount": row["total"] / row["count"]}
+
+    def lookup(self, customer_ids) -> pd.DataFrame:
+        """
+        Vectorized lookup; unknown customers come back as NaN rows.
+        """
+        return self.aggregates.reindex(pd.Index(customer_ids, name="customer_id").astype(str))
+
+    def customer_lifetime_values(self) -> pd.Series:
+        return self.aggregates["total"].rename("customer_lifetime_value")
+
+    def _unseen_mask(self, df: pd.DataFrame, dates: pd.Series) -> np.ndarray:
+        if self.watermark is None:
+            return np.ones(len(df), dtype=bool)
+
+        # Ids are stored as strings (see _advance_watermark), so compare them as strings
+        last_date = pd.Timestamp(self.watermark["invoice_date"])
+        seen_on_last_date = df["invoice_id"].astype(str).isin(self.watermark["invoice_ids"])
+
+        late = dates < last_date
+        if late.any():
+            logger.warning(
+                f"Skipping {int(late.sum())} transactions dated before the feature store watermark "
+                f"({self.watermark['invoice_date']}); they are only counted after a rebuild."
+            )
+        return ((dates > last_date) | ((dates == last_date) & ~seen_on_last_date)).to_numpy()
+
+    @staticmethod
+    def _aggregate(delta: pd.DataFrame, dates: pd.Series) -> pd.DataFrame:
+        codes, customers = pd.factorize(delta["customer_id"].astype(str))
+        amounts = delta["purchase_amount"].to_numpy(dtype=float)
+        date_ns = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        n = len(customers)
+
+        min_amount = np.full(n, np.inf)
+        max_amount = np.full(n, -np.inf)
+        first_ns = np.full(n, np.iinfo(np.int64).max)
+        last_ns = np.full(n, np.iinfo(np.int64).min)
+        np.minimum.at(min_amount, codes, amounts)
+        np.maximum.at(max_amount, codes, amounts)
+        np.minimum.at(first_ns, codes, date_ns)
+        np.maximum.at(last_ns, codes, date_ns)
+
+        return pd.DataFrame({
+            "count": np.bincount(codes, minlength=n),
+            "total": np.bincount(codes, weights=amounts, minlength=n),
+            "sum_sq": np.bincount(codes, weights=amounts ** 2, minlength=n),
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "first_purchase": pd.to_datetime(first_ns),
+            "last_purchase": pd.to_datetime(last_ns),
+        }, index=pd.Index(customers, name="customer_id"))
+
+    @staticmethod
+    def _merge(store: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+        """
+        Combines delta aggregates into the store, touching only the delta's customers.
+        """
+        known = delta.index.isin(store.index)
+        existing, added = delta[known], delta[~known]
+
+        if len(existing):
+            current = store.loc[existing.index]
+            store.loc[existing.index, "count"] = current["count"] + existing["count"]
+            store.loc[existing.index, "total"] = current["total"] + existing["total"]
+            store.loc[existing.index, "sum_sq"] = current["sum_sq"] + existing["sum_sq"]
+            store.loc[existing.index, "min_amount"] = np.minimum(current["min_amount"], existing["min_amount"])
+            store.loc[existing.index, "max_amount"] = np.maximum(current["max_amount"], existing["max_amount"])
+            store.loc[existing.index, "first_purchase"] = np.minimum(current["first_purchase"], existing["first_purchase"])
+            store.loc[existing.index, "last_purchase"] = np.maximum(current["last_purchase"], existing["last_purchase"])
+
+        if len(added):
+            store = added.copy() if store.empty else pd.concat([store, added])
+        return store
+
+    def _advance_watermark(self, delta: pd.DataFrame, dates: pd.Series):
+        last_date = dates.max()
+        last_ids = delta.loc[dates == last_date, "invoice_id"].astype(str).tolist()
+
+        if self.watermark is not None and pd.Timestamp(self.watermark["invoice_date"]) == last_date:
+            last_ids = sorted(set(self.watermark["invoice_ids"]) | set(last_ids))
+        self.watermark = {"invoice_date": last_date.isoformat(), "invoice_ids": last_ids}
+
+    def _load(self):
+        try:
+            table = pq.read_table(self.data_path)
+            self.aggregates = table.to_pandas()
+            self.watermark = json.loads(table.schema.metadata[WATERMARK_KEY])
+            logger.info(f"Loaded feature store with {len(self.aggregates)} customers from {self.path}")
+        except Exception as e:
+            raise ProjectBaseError(f"Could not load feature store at {self.path}: {e}")
+
+    def _save(self):
+        # The watermark lives in the Parquet schema metadata so aggregates and
+        # watermark are replaced atomically; a crash can never double-count a delta
+        table = pa.Table.from_pandas(self.aggregates)
+        metadata = {**(table.schema.metadata or {}), WATERMARK_KEY: json.dumps(self.watermark).encode()}
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(self.path, exist_ok=True)
+        pq.write_table(table, f"{self.data_path}.tmp")
+        os.replace(f"{self.data_path}.tmp", self.data_path)
+
+    @staticmethod
+    def _empty() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "count": pd.Series(dtype="int64"),
+                "total": pd.Series(dtype="float64"),
+                "sum_sq": pd.Series(dtype="float64"),
+                "min_amount": pd.Series(dtype="float64"),
+                "max_amount": pd.Series(dtype="float64"),
+                "first_purchase": pd.Series(dtype="datetime64[ns]"),
+                "last_purchase": pd.Series(dtype="datetime64[ns]"),
+            },
+            index=pd.Index([], name="customer_id"),
+        )
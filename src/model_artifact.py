@@ -0,0 +1,125 @@
+# model_artifact.py
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+
+from src.compiled_model import FeatureLayout, NUMERIC_FEATURE, flatten_forest, traverse
+from src.utils.logger import get_logger
+from src.utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+FORMAT_VERSION = 1
+NODE_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+def save_model_arrays(model, preprocessor, out_dir: str = "artifacts/model_arrays"):
+    """
+    Writes a fitted forest as a directory of flat .npy node arrays plus a
+    manifest.json holding the format version and the preprocessor vocabulary.
+
+    The directory is built next to out_dir and swapped in with a rename, so
+    readers never see a half-written model.
+    """
+    nodes = flatten_forest(model)
+    layout = FeatureLayout.from_preprocessor(preprocessor)
+
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name in NODE_ARRAYS:
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(nodes[name]))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_type": type(model).__name__,
+        "n_trees": int(len(nodes["roots"])),
+        "n_nodes": int(len(nodes["value"])),
+        "layout": layout.to_dict(),
+        "arrays": {name: {"dtype": str(nodes[name].dtype), "shape": list(nodes[name].shape)} for name in NODE_ARRAYS},
+        "sklearn_version": sklearn.__version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    old_dir = f"{out_dir}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    logger.info(f"Model arrays ({manifest['n_trees']} trees, {manifest['n_nodes']} nodes) saved to: {out_dir}")
+
+class ArrayForestModel:
+    """
+    Read-only forest backed by memory-mapped .npy node arrays.
+
+    Loading only maps files, so cold start is milliseconds and every process
+    that loads the same directory shares one page-cached copy. predict() is a
+    drop-in for RandomForestRegressor.predict on preprocessed input;
+    predict_frame() scores raw feature rows using the stored vocabulary, without
+    the pickled preprocessor.
+    """
+
+    def __init__(self, nodes: dict, layout: FeatureLayout, manifest: dict):
+        self.nodes = nodes
+        self.layout = layout
+        self.manifest = manifest
+
+    @classmethod
+    def load(cls, model_dir: str = "artifacts/model_arrays") -> "ArrayForestModel":
+        manifest_path = os.path.join(model_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Model arrays not found at {model_dir}")
+
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ProjectBaseError(
+                f"Unsupported model array format {manifest.get('format_version')} (expected {FORMAT_VERSION})"
+            )
+
+        nodes = {name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r") for name in NODE_ARRAYS}
+        for name, spec in manifest["arrays"].items():
+            if list(nodes[name].shape) != spec["shape"] or str(nodes[name].dtype) != spec["dtype"]:
+                raise ProjectBaseError(
+                    f"Model array {name} is {nodes[name].dtype}{list(nodes[name].shape)}, "
+                    f"manifest expects {spec['dtype']}{spec['shape']}"
+                )
+        return cls(nodes, FeatureLayout(**manifest["layout"]), manifest)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.layout.n_features
+
+    def predict(self, X) -> np.ndarray:
+        if sp.issparse(X):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float32)
+        return traverse(self.nodes, X).mean(axis=1)
+
+    def predict_frame(self, input_data: pd.DataFrame) -> np.ndarray:
+        amounts = self.layout.scale_amounts(input_data[NUMERIC_FEATURE].to_numpy(dtype=np.float64))
+        X = self.layout.encode(amounts, self.layout.category_codes(input_data))
+        return traverse(self.nodes, X).mean(axis=1)
+
+    def verify_parity(self, model, preprocessor, input_data: pd.DataFrame, atol: float = 1e-6) -> float:
+        """
+        Compares predict_frame against preprocessor.transform + model.predict on input_data.
+        :return: Maximum absolute difference; raises ProjectBaseError above atol
+        """
+        expected = model.predict(preprocessor.transform(input_data))
+        max_diff = float(np.max(np.abs(self.predict_frame(input_data) - expected))) if len(input_data) else 0.0
+        logger.info(f"Model arrays parity on {len(input_data)} rows: max abs diff = {max_diff:.3g}")
+        if max_diff > atol:
+            raise ProjectBaseError(f"Model arrays deviate from model.predict by {max_diff}")
+        return max_diff
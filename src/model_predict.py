@@ -3,16 +3,29 @@
 import os
 import joblib
 import pandas as pd
+from src.config.config_loader import load_config
+from src.artifact_registry import get_artifact_registry, load_manifest_artifacts
+from src.model_artifact import ArrayForestModel
+from src.prediction_cache import PredictionCache
+from src.utils.exceptions import ArtifactMismatchError
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 MODEL_PATH = "artifacts/model.pkl"
+MODEL_ARRAYS_PATH = "artifacts/model_arrays"
 PREPROCESSOR_PATH = "artifacts/preprocessor.pkl"
+MANIFEST_PATH = "artifacts/manifest.json"
+CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+
+_prediction_cache = None
 
 def load_model(path=MODEL_PATH):
     if not os.path.exists(path):
         raise FileNotFoundError(f"Model not found at {path}")
+    if os.path.isdir(path):
+        # Memory-mapped array format written by save_model_arrays
+        return ArrayForestModel.load(path)
     return joblib.load(path)
 
 def load_preprocessor(path=PREPROCESSOR_PATH):
@@ -20,16 +33,96 @@ def load_preprocessor(path=PREPROCESSOR_PATH):
         raise FileNotFoundError(f"Preprocessor not found at {path}")
     return joblib.load(path)
 
+def get_model(path=MODEL_PATH):
+    """
+    Process-wide model instance; reloaded only when the file's content changes.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model not found at {path}")
+    return get_artifact_registry().get(path, load_model)
+
+def get_preprocessor(path=PREPROCESSOR_PATH):
+    """
+    Process-wide preprocessor instance; reloaded only when the file's content changes.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Preprocessor not found at {path}")
+    return get_artifact_registry().get(path, load_preprocessor)
+
+def load_model_pair(manifest_path=MANIFEST_PATH):
+    """
+    Loads the model and preprocessor listed in the artifact manifest.
+    :return: (model, preprocessor) saved by the same training run
+    """
+    loaded = load_manifest_artifacts(manifest_path, joblib.load)
+    logger.info(f"Loaded model/preprocessor pair {loaded['version']}")
+    return loaded["model"], loaded["preprocessor"]
+
+def get_model_pair(manifest_path=MANIFEST_PATH):
+    """
+    Process-wide (model, preprocessor) pair; both are reloaded together when
+    the manifest changes, so a prediction never mixes two training runs.
+    Artifacts saved without a manifest are loaded one by one.
+    """
+    if not os.path.exists(manifest_path):
+        return get_model(), get_preprocessor()
+
+    registry = get_artifact_registry()
+    try:
+        return registry.get(manifest_path, load_model_pair)
+    except ArtifactMismatchError as e:
+        # Files were replaced but their manifest is not written yet: keep the current pair
+        current = registry.peek(manifest_path)
+        if current is None:
+            raise
+        logger.warning(f"{e}; serving the previously loaded pair.")
+        return current
+
 def preprocess_input(data: pd.DataFrame, preprocessor):
     logger.info("Preprocessing input data...")
     return preprocessor.transform(data)
 
-def predict_clv(input_data: pd.DataFrame):
-    logger.info("Loading model and preprocessor...")
-    model = load_model()
-    preprocessor = load_preprocessor()
+def get_prediction_cache():
+    """
+    Returns the process-wide prediction cache, or None if disabled in config.
+    """
+    global _prediction_cache
+    if _prediction_cache is None:
+        cache_config = load_config(CONFIG_PATH).get("prediction_cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        _prediction_cache = PredictionCache(
+            max_size=cache_config.get("max_size", 10_000),
+            ttl_seconds=cache_config.get("ttl_seconds", 3600),
+            amount_bucket=cache_config.get("amount_bucket"),
+            # The manifest changes only once a new pair is complete, so entries
+            # computed from the previous pair are dropped when it does
+            artifact_paths=(MANIFEST_PATH, MODEL_PATH, PREPROCESSOR_PATH),
+        )
+    return _prediction_cache
+
+def reset_model_state():
+    """
+    Forgets the loaded model/preprocessor and the prediction cache, e.g. after
+    switching to another artifacts directory.
+    """
+    global _prediction_cache
+    _prediction_cache = None
+    get_artifact_registry().clear()
+
+def _predict_uncached(input_data: pd.DataFrame):
+    model, preprocessor = get_model_pair()
 
     X_processed = preprocess_input(input_data, preprocessor)
     prediction = model.predict(X_processed)
 
     return prediction
+
+def predict_clv(input_data: pd.DataFrame, use_cache: bool = True):
+    cache = get_prediction_cache() if use_cache else None
+    if cache is None:
+        return _predict_uncached(input_data)
+
+    prediction = cache.predict(input_data, _predict_uncached)
+    logger.info(f"Prediction cache: {cache.stats()}")
+    return prediction
@@ -0,0 +1,94 @@
+# model_search.py
+
+import math
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import ParameterSampler
+
+from src.training_scheduler import available_cores, cross_validate_candidates
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def successive_halving_search(
+    X,
+    y,
+    param_space: dict,
+    n_candidates: int = 10,
+    cv: int = 3,
+    factor: int = 3,
+    min_resource: float = 0.1,
+    time_budget_s: float = None,
+    random_state: int = 42,
+    n_jobs: int = -1,
+):
+    """
+    Budget-aware successive halving over RandomForestRegressor hyperparameters.
+
+    All candidates are first cross-validated on a min_resource fraction of the
+    training rows; after each round only the best 1/factor survive and the
+    subsample grows by factor until the full training set is reached. Once
+    time_budget_s of wall-clock time is spent no further candidates are fitted,
+    and the best candidate at the largest resource reached wins.
+
+    Each round's (candidate, fold) fits run in parallel through
+    cross_validate_candidates, which splits n_jobs cores between concurrent
+    fits and trees per forest.
+
+    :return: (best estimator refitted on all of X, list of per-candidate results)
+    """
+    rng = np.random.RandomState(random_state)
+    y = np.asarray(y)
+    n_rows = X.shape[0]
+
+    candidates = list(ParameterSampler(param_space, n_iter=n_candidates, random_state=random_state))
+    survivors = list(range(len(candidates)))
+    resource = max(cv * 2, int(math.ceil(min_resource * n_rows)))
+    results = []
+    start = time.perf_counter()
+    out_of_budget = False
+
+    for round_index in range(len(candidates)):
+        resource = min(resource, n_rows)
+        rows = np.sort(rng.choice(n_rows, size=resource, replace=False)) if resource < n_rows else slice(None)
+        X_round, y_round = X[rows], y[rows]
+        logger.info(f"Halving round {round_index}: {len(survivors)} candidates on {resource} rows")
+
+        deadline = start + time_budget_s if time_budget_s is not None else None
+        round_results = cross_validate_candidates(
+            X_round, y_round, [candidates[i] for i in survivors], cv=cv, n_jobs=n_jobs, deadline=deadline
+        )
+        out_of_budget = len(round_results) < len(survivors)
+
+        round_scores = {}
+        for result in round_results:
+            index = survivors[result["candidate"]]
+            round_scores[index] = result["mean_test_score"]
+            results.append({**result, "candidate": index, "round": round_index, "n_samples": resource})
+            logger.info(
+                f"Candidate {index} {candidates[index]}: score={result['mean_test_score']:.4f} "
+                f"on {resource} rows in {result['time_s']:.1f}s"
+            )
+
+        if round_scores:
+            best_index = max(round_scores, key=round_scores.get)
+
+        if out_of_budget:
+            logger.warning(f"Search time budget of {time_budget_s}s exhausted in round {round_index}; stopping early.")
+            break
+        if resource == n_rows or len(survivors) == 1:
+            break
+
+        ranked = sorted(round_scores, key=round_scores.get, reverse=True)
+        survivors = ranked[:max(1, math.ceil(len(ranked) / factor))]
+        resource *= factor
+
+    best_params = candidates[best_index]
+    logger.info(
+        f"Successive halving finished in {time.perf_counter() - start:.1f}s with {len(results)} candidate fits; "
+        f"refitting best {best_params} on {n_rows} rows"
+    )
+    best_estimator = RandomForestRegressor(random_state=42, n_jobs=available_cores(n_jobs), **best_params).fit(X, y)
+    return best_estimator, results
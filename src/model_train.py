@@ -3,81 +3,241 @@
 import os
 import joblib
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.model_selection import train_test_split, ParameterSampler
 from sklearn.metrics import root_mean_squared_error, r2_score
+from src.config.config_loader import load_config
 from src.monitoring.mlflow_helper import init_mlflow_tracking, log_model_with_metrics
+from src.artifact_registry import atomic_dump, write_manifest
+from src.compiled_model import FeatureLayout
+from src.model_search import successive_halving_search
+from src.retraining import (
+    build_training_snapshot,
+    load_training_snapshot,
+    min_new_rows,
+    needs_full_refit,
+    passes_update_gate,
+    save_training_snapshot,
+    warm_start_update,
+)
+from src.training_scheduler import available_cores, cross_validate_candidates
+from src.training_matrix import build_design_matrix, fit_preprocessor
+from src.utils.instrumentation import current_stage, peak_rss_mb, track_stage
 
 from run_feature_engineering import run_feature_engineering
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+CONFIG_PATH = os.path.join("src", "config", "config.yaml")
+MODEL_PATH = os.path.join("artifacts", "model.pkl")
+PREPROCESSOR_PATH = os.path.join("artifacts", "preprocessor.pkl")
+MANIFEST_PATH = os.path.join("artifacts", "manifest.json")
+
+DEFAULT_PARAM_SPACE = {
+    "n_estimators": [100, 200, 300],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+}
+
 def load_preprocessor(path="artifacts/preprocessor.pkl"):
     if not os.path.exists(path):
         raise FileNotFoundError(f"Preprocessor not found at {path}")
     return joblib.load(path)
 
-def train_model(X_train, y_train):
-    rf = RandomForestRegressor(random_state=42)
-
-    param_dist = {
-        "n_estimators": [100, 200, 300],
-        "max_depth": [None, 10, 20, 30],
-        "min_samples_split": [2, 5, 10],
-        "min_samples_leaf": [1, 2, 4],
-    }
-
-    search = RandomizedSearchCV(
-        rf,
-        param_distributions=param_dist,
-        n_iter=10,
-        cv=3,
-        scoring="neg_mean_squared_error",
-        random_state=42,
-        n_jobs=-1,
-        verbose=1
-    )
-
-    search.fit(X_train, y_train)
-    logger.info(f"Best hyperparameters: {search.best_params_}")
-    return search.best_estimator_
-
-def run_model_training():
-    logger.info("Starting model training...")
+def train_model(X_train, y_train, search_config=None):
+    """
+    Tunes and fits the RandomForest.
+    :param search_config: training.search section of config.yaml; mode "random"
+                          (random sampling, as RandomizedSearchCV) or "halving"
+                          (budgeted successive halving). Both cross-validate on
+                          the training scheduler using n_jobs cores.
+    :return: (best estimator, per-candidate search results)
+    """
+    search_config = search_config or {}
+    mode = search_config.get("mode", "random")
+    param_space = search_config.get("param_space", DEFAULT_PARAM_SPACE)
+
+    if mode == "halving":
+        best_model, results = successive_halving_search(
+            X_train,
+            y_train,
+            param_space,
+            n_candidates=search_config.get("n_candidates", 10),
+            cv=search_config.get("cv", 3),
+            factor=search_config.get("factor", 3),
+            min_resource=search_config.get("min_resource", 0.1),
+            time_budget_s=search_config.get("time_budget_s"),
+            random_state=search_config.get("random_state", 42),
+            n_jobs=search_config.get("n_jobs", -1),
+        )
+        logger.info(f"Best hyperparameters: {best_model.get_params()}")
+        return best_model, results
+
+    # Same candidates RandomizedSearchCV would sample, scored on the shared scheduler
+    n_jobs = search_config.get("n_jobs", -1)
+    candidates = list(ParameterSampler(
+        param_space, n_iter=search_config.get("n_candidates", 10), random_state=search_config.get("random_state", 42)
+    ))
+    results = cross_validate_candidates(X_train, y_train, candidates, cv=search_config.get("cv", 3), n_jobs=n_jobs)
+    for result in results:
+        result.update({"round": 0, "n_samples": X_train.shape[0]})
+
+    best_params = max(results, key=lambda r: r["mean_test_score"])["params"]
+    logger.info(f"Best hyperparameters: {best_params}")
+
+    best_model = RandomForestRegressor(random_state=42, n_jobs=available_cores(n_jobs), **best_params)
+    best_model.fit(X_train, y_train)
+    return best_model, results
+
+def run_model_training(mode: str = None):
+    """
+    :param mode: "full" (search + refit on all history) or "incremental" (add
+                 trees for rows newer than the last training snapshot);
+                 defaults to training.retrain.mode in config.yaml
+    """
+    retrain_config = load_config(CONFIG_PATH).get("training", {}).get("retrain", {})
+    mode = mode or retrain_config.get("mode", "full")
+    logger.info(f"Starting model training ({mode})...")
     init_mlflow_tracking()  # Local or remote
 
-    df = run_feature_engineering()
-    logger.info(f"Data shape: {df.shape}")
-
-    X = df.drop(["customer_lifetime_value", "invoice_date", "invoice_id", "customer_id"], axis=1)
-    y = df["customer_lifetime_value"]
-
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    preprocessor = load_preprocessor()
-    X_train_processed = preprocessor.fit_transform(X_train)
-    X_test_processed = preprocessor.transform(X_test)
+    with track_stage("training", mode=mode):
+        df = run_feature_engineering()
+        logger.info(f"Data shape: {df.shape}")
+
+        if mode == "incremental":
+            result = run_incremental_training(df, retrain_config)
+            if result is not None:
+                return result
+
+        return run_full_training(df)
+
+def _split_features(df, layout, rows=None):
+    """
+    :return: (float32 design matrix, target) in the given row order
+    """
+    X = build_design_matrix(df, layout, rows)
+    y = df["customer_lifetime_value"].to_numpy(dtype=np.float64)
+    return X, (y if rows is None else y[rows])
+
+def _stage_records():
+    # Stages finished so far in the enclosing "training" stage, for the MLflow run
+    stage = current_stage()
+    return stage.records if stage is not None else None
+
+def _save_model(model, preprocessor):
+    """
+    Replaces model.pkl and preprocessor.pkl (each via a temp file and
+    os.replace), then writes the manifest that pairs them. Readers reload both
+    when the manifest changes (see model_predict.get_model_pair).
+
+    The memory-mapped array copy is not written here; run_export_model.py
+    builds and checks it on demand.
+    """
+    atomic_dump(model, MODEL_PATH)
+    atomic_dump(preprocessor, PREPROCESSOR_PATH)
+    logger.info(f"Model saved to {MODEL_PATH}, preprocessor to {PREPROCESSOR_PATH}")
+
+    write_manifest(MANIFEST_PATH, {"model": MODEL_PATH, "preprocessor": PREPROCESSOR_PATH})
+
+def run_full_training(df):
+    # Same split as train_test_split on the frame, but the matrix is built once
+    # in train-then-test order so both halves are views, not copies
+    train_rows, test_rows = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42)
+
+    with track_stage("fit_preprocessor", rows=len(train_rows)):
+        preprocessor = fit_preprocessor(load_preprocessor(), df, train_rows)
+    with track_stage("design_matrix", rows=len(df)):
+        X, y = _split_features(df, FeatureLayout.from_preprocessor(preprocessor), np.concatenate([train_rows, test_rows]))
+    X_train_processed, X_test_processed = X[:len(train_rows)], X[len(train_rows):]
+    y_train, y_test = y[:len(train_rows)], y[len(train_rows):]
 
     logger.info("Data transformed. Starting model training...")
-    best_model = train_model(X_train_processed, y_train)
+    search_config = load_config(CONFIG_PATH).get("training", {}).get("search", {})
+    with track_stage("search", rows=len(train_rows), search_mode=search_config.get("mode", "random")):
+        best_model, search_results = train_model(X_train_processed, y_train, search_config)
 
-    y_pred = best_model.predict(X_test_processed)
-    rmse = np.sqrt(root_mean_squared_error(y_test, y_pred))
-    r2 = r2_score(y_test, y_pred)
+    with track_stage("evaluate", rows=len(test_rows)):
+        y_pred = best_model.predict(X_test_processed)
+        rmse = np.sqrt(root_mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
 
-    metrics = {"rmse": rmse, "r2": r2}
+    metrics = {"rmse": rmse, "r2": r2, "peak_rss_mb": peak_rss_mb()}
     params = best_model.get_params()
 
-    log_model_with_metrics(best_model, params, metrics)
+    log_model_with_metrics(best_model, params, metrics, search_results=search_results, stage_metrics=_stage_records())
 
-    logger.info(f"RMSE: {rmse:.2f}, R2 Score: {r2:.2f}")
+    logger.info(f"RMSE: {rmse:.2f}, R2 Score: {r2:.2f}, peak RSS: {metrics['peak_rss_mb']:.0f} MB")
 
-    os.makedirs("artifacts", exist_ok=True)
-    joblib.dump(best_model, os.path.join("artifacts", "model.pkl"))
-    logger.info("Model saved to artifacts/model.pkl")
+    with track_stage("save_artifacts"):
+        _save_model(best_model, preprocessor)
+        save_training_snapshot(build_training_snapshot(df, best_model, root_mean_squared_error(y_test, y_pred)))
 
     return best_model, params, metrics
 
+def run_incremental_training(df, retrain_config: dict):
+    """
+    Warm-starts the saved forest with trees fitted on rows newer than the
+    training snapshot, reusing the fitted preprocessor. The update is saved
+    only if it passes the held-out RMSE gate.
+    :return: (model, params, metrics), or None when a full refit is needed
+    """
+    snapshot = load_training_snapshot()
+    if snapshot is None or not os.path.exists(MODEL_PATH):
+        logger.info("No previous model/training snapshot found; running a full refit.")
+        return None
+
+    model = joblib.load(MODEL_PATH)
+    new_df = df[pd.to_datetime(df["invoice_date"]) > pd.Timestamp(snapshot["data_watermark"])]
+    required = min_new_rows(snapshot, retrain_config)
+    if len(new_df) < required:
+        logger.info(
+            f"{len(new_df)} rows newer than {snapshot['data_watermark']} (need {required}); "
+            "keeping the current model until more arrive."
+        )
+        return model, model.get_params(), {}
+
+    preprocessor = load_preprocessor(PREPROCESSOR_PATH)
+    with track_stage("design_matrix", rows=len(new_df)):
+        X_processed, y = _split_features(new_df, FeatureLayout.from_preprocessor(preprocessor))
+
+    with track_stage("drift_check", rows=len(new_df)):
+        refit, reason = needs_full_refit(model, snapshot, df, new_df, X_processed, y, retrain_config)
+    if refit:
+        logger.warning(f"Full refit required: {reason}")
+        return None
+
+    X_train, X_test, y_train, y_test = train_test_split(X_processed, y, test_size=0.2, random_state=42)
+    trees_per_update = retrain_config.get("trees_per_update", 20)
+    with track_stage("warm_start", rows=len(y_train), trees_added=trees_per_update):
+        model = warm_start_update(model, X_train, y_train, trees_per_update)
+
+    with track_stage("evaluate", rows=len(y_test)):
+        y_pred = model.predict(X_test)
+        rmse = np.sqrt(root_mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        passed, holdout_rmse = passes_update_gate(model, X_test, y_test, snapshot, retrain_config)
+    if not passed:
+        # Nothing has been written yet; the saved model stays until the refit replaces it
+        logger.warning("Incremental update rejected; running a full refit instead.")
+        return None
+
+    metrics = {"rmse": rmse, "r2": r2, "holdout_rmse": holdout_rmse, "new_rows": len(new_df), "peak_rss_mb": peak_rss_mb()}
+    params = model.get_params()
+
+    log_model_with_metrics(
+        model, params, metrics, model_name="RandomForestRegressor-warm-start", stage_metrics=_stage_records()
+    )
+
+    logger.info(f"Incremental update on {len(new_df)} rows - RMSE: {rmse:.2f}, R2 Score: {r2:.2f}")
+
+    with track_stage("save_artifacts"):
+        _save_model(model, preprocessor)
+        save_training_snapshot(build_training_snapshot(df, model, snapshot["baseline_rmse"], previous=snapshot))
+
+    return model, params, metrics
+
 if __name__ == "__main__":
     run_model_training()
@@ -16,7 +16,39 @@ def init_mlflow_tracking(
     mlflow.set_tracking_uri(tracking_uri)
     mlflow.set_experiment(experiment_name)
 
-def log_model_with_metrics(model, params, metrics, model_name: str = "RandomForestRegressor"):
+def log_model_with_metrics(
+    model, params, metrics, model_name: str = "RandomForestRegressor", search_results=None, stage_metrics=None
+):
     with mlflow.start_run(run_name=model_name):
         mlflow.log_params(params)
         mlflow.log_metrics(metrics)
+
+        # Per-stage timing/memory records from src/utils/instrumentation.py
+        if stage_metrics:
+            _log_stage_records(stage_metrics)
+
+        # Every evaluated configuration with its score and time spent
+        if search_results:
+            mlflow.log_metric("search_candidate_fits", len(search_results))
+            mlflow.log_metric("search_time_s", sum(r["time_s"] for r in search_results))
+            mlflow.log_dict({"candidates": search_results}, "search_results.json")
+
+def log_stage_metrics(stage_metrics, run_name: str = "pipeline_stages"):
+    """
+    Logs stage records to the active run, or to a new run named run_name.
+    """
+    if mlflow.active_run() is not None:
+        _log_stage_records(stage_metrics)
+        return
+    with mlflow.start_run(run_name=run_name):
+        _log_stage_records(stage_metrics)
+
+def _log_stage_records(stage_metrics):
+    metrics = {}
+    for record in stage_metrics:
+        prefix = "stage." + record["path"].replace("/", ".")
+        for key in ("wall_s", "cpu_s", "peak_rss_mb", "rows"):
+            if record.get(key) is not None:
+                metrics[f"{prefix}.{key}"] = record[key]
+    mlflow.log_metrics(metrics)
+    mlflow.log_dict({"stages": list(stage_metrics)}, "stage_metrics.json")
@@ -0,0 +1,159 @@
+# pg_copy.py
+
+import os
+import tempfile
+import time
+from io import StringIO
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+from src.utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+def get_pg_connection(data_access_config: dict):
+    """
+    Opens a direct Postgres connection for the COPY backend.
+
+    The DSN is read from the environment variable named by
+    data_access.postgres_dsn_env (default SUPABASE_DB_URL) so credentials stay
+    out of config.yaml.
+    """
+    dsn_env = data_access_config.get("postgres_dsn_env", "SUPABASE_DB_URL")
+    dsn = os.getenv(dsn_env)
+    if not dsn:
+        raise ProjectBaseError(f"Postgres backend selected but {dsn_env} is not set.")
+
+    try:
+        import psycopg2
+    except ImportError as e:
+        raise ProjectBaseError("The postgres backend requires psycopg2 (psycopg2-binary).") from e
+
+    return psycopg2.connect(dsn)
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _date_literal(value) -> str:
+    # Normalized through pandas, so the embedded literal can only be a timestamp
+    return "'" + pd.Timestamp(value).isoformat() + "'"
+
+class CopyReader:
+    """
+    Reads a table with COPY ... TO STDOUT (CSV) instead of paged REST requests.
+
+    The COPY output is spooled to a temporary file (in memory up to
+    spool_max_mb) and parsed back in chunks, so memory stays bounded by the
+    chunk size rather than the table size.
+    """
+
+    def __init__(self, connection, table: str, key_column: str = "invoice_id", spool_max_mb: int = 64):
+        self.connection = connection
+        self.table = table
+        self.key_column = key_column
+        self.spool_max_bytes = spool_max_mb * 1024 * 1024
+
+    def iter_chunks(self, chunk_size: int = 100_000, since: str = None):
+        """
+        Yields the table as DataFrame chunks in key order.
+        :param since: Optional invoice_date watermark; only rows on or after it are read
+        """
+        query = f"SELECT * FROM {quote_ident(self.table)}"
+        if since is not None:
+            query += f" WHERE invoice_date >= {_date_literal(since)}"
+        query += f" ORDER BY {quote_ident(self.key_column)}"
+
+        start = time.perf_counter()
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes, mode="w+b") as spool:
+            with self.connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", spool)
+            self.connection.commit()
+            logger.info(f"COPY out of {self.table} finished in {time.perf_counter() - start:.2f}s ({spool.tell()} bytes)")
+
+            spool.seek(0)
+            if spool.read(1) == b"":
+                return
+            spool.seek(0)
+
+            for chunk in pd.read_csv(spool, chunksize=chunk_size):
+                yield chunk
+
+    def read_frame(self, since: str = None) -> pd.DataFrame:
+        chunks = list(self.iter_chunks(since=since))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    def fetch_latest(self, columns: list, order_column: str = "invoice_date"):
+        """
+        :return: Row dict with the given columns for the max order_column, or None
+        """
+        column_list = ", ".join(quote_ident(c) for c in columns)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {column_list} FROM {quote_ident(self.table)} ORDER BY {quote_ident(order_column)} DESC LIMIT 1"
+            )
+            row = cursor.fetchone()
+        self.connection.commit()
+        return dict(zip(columns, row)) if row else None
+
+class CopyWriter:
+    """
+    Writes frames with COPY ... FROM STDIN (CSV) into a temporary staging table,
+    then moves them into the target with one INSERT per frame: a plain INSERT
+    when replacing the table, otherwise INSERT ... ON CONFLICT so reruns upsert
+    by the key exactly like the REST loader (this needs a unique constraint on
+    the key, see sql/transformed_customer_data_invoice_id_unique.sql).
+    """
+
+    def __init__(self, connection, table: str, upsert_key: str = "invoice_id"):
+        self.connection = connection
+        self.table = table
+        self.upsert_key = upsert_key
+
+    def write(self, df, replace: bool = False) -> float:
+        """
+        :param df: DataFrame or iterable of DataFrames
+        :param replace: Empty the table first, in the same transaction, and
+                        insert without ON CONFLICT (no unique constraint needed)
+        :return: Throughput in rows/sec
+        """
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        target, stage = quote_ident(self.table), quote_ident(f"{self.table}_stage")
+        start = time.perf_counter()
+        total_rows = 0
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+                if replace:
+                    cursor.execute(f"DELETE FROM {target}")
+
+                for frame in frames:
+                    if frame.empty:
+                        continue
+                    columns = ", ".join(quote_ident(c) for c in frame.columns)
+
+                    buffer = StringIO()
+                    frame.to_csv(buffer, index=False, header=False)
+                    buffer.seek(0)
+                    cursor.copy_expert(f"COPY {stage} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                    insert = f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {stage}"
+                    if not replace:
+                        updates = ", ".join(
+                            f"{quote_ident(c)} = EXCLUDED.{quote_ident(c)}" for c in frame.columns if c != self.upsert_key
+                        )
+                        insert += f" ON CONFLICT ({quote_ident(self.upsert_key)}) DO UPDATE SET {updates}"
+                    cursor.execute(insert)
+                    cursor.execute(f"TRUNCATE {stage}")
+                    total_rows += len(frame)
+
+            self.connection.commit()
+
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        elapsed = time.perf_counter() - start
+        rows_per_sec = total_rows / elapsed if elapsed > 0 else float("inf")
+        logger.info(f"COPY loaded {total_rows} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+        return rows_per_sec
@@ -1,55 +1,88 @@
 # src/pipeline/extract.py
 
 import pandas as pd
-from supabase import create_client, Client
+from supabase import Client
 from src.config.config_loader import load_config
+from src.data_access import get_client, ColumnarFrameBuilder, TableReader
+from src.pg_copy import CopyReader, get_pg_connection
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
 
 logger = get_logger(__name__)
 
 class DataExtractor:
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, client: Client = None, connection=None):
         config = load_config(config_path)
-        supabase_url = config["supabase"]["url"]
-        supabase_key = config["supabase"]["key"]
         self.table_name = config["supabase"]["raw_table_name"]
 
-        self.client: Client = create_client(supabase_url, supabase_key)
-        logger.info(f"Connected to Supabase: {supabase_url}")
-        
-    def extract_raw_data(self) -> pd.DataFrame:
+        extract_config = config.get("extract", {})
+        self.mode = extract_config.get("mode", "offset")
+        self.page_size = extract_config.get("page_size", 1000)
+        self.max_workers = extract_config.get("max_workers", 4)
+        self.key_column = extract_config.get("key_column", "invoice_id")
+
+        # "rest" pages through PostgREST; "postgres" streams COPY over a direct connection
+        access_config = config.get("data_access", {})
+        self.backend = access_config.get("backend", "rest")
+
+        # A pre-built client/connection (e.g. a local fake) can be injected for testing
+        if self.backend == "postgres":
+            connection = connection if connection is not None else get_pg_connection(access_config)
+            self.copy_reader = CopyReader(connection, self.table_name, self.key_column, access_config.get("spool_max_mb", 64))
+        else:
+            self.client: Client = client if client is not None else get_client(config_path=config_path)
+            self.reader = TableReader(self.client, self.table_name)
+
+    def extract_raw_data(self, mode: str = None, since: str = None) -> pd.DataFrame:
         """
         Extracts all raw customer transaction data from Supabase using pagination.
+        :param mode: "offset" or "keyset"; defaults to extract.mode in config
+        :param since: Optional invoice_date watermark; only rows on or after it are fetched
         :return: DataFrame of raw customer data
         """
+        mode = mode or self.mode
+        if self.backend == "postgres":
+            return self._extract_copy(since)
+        if mode == "keyset":
+            return self._extract_keyset(since)
+        if mode != "offset":
+            raise ProjectBaseError(f"Unknown extraction mode: {mode}")
+
         try:
             logger.info(f"Fetching raw data from table: {self.table_name}")
-            all_data = []
-            batch_size = 1000
-            offset = 0
-
-            while True:
-                response = (
-                    self.client
-                    .table(self.table_name)
-                    .select("*")
-                    .range(offset, offset + batch_size - 1)
-                    .execute()
-                )
-
-                batch = response.data
-                if not batch:
-                    break
-
-                all_data.extend(batch)
-                offset += batch_size
-                logger.info(f"Fetched {len(batch)} rows... Total so far: {len(all_data)}")
-
-            if not all_data:
+            builder = ColumnarFrameBuilder()
+
+            # A filtered range needs a stable order to page correctly
+            order = self.key_column if since is not None else None
+            for batch in self.reader.iter_pages(page_size=1000, filters=self._since_filter(since), order=order):
+                builder.append(batch)
+                logger.info(f"Fetched {len(batch)} rows... Total so far: {builder.n_rows}")
+
+            if builder.n_rows == 0:
+                if since is not None:
+                    logger.info(f"No new rows in '{self.table_name}' since {since}")
+                    return pd.DataFrame()
+                raise ProjectBaseError(f"No data found in table '{self.table_name}'")
+
+            df = builder.build()
+            logger.info(f"Completed extraction. Total rows fetched: {len(df)}")
+            return df
+
+        except Exception as e:
+            logger.error(f"Failed to extract raw data: {e}")
+            raise ProjectBaseError(f"Extraction failed: {e}")
+
+    def _extract_copy(self, since: str = None) -> pd.DataFrame:
+        try:
+            logger.info(f"Fetching raw data from table: {self.table_name} (COPY)")
+            df = self.copy_reader.read_frame(since)
+
+            if df.empty:
+                if since is not None:
+                    logger.info(f"No new rows in '{self.table_name}' since {since}")
+                    return df
                 raise ProjectBaseError(f"No data found in table '{self.table_name}'")
 
-            df = pd.DataFrame(all_data)
             logger.info(f"Completed extraction. Total rows fetched: {len(df)}")
             return df
 
@@ -57,3 +90,47 @@ class DataExtractor:
             logger.error(f"Failed to extract raw data: {e}")
             raise ProjectBaseError(f"Extraction failed: {e}")
 
+    def _extract_keyset(self, since: str = None) -> pd.DataFrame:
+        try:
+            logger.info(f"Fetching raw data from table: {self.table_name} (keyset on '{self.key_column}')")
+            chunks = list(self.iter_raw_chunks(since=since))
+
+            if not chunks:
+                if since is not None:
+                    logger.info(f"No new rows in '{self.table_name}' since {since}")
+                    return pd.DataFrame()
+                raise ProjectBaseError(f"No data found in table '{self.table_name}'")
+
+            df = pd.concat(chunks, ignore_index=True)
+            logger.info(f"Completed extraction. Total rows fetched: {len(df)}")
+            return df
+
+        except Exception as e:
+            logger.error(f"Failed to extract raw data: {e}")
+            raise ProjectBaseError(f"Extraction failed: {e}")
+
+    def iter_raw_chunks(self, page_size: int = None, max_workers: int = None, since: str = None):
+        """
+        Yields the raw table as DataFrame chunks, one per keyset page, in key order.
+
+        Page boundaries are discovered by a cheap scan over the key column only;
+        the full rows of each page are then fetched concurrently on a bounded
+        thread pool, so at most ``2 * max_workers`` pages are held at once.
+
+        :param page_size: Rows per page; defaults to extract.page_size in config
+        :param max_workers: Concurrent page fetches; defaults to extract.max_workers
+        :param since: Optional invoice_date watermark; only rows on or after it are fetched
+        """
+        page_size = page_size or self.page_size
+        max_workers = max_workers or self.max_workers
+        if self.backend == "postgres":
+            # One COPY stream; page_size only sets the parsed chunk size
+            yield from self.copy_reader.iter_chunks(page_size, since)
+            return
+        yield from self.reader.iter_keyset_pages(self.key_column, page_size, max_workers, self._since_filter(since))
+
+    @staticmethod
+    def _since_filter(since: str = None):
+        if since is None:
+            return None
+        return lambda query: query.gte("invoice_date", since)
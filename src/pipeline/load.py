@@ -1,10 +1,14 @@
 # src/pipeline/load.py
 
+import itertools
+
 import pandas as pd
-from supabase import create_client, Client
+from supabase import Client
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
 from src.config.config_loader import load_config
+from src.data_access import get_client, TableReader, TableWriter
+from src.pg_copy import CopyReader, CopyWriter, get_pg_connection
 
 logger = get_logger(__name__)
 
@@ -13,35 +17,129 @@ class DataLoader:
     Loads the transformed customer data into the cleaned Supabase table.
     """
 
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, client: Client = None, connection=None):
         config = load_config(config_path)
-        supabase_url = config["supabase"]["url"]
-        supabase_key = config["supabase"]["key"]
         self.table_name = config["supabase"]["transformed_table_name"]
 
-        self.client: Client = create_client(supabase_url, supabase_key)
-        logger.info(f"Connected to Supabase for loading: {supabase_url}")
+        load_settings = config.get("load", {})
+        self.upsert_key = load_settings.get("upsert_key", "invoice_id")
+        self.batch_size = load_settings.get("batch_size", 500)
+        self.max_concurrency = load_settings.get("max_concurrency", 4)
+        self.max_retries = load_settings.get("max_retries", 3)
+        self.retry_backoff = load_settings.get("retry_backoff", 0.5)
+
+        access_config = config.get("data_access", {})
+        self.backend = access_config.get("backend", "rest")
+        if self.backend == "postgres":
+            self.connection = connection if connection is not None else get_pg_connection(access_config)
+            self.copy_writer = CopyWriter(self.connection, self.table_name, self.upsert_key)
+            return
 
-    def load_data(self, df: pd.DataFrame):
+        self.client: Client = client if client is not None else get_client(config_path=config_path)
+        self.writer = TableWriter(
+            self.client,
+            self.table_name,
+            upsert_key=self.upsert_key,
+            batch_size=self.batch_size,
+            max_concurrency=self.max_concurrency,
+            max_retries=self.max_retries,
+            retry_backoff=self.retry_backoff,
+        )
+
+    def load_data(self, df):
         """
         Uploads transformed data to the cleaned table in Supabase.
 
-        :param df: Transformed DataFrame ready for modeling
+        With the REST backend the table is cleared before the upload, so a
+        stream that fails part-way leaves it partially loaded until the next
+        run; the postgres backend replaces it in one transaction.
+
+        :param df: Transformed DataFrame ready for modeling, or an iterable of
+                   transformed chunks (see DataTransformer.transform_stream)
         """
         try:
-            logger.info(f"Uploading {len(df)} rows to table: {self.table_name}")
+            logger.info(f"Uploading {self._describe(df)} to table: {self.table_name}")
+
+            if not isinstance(df, pd.DataFrame):
+                # Nothing is deleted until the stream has produced rows, so an
+                # empty or failing extract leaves the current table in place
+                df = self._require_first_chunk(df)
+
+            if self.backend == "postgres":
+                # Delete and reload in one transaction
+                self.copy_writer.write(df, replace=True)
+                logger.info("Data loading complete.")
+                return
 
             # Delete existing data (if overwrite logic is desired)
-            self.client.table(self.table_name).delete().neq("customer_id", "").execute()
+            self.writer.delete_all("customer_id")
 
-            # Upload in batches (to avoid Supabase limits)
-            batch_size = 500
-            for i in range(0, len(df), batch_size):
-                batch = df.iloc[i:i+batch_size].to_dict(orient="records")
-                self.client.table(self.table_name).insert(batch).execute()
+            # Upload in batches (to avoid Supabase limits). Plain inserts: nothing
+            # can conflict after the delete, and no unique constraint is needed
+            self.writer.write(df, upsert=False)
 
             logger.info("Data loading complete.")
 
         except Exception as e:
             logger.error(f"Failed to load data into Supabase: {e}")
             raise ProjectBaseError(f"Loading failed: {e}")
+
+    def upsert_data(self, df):
+        """
+        Upserts transformed rows by the upsert key (invoice_id) without clearing the table.
+        Requires a unique constraint on that column in the target table
+        (sql/transformed_customer_data_invoice_id_unique.sql).
+
+        :param df: Transformed delta to merge into the cleaned table, or an
+                   iterable of transformed chunks
+        """
+        try:
+            logger.info(f"Upserting {self._describe(df)} into table: {self.table_name} on '{self.upsert_key}'")
+
+            if self.backend == "postgres":
+                self.copy_writer.write(df)
+            else:
+                self.writer.write(df)
+
+            logger.info("Data upsert complete.")
+
+        except Exception as e:
+            logger.error(f"Failed to upsert data into Supabase: {e}")
+            raise ProjectBaseError(f"Upsert failed: {e}")
+
+    @staticmethod
+    def _require_first_chunk(chunks):
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            raise ProjectBaseError("No rows to load; the cleaned table was left unchanged.")
+        return itertools.chain([first], chunks)
+
+    @staticmethod
+    def _describe(df) -> str:
+        if isinstance(df, pd.DataFrame):
+            return f"{len(df)} rows"
+        return "streamed chunks"
+
+    def fetch_high_water_mark(self):
+        """
+        Reads the latest loaded row from the cleaned table, used to seed the ETL
+        watermark when no local watermark file exists (e.g. on a fresh CI runner).
+
+        :return: Dict with invoice_date (day precision), or None if the table is empty
+        """
+        try:
+            if self.backend == "postgres":
+                row = CopyReader(self.connection, self.table_name).fetch_latest(["invoice_date"])
+            else:
+                reader = TableReader(self.client, self.table_name)
+                response = reader.execute(reader.query("invoice_date").order("invoice_date", desc=True).limit(1))
+                row = response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Failed to read high-water mark: {e}")
+            raise ProjectBaseError(f"Reading high-water mark failed: {e}")
+
+        if row is None:
+            return None
+
+        return {"invoice_date": str(row["invoice_date"])[:10]}
@@ -3,6 +3,7 @@
 import pandas as pd
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
+from utils.schema import CATEGORICAL_COLUMNS
 from src.config.config_loader import load_config
 
 logger = get_logger(__name__)
@@ -33,34 +34,7 @@ class DataTransformer:
         try:
             logger.info("Starting data transformation...")
 
-            # Ensure required columns exist
-            required_columns = [
-                "customer_id", "invoice_id", "invoice_date",
-                "purchase_amount", "product_category",
-                "payment_method", "customer_segment", "region"
-            ]
-
-            missing_cols = [col for col in required_columns if col not in df.columns]
-            if missing_cols:
-                raise ProjectBaseError(f"Missing columns in raw data: {missing_cols}")
-
-            # Convert invoice_date to datetime
-            df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce")
-
-            # Drop rows with missing critical fields
-            df = df.dropna(subset=["customer_id", "invoice_date", "purchase_amount"])
-
-            # Cast purchase_amount to float
-            df["purchase_amount"] = df["purchase_amount"].astype(float)
-
-            # Optional: Normalize text fields (e.g., title case or lower case)
-            text_cols = ["product_category", "payment_method", "customer_segment", "region"]
-            for col in text_cols:
-                df[col] = df[col].astype(str).str.strip().str.lower()
-
-            # Convert datetime columns to ISO string format for JSON serialization
-            for col in df.select_dtypes(include=['datetime64[ns]']).columns:
-               df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+            df = self._transform_chunk(df)
 
             logger.info(f"Transformation completed. Final shape: {df.shape}")
 
@@ -69,3 +43,79 @@ class DataTransformer:
         except Exception as e:
             logger.error(f"Transformation failed: {e}")
             raise ProjectBaseError(f"Transformation failed: {e}")
+
+    def transform_stream(self, chunks):
+        """
+        Streaming variant of transform: consumes an iterator of raw DataFrame
+        chunks and lazily yields transformed chunks, so peak memory depends on
+        the chunk size rather than the table size.
+
+        :param chunks: Iterable of raw DataFrames
+        :return: Generator of transformed DataFrames (empty chunks are skipped)
+        """
+        logger.info("Starting streaming data transformation...")
+        total_in, total_out = 0, 0
+
+        for chunk in chunks:
+            try:
+                total_in += len(chunk)
+                chunk = self._transform_chunk(chunk)
+            except Exception as e:
+                logger.error(f"Transformation failed: {e}")
+                raise ProjectBaseError(f"Transformation failed: {e}")
+
+            total_out += len(chunk)
+            if not chunk.empty:
+                yield chunk
+
+        logger.info(f"Streaming transformation completed. Rows in: {total_in}, rows out: {total_out}")
+
+    def _transform_chunk(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Ensure required columns exist
+        required_columns = [
+            "customer_id", "invoice_id", "invoice_date",
+            "purchase_amount", "product_category",
+            "payment_method", "customer_segment", "region"
+        ]
+
+        missing_cols = [col for col in required_columns if col not in df.columns]
+        if missing_cols:
+            raise ProjectBaseError(f"Missing columns in raw data: {missing_cols}")
+
+        # Parse dates, then drop rows with missing critical fields in a single
+        # filtered copy instead of rewriting the frame column by column
+        invoice_date = pd.to_datetime(df["invoice_date"], errors="coerce")
+        keep = invoice_date.notna() & df["customer_id"].notna() & df["purchase_amount"].notna()
+        df = df.loc[keep].copy()
+
+        # Cast purchase_amount to float
+        df["purchase_amount"] = df["purchase_amount"].astype(float)
+
+        # Optional: Normalize text fields (e.g., title case or lower case)
+        for col in CATEGORICAL_COLUMNS:
+            df[col] = normalize_categorical(df[col])
+
+        # Convert datetime columns to ISO string format for JSON serialization
+        df["invoice_date"] = invoice_date[keep].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        return df
+
+def normalize_categorical(series: pd.Series) -> pd.Series:
+    """
+    Strips and lower-cases a low-cardinality text column and returns it as
+    'category' dtype. Only the distinct values are normalized; rows are mapped
+    back through their integer codes. Missing values become the string 'nan'
+    so every row keeps a category.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    normalized = pd.Index([str(value).strip().lower() for value in uniques])
+
+    # Distinct raw spellings (e.g. 'UPI' and ' upi') collapse onto one category
+    categories = pd.Index(sorted(set(normalized)))
+    new_codes = categories.get_indexer(normalized)[codes]
+
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=categories),
+        index=series.index,
+        name=series.name,
+    )
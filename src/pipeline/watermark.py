@@ -0,0 +1,64 @@
+# src/pipeline/watermark.py
+
+import json
+import os
+from typing import Optional
+
+from utils.logger import get_logger
+from utils.exceptions import ProjectBaseError
+
+logger = get_logger(__name__)
+
+class WatermarkStore:
+    """
+    Persists the ETL high-water mark (latest loaded invoice_date, day precision) as JSON.
+    """
+
+    def __init__(self, path: str = "artifacts/etl_watermark.json"):
+        self.path = path
+
+    def read(self) -> Optional[dict]:
+        """
+        Returns the stored watermark, or None if no incremental run has completed yet.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise ProjectBaseError(f"Could not read ETL watermark at {self.path}: {e}")
+
+    def write(self, watermark: dict):
+        """
+        Stores a new watermark. Only call this after the delta has been loaded.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        # Write-then-rename so a crash never leaves a truncated watermark behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(watermark, f)
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"ETL watermark advanced to {watermark}")
+
+def watermark_from_frame(df) -> Optional[dict]:
+    """
+    Derives the watermark from a transformed batch: the latest invoice_date
+    (day precision). The whole boundary day is re-read on the next run, so no
+    per-row tie-breaker is needed.
+    """
+    if df.empty:
+        return None
+
+    return {"invoice_date": df["invoice_date"].astype(str).str[:10].max()}
+
+def latest_watermark(a: Optional[dict], b: Optional[dict]) -> Optional[dict]:
+    """
+    Returns whichever of two watermarks is later (either may be None).
+    """
+    if a is None or b is None:
+        return a or b
+    return a if a["invoice_date"] >= b["invoice_date"] else b
@@ -0,0 +1,174 @@
+# prediction_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+def file_fingerprint(paths, missing_ok: bool = False) -> str:
+    """
+    SHA-256 over the contents of the given artifact files.
+    :param missing_ok: Hash a missing file as absent instead of raising
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if missing_ok and not os.path.exists(path):
+            digest.update(f"missing:{path}".encode())
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+class PredictionCache:
+    """
+    In-process LRU + TTL cache of CLV predictions keyed on the normalized
+    feature tuple (categoricals stripped/lower-cased, purchase_amount
+    optionally bucketed).
+
+    Entries are dropped automatically when the artifact files change: their
+    stat is checked on every call and their content hash is recomputed only
+    when the stat differs. Predictions that were computed before such a change
+    but finish after it are not stored.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl_seconds: float = 3600, amount_bucket: float = None, artifact_paths=()):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.amount_bucket = amount_bucket
+        self.artifact_paths = tuple(artifact_paths)
+
+        self._entries = OrderedDict()  # key -> (prediction, expires_at)
+        self._lock = threading.Lock()
+        self._artifact_stat = None
+        self._artifact_hash = None
+        self._generation = 0  # bumped whenever the artifacts change
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def normalize(self, input_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Copy of input_data in the form the cache keys describe: categoricals
+        stripped/lower-cased and purchase_amount bucketed (if amount_bucket is set).
+        Predictions are made on this frame so a cached value is always the
+        prediction for its key, whichever raw spelling first produced it.
+        """
+        normalized = input_data.copy()
+        amounts = normalized["purchase_amount"].to_numpy(dtype=float)
+        if self.amount_bucket:
+            amounts = np.round(amounts / self.amount_bucket) * self.amount_bucket
+        normalized["purchase_amount"] = amounts
+
+        for col in CATEGORICAL_COLUMNS:
+            normalized[col] = [str(value).strip().lower() for value in normalized[col]]
+        return normalized
+
+    @staticmethod
+    def make_keys(normalized: pd.DataFrame) -> list:
+        """
+        :param normalized: Output of normalize
+        """
+        categoricals = [normalized[col].tolist() for col in CATEGORICAL_COLUMNS]
+        return list(zip(normalized["purchase_amount"].tolist(), *categoricals))
+
+    def predict(self, input_data: pd.DataFrame, predict_fn) -> np.ndarray:
+        """
+        Returns predictions for every row, calling predict_fn only on the rows
+        that miss the cache (in one batch, on their normalized form).
+        """
+        normalized = self.normalize(input_data)
+        keys = self.make_keys(normalized)
+        predictions, missing = self.get_many(keys)
+        generation = self._generation
+
+        if missing.any():
+            predictions[missing] = predict_fn(normalized[missing])
+            self._check_artifacts()
+            self.put_many([key for key, miss in zip(keys, missing) if miss], predictions[missing], generation)
+        return predictions
+
+    def get_many(self, keys: list):
+        """
+        :return: (predictions with NaN for misses, boolean miss mask)
+        """
+        self._check_artifacts()
+        predictions = np.full(len(keys), np.nan)
+        now = time.monotonic()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    predictions[i] = entry[0]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    self.misses += 1
+
+        return predictions, np.isnan(predictions)
+
+    def put_many(self, keys: list, values, generation: int = None):
+        """
+        :param generation: Artifact generation the values were computed under;
+                           they are dropped if the artifacts changed since
+        """
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            for key, value in zip(keys, values):
+                self._entries[key] = (float(value), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "artifact_hash": self._artifact_hash,
+        }
+
+    def _check_artifacts(self):
+        if not self.artifact_paths:
+            return
+
+        stat = tuple(_file_stat(p) for p in self.artifact_paths)
+        if stat == self._artifact_stat:
+            return
+
+        artifact_hash = file_fingerprint(self.artifact_paths, missing_ok=True)
+        with self._lock:
+            if self._artifact_hash is not None and artifact_hash != self._artifact_hash:
+                logger.info("Model artifacts changed; clearing prediction cache.")
+                self._entries.clear()
+                self._generation += 1
+            self._artifact_stat, self._artifact_hash = stat, artifact_hash
+
+def _file_stat(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
@@ -1,12 +1,11 @@
 # src/preprocessor.py
 
-import os
-import joblib
 import pandas as pd
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from utils.logger import get_logger
 from utils.exceptions import ProjectBaseError
+from src.artifact_registry import atomic_dump
 
 logger = get_logger(__name__)
 
@@ -33,8 +32,7 @@ class PreprocessorBuilder:
             X = df[numeric_features + categorical_features]
             preprocessor.fit(X)
 
-            os.makedirs(os.path.dirname(self.artifact_path), exist_ok=True)
-            joblib.dump(preprocessor, self.artifact_path)
+            atomic_dump(preprocessor, self.artifact_path)
 
             logger.info(f"Preprocessor saved to: {self.artifact_path}")
 
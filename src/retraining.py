@@ -0,0 +1,150 @@
+# retraining.py
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import root_mean_squared_error
+
+from src.utils.logger import get_logger
+from src.utils.exceptions import ModelTrainingError
+
+logger = get_logger(__name__)
+
+SNAPSHOT_PATH = "artifacts/training_snapshot.json"
+
+def load_training_snapshot(path: str = SNAPSHOT_PATH):
+    """
+    Returns the metadata saved with the current model, or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def build_training_snapshot(df: pd.DataFrame, model, baseline_rmse: float, n_bins: int = 10, previous=None) -> dict:
+    """
+    Captures what the next incremental run needs: the data watermark, the
+    holdout RMSE of the last full refit, and a purchase_amount histogram for
+    drift checks. Histogram and baseline carry over from `previous` on
+    warm-start updates so drift is always measured against the last full refit.
+    """
+    snapshot = {
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "data_watermark": pd.to_datetime(df["invoice_date"]).max().isoformat(),
+        "n_rows": int(len(df)),
+        "n_estimators": int(model.n_estimators),
+        "baseline_rmse": float(baseline_rmse),
+    }
+
+    if previous is not None:
+        snapshot["amount_bin_edges"] = previous["amount_bin_edges"]
+        snapshot["amount_bin_shares"] = previous["amount_bin_shares"]
+        snapshot["baseline_rmse"] = previous["baseline_rmse"]
+        return snapshot
+
+    amounts = df["purchase_amount"].to_numpy(dtype=float)
+    edges = np.unique(np.quantile(amounts, np.linspace(0, 1, n_bins + 1)))
+    counts, _ = np.histogram(amounts, bins=edges)
+    snapshot["amount_bin_edges"] = edges.tolist()
+    snapshot["amount_bin_shares"] = (counts / max(counts.sum(), 1)).tolist()
+    return snapshot
+
+def save_training_snapshot(snapshot: dict, path: str = SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    logger.info(f"Training snapshot saved to {path}")
+
+def population_stability_index(edges, expected_shares, values, eps: float = 1e-6) -> float:
+    """
+    PSI of values against the snapshot histogram; values outside the original
+    range are clipped into the edge bins.
+    """
+    clipped = np.clip(values, edges[0], edges[-1])
+    counts, _ = np.histogram(clipped, bins=edges)
+    actual = counts / max(counts.sum(), 1) + eps
+    expected = np.asarray(expected_shares) + eps
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def min_new_rows(snapshot: dict, retrain_config: dict) -> int:
+    """
+    Smallest batch of new rows worth an incremental update: min_new_rows, or
+    min_new_fraction of the rows the current model was trained on if larger.
+    """
+    fraction = retrain_config.get("min_new_fraction", 0.1)
+    return max(retrain_config.get("min_new_rows", 1000), int(np.ceil(fraction * snapshot.get("n_rows", 0))))
+
+def stale_label_share(df: pd.DataFrame, new_df: pd.DataFrame) -> float:
+    """
+    Share of previously trained rows whose customer has new transactions.
+    customer_lifetime_value is a cumulative per-customer sum, so the labels the
+    existing trees learned for those rows are now out of date.
+    """
+    old = df.loc[df.index.difference(new_df.index), "customer_id"]
+    if old.empty:
+        return 0.0
+    return float(old.isin(new_df["customer_id"]).mean())
+
+def needs_full_refit(model, snapshot: dict, df: pd.DataFrame, new_df: pd.DataFrame, X_new, y_new, retrain_config: dict):
+    """
+    Decides whether new data can be absorbed by adding trees or needs a full refit.
+    :param df: All rows with current labels; new_df is its slice newer than the snapshot
+    :return: (bool, reason)
+    """
+    stale = stale_label_share(df, new_df)
+    if stale > retrain_config.get("max_stale_share", 0.05):
+        return True, f"{stale:.1%} of trained rows have stale customer_lifetime_value labels"
+
+    max_trees = retrain_config.get("max_total_trees", 1000)
+    trees_per_update = retrain_config.get("trees_per_update", 20)
+    if model.n_estimators + trees_per_update > max_trees:
+        return True, f"tree budget reached ({model.n_estimators} + {trees_per_update} > {max_trees})"
+
+    psi = population_stability_index(
+        snapshot["amount_bin_edges"], snapshot["amount_bin_shares"], new_df["purchase_amount"].to_numpy(dtype=float)
+    )
+    if psi > retrain_config.get("max_psi", 0.2):
+        return True, f"purchase_amount drift (PSI {psi:.3f})"
+
+    rmse = root_mean_squared_error(y_new, model.predict(X_new))
+    allowed = snapshot["baseline_rmse"] * (1 + retrain_config.get("max_rmse_increase", 0.25))
+    if rmse > allowed:
+        return True, f"RMSE on new data {rmse:.2f} exceeds {allowed:.2f}"
+
+    logger.info(f"Quality/drift checks passed (PSI {psi:.3f}, RMSE on new data {rmse:.2f})")
+    return False, None
+
+def warm_start_update(model, X_new, y_new, trees_per_update: int):
+    """
+    Grows the forest by trees_per_update trees fitted on the new rows only;
+    existing trees are kept as they are.
+    """
+    if not hasattr(model, "warm_start"):
+        raise ModelTrainingError(f"{type(model).__name__} does not support warm-start updates.")
+
+    previous = model.n_estimators
+    model.set_params(warm_start=True, n_estimators=previous + trees_per_update)
+    start = time.perf_counter()
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False)
+    logger.info(
+        f"Added {trees_per_update} trees on {X_new.shape[0]} new rows in {time.perf_counter() - start:.1f}s "
+        f"({previous} -> {model.n_estimators} trees)"
+    )
+    return model
+
+def passes_update_gate(model, X_holdout, y_holdout, snapshot: dict, retrain_config: dict):
+    """
+    Checks a warm-started model on held-out rows before it may replace the saved one.
+    :return: (bool, holdout RMSE)
+    """
+    rmse = root_mean_squared_error(y_holdout, model.predict(X_holdout))
+    allowed = snapshot["baseline_rmse"] * (1 + retrain_config.get("max_rmse_increase", 0.25))
+    if rmse > allowed:
+        logger.warning(f"Updated model RMSE on held-out rows {rmse:.2f} exceeds {allowed:.2f}")
+        return False, rmse
+    return True, rmse
@@ -0,0 +1,179 @@
+# src/serving/model_server.py
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from src.config.config_loader import load_config
+from src.model_predict import load_model, load_preprocessor
+from src.pipeline.transform import normalize_categorical
+from src.utils.logger import get_logger
+from src.utils.exceptions import PredictionError
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+class CustomerFeatures(BaseModel):
+    purchase_amount: float
+    product_category: str
+    payment_method: str
+    customer_segment: str
+    region: str
+
+class LatencyStats:
+    """
+    Rolling request latency percentiles plus lifetime throughput counters.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.latencies = deque(maxlen=window)
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+
+    def record_request(self, latency_s: float):
+        self.latencies.append(latency_s)
+        self.requests += 1
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.batched_rows += size
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self.started_at
+        latencies_ms = np.fromiter(self.latencies, dtype=float) * 1000
+        p50, p99 = np.percentile(latencies_ms, [50, 99]) if len(latencies_ms) else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.batched_rows / self.batches if self.batches else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "throughput_rps": self.requests / uptime if uptime > 0 else 0.0,
+            "uptime_s": uptime,
+        }
+
+class MicroBatcher:
+    """
+    Collects concurrent single-row requests into batches of up to max_batch_size,
+    waiting at most max_wait_ms after the first row, and scores each batch with
+    one vectorized predict call off the event loop.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0, stats: LatencyStats = None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.stats = stats or LatencyStats()
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row: dict) -> float:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = [row for row, _ in batch]
+            try:
+                predictions = await loop.run_in_executor(None, self.predict_fn, pd.DataFrame(rows))
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(PredictionError(f"Prediction failed: {e}"))
+                continue
+
+            self.stats.record_batch(len(batch))
+            for (_, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(float(prediction))
+
+def create_app(model=None, preprocessor=None, config_path=os.path.join("src", "config", "config.yaml")) -> FastAPI:
+    """
+    Builds the prediction service. The model and preprocessor are loaded once at
+    startup unless passed in directly (e.g. from tests).
+    """
+    serving_config = load_config(config_path).get("serving", {})
+    stats = LatencyStats()
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        start = time.perf_counter()
+        state["model"] = model if model is not None else load_model()
+        state["preprocessor"] = preprocessor if preprocessor is not None else load_preprocessor()
+        logger.info(f"Loaded model and preprocessor in {time.perf_counter() - start:.2f}s")
+
+        def predict_batch(input_df: pd.DataFrame):
+            # Same spelling as the training data (e.g. "Electronics " -> "electronics")
+            for col in CATEGORICAL_COLUMNS:
+                input_df[col] = normalize_categorical(input_df[col])
+            return state["model"].predict(state["preprocessor"].transform(input_df))
+
+        batcher = MicroBatcher(
+            predict_batch,
+            max_batch_size=serving_config.get("max_batch_size", 64),
+            max_wait_ms=serving_config.get("max_wait_ms", 5),
+            stats=stats,
+        )
+        await batcher.start()
+        state["batcher"] = batcher
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="CLV Prediction Service", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/predict")
+    async def predict(features: CustomerFeatures):
+        start = time.perf_counter()
+        try:
+            prediction = await state["batcher"].submit(features.model_dump())
+        except PredictionError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        stats.record_request(time.perf_counter() - start)
+        return {"predicted_clv": prediction}
+
+    @app.get("/metrics")
+    async def metrics():
+        return stats.snapshot()
+
+    return app
@@ -0,0 +1,58 @@
+# training_matrix.py
+
+import numpy as np
+import pandas as pd
+
+from src.compiled_model import FeatureLayout, NUMERIC_FEATURE
+from src.utils.instrumentation import peak_rss_mb
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def fit_preprocessor(preprocessor, df: pd.DataFrame, rows=None):
+    """
+    Fits the ColumnTransformer without materializing its transformed output.
+
+    ColumnTransformer.fit runs fit_transform, so the encoder is fitted on one
+    row per distinct category combination (same vocabulary as the full data),
+    and the numeric transformer is then refitted on the full purchase_amount
+    column.
+    :param rows: Optional positions of the rows to fit on (e.g. the train split)
+    """
+    numeric_columns, categorical_columns = [], []
+    for name, _, columns in preprocessor.transformers:
+        (numeric_columns if name == "num" else categorical_columns).extend(columns)
+
+    features = df[numeric_columns + categorical_columns]
+    if rows is not None:
+        features = features.iloc[rows]
+    preprocessor.fit(features.drop_duplicates(subset=categorical_columns))
+
+    numeric = preprocessor.named_transformers_["num"]
+    if numeric != "passthrough":
+        numeric.fit(features[numeric_columns])
+    return preprocessor
+
+def build_design_matrix(df: pd.DataFrame, layout: FeatureLayout, rows=None, chunk_size: int = 1_000_000) -> np.ndarray:
+    """
+    Encodes df straight into one dense float32 matrix, the dtype the forest
+    trains on, so fit() uses it without another copy.
+
+    :param rows: Optional row order (e.g. train indices followed by test
+                 indices) so splits are contiguous views of the result
+    :param chunk_size: Rows encoded per step; bounds the index temporaries
+    """
+    amounts = df[NUMERIC_FEATURE].to_numpy(dtype=np.float64)
+    codes = layout.category_codes(df)
+    if rows is not None:
+        amounts, codes = amounts[rows], codes[rows]
+
+    X = np.zeros((len(amounts), layout.n_features), dtype=np.float32)
+    for start in range(0, len(amounts), chunk_size):
+        stop = start + chunk_size
+        layout.encode(layout.scale_amounts(amounts[start:stop]), codes[start:stop], out=X[start:stop])
+
+    logger.info(
+        f"Design matrix {X.shape} float32 ({X.nbytes / 1e6:.0f} MB) built; peak RSS {peak_rss_mb():.0f} MB"
+    )
+    return X
@@ -0,0 +1,106 @@
+# training_scheduler.py
+
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import check_cv
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def available_cores(n_jobs: int = -1) -> int:
+    """
+    Resolves a joblib-style n_jobs (-1 = all cores, -2 = all but one, ...)
+    against the cores this process may run on.
+    """
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    return max(1, min(cores, n_jobs) if n_jobs > 0 else cores + 1 + n_jobs)
+
+def plan_parallelism(n_tasks: int, n_jobs: int = -1):
+    """
+    Splits cores between concurrent (candidate, fold) fits and the trees of
+    each forest, so outer x inner never exceeds the core count.
+    :return: (outer worker processes, n_jobs per forest)
+    """
+    cores = available_cores(n_jobs)
+    outer = max(1, min(n_tasks, cores))
+    return outer, max(1, cores // outer)
+
+def _fit_and_score(X, y, train, test, params: dict, n_jobs: int):
+    start = time.perf_counter()
+    estimator = RandomForestRegressor(random_state=42, n_jobs=n_jobs, **params).fit(X[train], y[train])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = -mean_squared_error(y[test], estimator.predict(X[test]))
+    return score, fit_time, time.perf_counter() - start
+
+def _run_task(task: tuple, X, y, train, test, params: dict, n_jobs: int):
+    # Results come back in completion order, so each carries its (candidate, fold)
+    return task, _fit_and_score(X, y, train, test, params, n_jobs)
+
+def cross_validate_candidates(X, y, candidates: list, cv: int = 3, n_jobs: int = -1, deadline: float = None):
+    """
+    Cross-validates every candidate (dict of RandomForest params) with all
+    (candidate, fold) fits scheduled on one loky pool.
+
+    X and y are passed to the workers as read-only memmaps rather than pickled
+    per task. A new fit is submitted as soon as any worker frees up, and
+    results are collected in completion order. Once time.perf_counter() passes
+    deadline (and one candidate is complete) no further fit is submitted and
+    candidates with unfinished folds are left out.
+
+    :return: One dict per fully evaluated candidate, in candidate order, with
+             mean_test_score (neg MSE, as cross_val_score) and per-fold timings
+    """
+    y = np.asarray(y)
+    splits = list(check_cv(cv).split(X, y))
+    tasks = [(c, f) for c in range(len(candidates)) for f in range(len(splits))]
+    outer, inner = plan_parallelism(len(tasks), n_jobs)
+    logger.info(f"Scheduling {len(tasks)} fits on {outer} workers x {inner} threads per forest")
+
+    folds = {}
+    folds_left = [len(splits)] * len(candidates)
+
+    def submissions():
+        # joblib pulls from this generator each time a worker frees up, so the
+        # deadline is checked per fit; at least one candidate must finish first
+        for submitted, (c, f) in enumerate(tasks):
+            if deadline is not None and 0 in folds_left and time.perf_counter() > deadline:
+                logger.warning(f"Time budget reached; {len(tasks) - submitted} fits not started.")
+                return
+            yield delayed(_run_task)((c, f), X, y, *splits[f], candidates[c], inner)
+
+    with Parallel(
+        n_jobs=outer,
+        backend="loky",
+        max_nbytes="1M",
+        mmap_mode="r",
+        pre_dispatch="n_jobs",
+        return_as="generator_unordered",
+    ) as parallel:
+        for (c, f), output in parallel(submissions()):
+            folds[(c, f)] = output
+            folds_left[c] -= 1
+
+    results = []
+    for c, params in enumerate(candidates):
+        scores = [folds.get((c, f)) for f in range(len(splits))]
+        if any(s is None for s in scores):
+            continue
+        results.append({
+            "candidate": c,
+            "params": params,
+            "mean_test_score": float(np.mean([s[0] for s in scores])),
+            "fold_fit_time_s": [s[1] for s in scores],
+            "fold_score_time_s": [s[2] for s in scores],
+            "time_s": float(sum(s[1] + s[2] for s in scores)),
+        })
+    return results
@@ -22,3 +22,8 @@ class PredictionError(ProjectBaseError):
     """Raised when prediction fails."""
     def __init__(self, message="Failed during model prediction."):
         super().__init__(message)
+
+class ArtifactMismatchError(ProjectBaseError):
+    """Raised when model artifact files do not match their manifest."""
+    def __init__(self, message="Artifact files do not match their manifest."):
+        super().__init__(message)
@@ -0,0 +1,191 @@
+# src/utils/instrumentation.py
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from src.utils.logger import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger(__name__)
+
+METRICS_PATH = os.path.join("logs", "stage_metrics.jsonl")
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far, in MB (0.0 where the
+    resource module is unavailable).
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb() -> float:
+    """
+    Current resident set size in MB; falls back to the peak where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+class Stage:
+    """
+    One timed pipeline stage. Set ``rows`` inside the block to record how many
+    rows it handled; ``records`` collects the finished records of this stage
+    and every stage nested in it.
+    """
+
+    def __init__(self, name: str, parent: "Stage" = None, rows: int = None, tags: dict = None):
+        self.name = name
+        self.path = f"{parent.path}/{name}" if parent is not None else name
+        self.parent = parent
+        self.rows = rows
+        self.tags = tags or {}
+        self.records = []
+
+class RssSampler(threading.Thread):
+    """
+    Polls resident memory on a background thread, since ru_maxrss alone cannot
+    be reset per stage. Native allocations (NumPy, scikit-learn trees) count as
+    well as Python objects. Use as a context manager or with start()/stop();
+    baseline_mb is the RSS when sampling began.
+    """
+
+    def __init__(self, interval_s: float = 0.05):
+        super().__init__(daemon=True)
+        self.interval_s = interval_s
+        self.baseline_mb = self.peak_mb = current_rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_s):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def stop(self) -> float:
+        """
+        :return: Peak RSS in MB seen while sampling
+        """
+        self._stop_event.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+        return self.peak_mb
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def current_stage():
+    """
+    :return: The innermost active Stage on this thread, or None
+    """
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+@contextmanager
+def track_stage(name: str, rows: int = None, sample_interval_s: float = 0.05, **tags):
+    """
+    Records wall time, CPU time, peak RSS and row count of the enclosed block
+    as one JSON line (logged and appended to METRICS_PATH).
+
+    Stages nest: a stage started inside another is recorded under its path
+    (e.g. "training/feature_engineering/ingest") and its record is added to
+    every enclosing stage's ``records``.
+
+    :param rows: Row count, if already known; can also be set on the yielded Stage
+    :param tags: Extra fields copied into the record (e.g. mode="incremental")
+    """
+    stack = _local.__dict__.setdefault("stack", [])
+    stage = Stage(name, current_stage(), rows, tags)
+    stack.append(stage)
+
+    peak_before = peak_rss_mb()
+    sampler = RssSampler(sample_interval_s)
+    sampler.start()
+    started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    cpu_start, start = time.process_time(), time.perf_counter()
+    status = "error"
+    try:
+        yield stage
+        status = "ok"
+    finally:
+        wall_s, cpu_s = time.perf_counter() - start, time.process_time() - cpu_start
+        peak_mb = sampler.stop()
+        # A new lifetime peak can only have been reached inside this stage
+        if peak_rss_mb() > peak_before:
+            peak_mb = max(peak_mb, peak_rss_mb())
+        stack.pop()
+
+        record = {
+            "stage": stage.name,
+            "path": stage.path,
+            "status": status,
+            "started_at": started_at,
+            "wall_s": round(wall_s, 4),
+            "cpu_s": round(cpu_s, 4),
+            "peak_rss_mb": round(peak_mb, 1),
+            "rows": stage.rows,
+            **stage.tags,
+        }
+        _emit(record)
+
+        ancestor = stage
+        while ancestor is not None:
+            ancestor.records.append(record)
+            ancestor = ancestor.parent
+
+def instrumented(name: str = None, rows=None):
+    """
+    Decorator form of track_stage.
+    :param name: Stage name; defaults to the function name
+    :param rows: Optional function of the return value giving its row count (e.g. len)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(name or func.__name__) as stage:
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    stage.rows = rows(result)
+                return result
+        return wrapper
+    return decorator
+
+def count_rows(chunks, stage: Stage):
+    """
+    Passes DataFrame chunks through unchanged while adding their rows to stage.rows.
+    """
+    stage.rows = stage.rows or 0
+    for chunk in chunks:
+        stage.rows += len(chunk)
+        yield chunk
+
+def _emit(record: dict):
+    line = json.dumps(record, default=str)
+    logger.info(f"Stage metrics: {line}")
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+            with open(METRICS_PATH, "a") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write stage metrics to {METRICS_PATH}: {e}")
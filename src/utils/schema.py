@@ -0,0 +1,16 @@
+# src/utils/schema.py
+
+# Low-cardinality text columns shared by the raw and transformed tables. These
+# are normalized once per distinct value and carried as pandas 'category' dtype.
+CATEGORICAL_COLUMNS = ["product_category", "payment_method", "customer_segment", "region"]
+
+# Declared dtypes of the eight transaction columns, used to build frames column by
+# column straight from REST pages. invoice_date stays text: it is parsed during
+# transformation and feature engineering.
+TRANSACTION_SCHEMA = {
+    "invoice_id": "object",
+    "customer_id": "object",
+    "invoice_date": "object",
+    "purchase_amount": "float64",
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+}
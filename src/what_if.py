@@ -0,0 +1,63 @@
+# what_if.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.batch_predict import FEATURE_COLUMNS
+from src.pipeline.transform import normalize_categorical
+from src.utils.logger import get_logger
+from src.utils.exceptions import PredictionError
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+logger = get_logger(__name__)
+
+def build_scenario_grid(categories: dict, amount_min: float, amount_max: float, amount_steps: int) -> pd.DataFrame:
+    """
+    Every combination of the given categorical values x evenly spaced purchase amounts.
+    :param categories: Column name -> list of values, for each of CATEGORICAL_COLUMNS
+    """
+    amounts = np.linspace(amount_min, amount_max, max(int(amount_steps), 1))
+    index = pd.MultiIndex.from_product(
+        [amounts] + [categories[col] for col in CATEGORICAL_COLUMNS], names=FEATURE_COLUMNS
+    )
+    return index.to_frame(index=False)
+
+def score_frame(input_data: pd.DataFrame, model, preprocessor, chunk_size: int = 50_000):
+    """
+    Scores every row of input_data with one predict call per chunk of distinct
+    feature rows; repeated rows (common in customer lists) are scored once.
+
+    :return: (predictions aligned with input_data, stats dict)
+    """
+    missing = [col for col in FEATURE_COLUMNS if col not in input_data.columns]
+    if missing:
+        raise PredictionError(f"Input is missing required columns: {missing}")
+
+    start = time.perf_counter()
+    features = input_data[FEATURE_COLUMNS].copy()
+    features["purchase_amount"] = pd.to_numeric(features["purchase_amount"], errors="coerce")
+    if features["purchase_amount"].isna().any():
+        raise PredictionError("purchase_amount must be numeric and non-empty in every row.")
+    for col in CATEGORICAL_COLUMNS:
+        features[col] = normalize_categorical(features[col])
+
+    # Group numbers follow first appearance, matching drop_duplicates' order
+    inverse = features.groupby(FEATURE_COLUMNS, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    distinct = features.drop_duplicates()
+
+    distinct_predictions = np.empty(len(distinct))
+    for chunk_start in range(0, len(distinct), chunk_size):
+        chunk = distinct.iloc[chunk_start:chunk_start + chunk_size]
+        distinct_predictions[chunk_start:chunk_start + len(chunk)] = model.predict(preprocessor.transform(chunk))
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": len(features),
+        "distinct_rows": len(distinct),
+        "elapsed_s": elapsed,
+        "rows_per_s": len(features) / elapsed if elapsed > 0 else 0.0,
+    }
+    logger.info(f"What-if scoring: {stats}")
+    return distinct_predictions[inverse], stats
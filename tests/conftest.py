@@ -0,0 +1,17 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Older modules import "utils.*" / "config.*" relative to src/, newer ones "src.*"
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+@pytest.fixture
+def config_path():
+    return os.path.join(PROJECT_ROOT, "src", "config", "config.yaml")
@@ -0,0 +1,78 @@
+# tests/test_analytics.py
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.analytics import DashboardAggregates
+from src.pipeline.transform import DataTransformer
+
+TABLE = "transformed_customer_data"
+
+@pytest.fixture
+def client(config_path):
+    cleaned = DataTransformer(config_path).transform(generate_transactions(1200, seed=12))
+    return FakeSupabaseClient(tables={TABLE: cleaned.astype({col: str for col in cleaned.columns if col != "purchase_amount"})})
+
+@pytest.fixture
+def dashboard(client):
+    dashboard = DashboardAggregates(client, TABLE, refresh_interval_s=0, page_size=200)
+    scans = []
+    scan = dashboard._scan
+
+    def recording(since=None):
+        scans.append(since)
+        return scan(since)
+
+    dashboard._scan = recording
+    dashboard.get()
+    scans.clear()
+    return dashboard, scans
+
+def _rows_by_date(client) -> pd.DataFrame:
+    return client.tables[TABLE].snapshot().sort_values("invoice_date", ascending=False)
+
+def _append(client, n: int):
+    latest = _rows_by_date(client).iloc[0].to_dict()
+    rows = [{**latest, "invoice_id": f"INV_new_{i}", "invoice_date": "2099-01-01 00:00:00"} for i in range(n)]
+    client.table(TABLE).insert(rows).execute()
+
+def _edit(client, position: int):
+    row = _rows_by_date(client).iloc[position].to_dict()
+    edited = {**row, "purchase_amount": row["purchase_amount"] + 1000.0, "payment_method": "cash on delivery"}
+    client.table(TABLE).upsert([edited], on_conflict="invoice_id").execute()
+
+def _assert_matches_full_scan(dashboard, client):
+    expected = DashboardAggregates(client, TABLE).get()
+    actual = dashboard.get()
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        key = expected[name].columns[0]
+        pd.testing.assert_frame_equal(
+            actual[name].sort_values(key).reset_index(drop=True),
+            expected[name].sort_values(key).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+def test_appended_rows_are_folded_in(dashboard, client):
+    dashboard, scans = dashboard
+    _append(client, 3)
+
+    _assert_matches_full_scan(dashboard, client)
+    assert len(scans) == 1 and scans[0] is not None
+
+def test_edit_alongside_append_recomputes(dashboard, client):
+    dashboard, scans = dashboard
+    _edit(client, position=20)
+    _append(client, 3)
+
+    _assert_matches_full_scan(dashboard, client)
+    assert scans == [None]
+
+def test_edit_with_unchanged_count_recomputes(dashboard, client):
+    dashboard, scans = dashboard
+    _edit(client, position=0)
+
+    _assert_matches_full_scan(dashboard, client)
+    assert scans == [None]
@@ -0,0 +1,75 @@
+# tests/test_artifact_registry.py
+
+import os
+
+import joblib
+import pytest
+
+import src.artifact_registry as artifact_registry
+from src.artifact_registry import atomic_dump, write_manifest
+from src.model_predict import get_model_pair, reset_model_state
+from src.utils.exceptions import ArtifactMismatchError
+
+class Unpicklable:
+    def __reduce__(self):
+        raise RuntimeError("cannot pickle")
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(artifact_registry, "_registry", None)
+
+def _save_pair(directory, version: int):
+    model_path, preprocessor_path = os.path.join(directory, "model.pkl"), os.path.join(directory, "preprocessor.pkl")
+    atomic_dump({"model": version}, model_path)
+    atomic_dump({"preprocessor": version}, preprocessor_path)
+    write_manifest(os.path.join(directory, "manifest.json"), {"model": model_path, "preprocessor": preprocessor_path})
+
+def test_failed_dump_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    atomic_dump({"model": 1}, path)
+
+    with pytest.raises(RuntimeError):
+        atomic_dump(Unpicklable(), path)
+
+    assert joblib.load(path) == {"model": 1}
+    assert os.listdir(tmp_path) == ["model.pkl"]
+
+def test_pair_reloads_together_when_manifest_changes(tmp_path):
+    _save_pair(str(tmp_path), 1)
+    manifest = str(tmp_path / "manifest.json")
+    assert get_model_pair(manifest) == ({"model": 1}, {"preprocessor": 1})
+
+    _save_pair(str(tmp_path), 2)
+    assert get_model_pair(manifest) == ({"model": 2}, {"preprocessor": 2})
+
+def test_half_saved_pair_keeps_serving_previous_pair(tmp_path):
+    _save_pair(str(tmp_path), 1)
+    manifest = str(tmp_path / "manifest.json")
+    get_model_pair(manifest)
+
+    # New model in place, but the manifest still describes version 1
+    atomic_dump({"model": 2}, str(tmp_path / "model.pkl"))
+    with open(manifest, "a") as f:
+        f.write(" ")  # same manifest content, new bytes: the registry re-checks the files
+
+    assert get_model_pair(manifest) == ({"model": 1}, {"preprocessor": 1})
+
+def test_half_saved_pair_without_previous_pair_raises(tmp_path):
+    _save_pair(str(tmp_path), 1)
+    atomic_dump({"model": 2}, str(tmp_path / "model.pkl"))
+
+    with pytest.raises(ArtifactMismatchError):
+        get_model_pair(str(tmp_path / "manifest.json"))
+
+def test_reset_model_state_switches_artifact_directories(tmp_path, monkeypatch):
+    for version in (1, 2):
+        directory = tmp_path / f"size_{version}"
+        _save_pair(str(directory / "artifacts"), version)
+
+    monkeypatch.chdir(tmp_path / "size_1")
+    assert get_model_pair()[0] == {"model": 1}
+
+    monkeypatch.chdir(tmp_path / "size_2")
+    reset_model_state()
+    assert artifact_registry.get_artifact_registry().peek("artifacts/manifest.json") is None
+    assert get_model_pair()[0] == {"model": 2}
@@ -0,0 +1,67 @@
+# tests/test_compiled_model.py
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmarks.synthetic_data import generate_transactions
+from src.compiled_model import CompiledForest
+from src.pipeline.transform import normalize_categorical
+from src.preprocessor import PreprocessorBuilder
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+FEATURES = ["purchase_amount"] + CATEGORICAL_COLUMNS
+
+def _normalized(df):
+    df = df.dropna(subset=["purchase_amount"]).reset_index(drop=True)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = normalize_categorical(df[col])
+    return df
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    train = _normalized(generate_transactions(2000, seed=3))
+    preprocessor_path = str(tmp_path_factory.mktemp("artifacts") / "preprocessor.pkl")
+    PreprocessorBuilder(preprocessor_path).build_and_save(train)
+    preprocessor = joblib.load(preprocessor_path)
+
+    # Noisy target so the trees split on both amount and categories
+    rng = np.random.default_rng(0)
+    target = train["purchase_amount"] * (1 + (train["region"] == "north")) + rng.normal(0, 5, len(train))
+    model = RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0)
+    model.fit(preprocessor.transform(train[FEATURES]), target)
+    return model, preprocessor
+
+def test_compiled_forest_matches_random_forest(fitted):
+    model, preprocessor = fitted
+    compiled = CompiledForest.compile(model, preprocessor)
+
+    scoring = _normalized(generate_transactions(1000, seed=4))
+    # Amounts exactly on split thresholds are where float32 rounding would show
+    thresholds = compiled.cuts[:50]
+    scoring.loc[: len(thresholds) - 1, "purchase_amount"] = thresholds
+
+    expected = model.predict(preprocessor.transform(scoring[FEATURES]))
+    np.testing.assert_allclose(compiled.predict(scoring), expected, atol=1e-6)
+    assert compiled.verify_parity(model, preprocessor, scoring) <= 1e-6
+
+def test_unseen_categories_fall_back_to_tree_walk(fitted):
+    model, preprocessor = fitted
+    compiled = CompiledForest.compile(model, preprocessor)
+
+    scoring = _normalized(generate_transactions(50, seed=5))
+    scoring["product_category"] = scoring["product_category"].cat.add_categories(["garden"])
+    scoring.loc[::3, "product_category"] = "garden"
+
+    expected = model.predict(preprocessor.transform(scoring[FEATURES]))
+    np.testing.assert_allclose(compiled.predict(scoring), expected, atol=1e-6)
+
+def test_saved_compiled_forest_predicts_the_same(fitted, tmp_path):
+    model, preprocessor = fitted
+    compiled = CompiledForest.compile(model, preprocessor)
+    path = str(tmp_path / "compiled_model.npz")
+    compiled.save(path)
+
+    scoring = _normalized(generate_transactions(200, seed=6))
+    np.testing.assert_array_equal(CompiledForest.load(path).predict(scoring), compiled.predict(scoring))
@@ -0,0 +1,71 @@
+# tests/test_data_ingestion.py
+
+import pytest
+import yaml
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.data_ingestion import SupabaseIngestor
+from src.pipeline.transform import DataTransformer
+
+TABLE = "transformed_customer_data"
+
+@pytest.fixture
+def cache_config(tmp_path, config_path):
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    config["ingestion"] = {"cache_enabled": True, "cache_dir": str(tmp_path / "cache"), "checksum_rows": 50}
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+@pytest.fixture
+def client(config_path):
+    cleaned = DataTransformer(config_path).transform(generate_transactions(1200, seed=8))
+    return FakeSupabaseClient(tables={TABLE: cleaned.astype({col: str for col in cleaned.columns if col != "purchase_amount"})})
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+    fetch_all = SupabaseIngestor._fetch_all
+
+    def counting(self, batch_size):
+        calls.append(batch_size)
+        return fetch_all(self, batch_size)
+
+    monkeypatch.setattr(SupabaseIngestor, "_fetch_all", counting)
+    return calls
+
+def _latest_row(client) -> dict:
+    frame = client.tables[TABLE].snapshot()
+    return frame.sort_values("invoice_date").iloc[-1].to_dict()
+
+def test_unchanged_table_is_served_from_snapshot(cache_config, client, fetches):
+    first = SupabaseIngestor(cache_config, client=client).load_data()
+    second = SupabaseIngestor(cache_config, client=client).load_data()
+
+    assert len(fetches) == 1
+    assert len(second) == len(first)
+
+def test_in_place_upsert_of_recent_row_invalidates_snapshot(cache_config, client, fetches):
+    SupabaseIngestor(cache_config, client=client).load_data()
+
+    # Same row count and max invoice_date; only the amount changes
+    corrected = {**_latest_row(client), "purchase_amount": 12345.0}
+    client.table(TABLE).upsert([corrected], on_conflict="invoice_id").execute()
+
+    df = SupabaseIngestor(cache_config, client=client).load_data()
+
+    assert len(fetches) == 2
+    assert df.loc[df["invoice_id"] == corrected["invoice_id"], "purchase_amount"].tolist() == [12345.0]
+
+def test_appended_rows_invalidate_snapshot(cache_config, client, fetches):
+    first = SupabaseIngestor(cache_config, client=client).load_data()
+
+    appended = {**_latest_row(client), "invoice_id": "INV_new"}
+    client.table(TABLE).upsert([appended], on_conflict="invoice_id").execute()
+
+    df = SupabaseIngestor(cache_config, client=client).load_data()
+
+    assert len(fetches) == 2
+    assert len(df) == len(first) + 1
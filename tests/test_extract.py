@@ -0,0 +1,54 @@
+# tests/test_extract.py
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.pipeline.extract import DataExtractor
+
+def _raw_table(n_rows: int = 2345) -> pd.DataFrame:
+    df = generate_transactions(n_rows, seed=7)
+    # Repeat a few keys so duplicates straddle keyset page boundaries
+    duplicates = df.iloc[[5, n_rows // 4, n_rows // 4 + 1, n_rows // 2, n_rows - 1]].copy()
+    duplicates["purchase_amount"] += 1
+    return pd.concat([df, duplicates], ignore_index=True)
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype({col: str for col in df.columns if col != "purchase_amount"})
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+@pytest.mark.parametrize("page_size", [7, 100, 1000, 5000])
+def test_keyset_extraction_matches_offset(config_path, page_size):
+    raw = _raw_table()
+    extractor = DataExtractor(config_path, client=FakeSupabaseClient({"customer_transactions": raw}))
+    extractor.page_size, extractor.max_workers = page_size, 3
+
+    offset = extractor.extract_raw_data(mode="offset")
+    keyset = extractor.extract_raw_data(mode="keyset")
+
+    assert len(keyset) == len(raw)
+    pd.testing.assert_frame_equal(_sorted(keyset), _sorted(offset))
+
+def test_keyset_chunks_arrive_in_key_order(config_path):
+    raw = _raw_table(500)
+    extractor = DataExtractor(config_path, client=FakeSupabaseClient({"customer_transactions": raw}))
+
+    chunks = list(extractor.iter_raw_chunks(page_size=50, max_workers=4))
+    keys = pd.concat(chunks)["invoice_id"].tolist()
+
+    assert keys == sorted(keys)
+    assert len(keys) == len(raw)
+
+def test_since_filter_applies_to_both_modes(config_path):
+    raw = _raw_table(800)
+    since = "2024-04-01"
+    extractor = DataExtractor(config_path, client=FakeSupabaseClient({"customer_transactions": raw}))
+    extractor.page_size = 64
+
+    offset = extractor.extract_raw_data(mode="offset", since=since)
+    keyset = extractor.extract_raw_data(mode="keyset", since=since)
+
+    expected = (raw["invoice_date"] >= since).sum()
+    assert len(offset) == len(keyset) == expected
+    pd.testing.assert_frame_equal(_sorted(keyset), _sorted(offset))
@@ -0,0 +1,49 @@
+# tests/test_feature_engineering.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering import FeatureEngineer
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        "customer_id": ["b", "a", None, "b", "a", "c"],
+        "invoice_date": ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-05", "2024-01-04", "2024-01-05"],
+        "purchase_amount": [10.0, 20.0, 1000.0, 30.0, 40.0, 5.0],
+        "product_category": ["books", "home", "books", "books", np.nan, "home"],
+    })
+
+def test_missing_customer_id_is_not_folded_into_a_customer(transactions):
+    features = FeatureEngineer().compute_customer_features(transactions).set_index("customer_id")
+
+    assert features.index.tolist() == ["a", "b", "c"]
+    assert features["monetary_total"].tolist() == [60.0, 40.0, 5.0]
+    assert features["frequency"].tolist() == [2, 2, 1]
+
+def test_missing_category_gets_its_own_share(transactions):
+    features = FeatureEngineer().compute_customer_features(transactions).set_index("customer_id")
+
+    assert features.loc["a", "share_home"] == pytest.approx(20 / 60)
+    assert features.loc["a", "share_books"] == 0.0
+    assert features.loc["b", "share_books"] == 1.0
+
+def test_rows_without_customer_get_missing_features(transactions):
+    df = FeatureEngineer().add_customer_features(transactions)
+
+    assert df["monetary_total"].tolist()[:2] == [40.0, 60.0]
+    assert np.isnan(df.loc[2, "monetary_total"])
+    assert pd.isna(df.loc[2, "first_purchase"])
+    assert df.loc[5, "first_purchase"] == pd.Timestamp("2024-01-05")
+
+def test_clv_ignores_rows_without_customer(transactions):
+    df = FeatureEngineer().add_clv_feature(transactions)
+
+    assert df["customer_lifetime_value"].tolist()[:2] == [40.0, 60.0]
+    assert np.isnan(df.loc[2, "customer_lifetime_value"])
+
+def test_features_keep_dtype_when_every_row_has_a_customer(transactions):
+    df = FeatureEngineer().add_customer_features(transactions.dropna(subset=["customer_id"]))
+
+    assert df["frequency"].dtype.kind == "i"
@@ -0,0 +1,74 @@
+# tests/test_feature_store.py
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import generate_transactions
+from src.feature_engineering import FeatureEngineer
+from src.feature_store import CustomerFeatureStore
+
+@pytest.fixture
+def transactions():
+    df = generate_transactions(3000, seed=11, dirty_fraction=0).sort_values("invoice_date", kind="stable")
+    # Integer invoice ids, as read from a numeric column, exercise the str round trip
+    df["invoice_id"] = np.arange(len(df))
+    return df.reset_index(drop=True)
+
+def _full_recompute(tmp_path, df) -> pd.DataFrame:
+    store = CustomerFeatureStore(str(tmp_path / "full"))
+    store.update(df)
+    return store.aggregates.sort_index()
+
+def test_incremental_updates_match_full_recompute(tmp_path, transactions):
+    path = str(tmp_path / "incremental")
+    # Cut inside a day, so the second batch repeats that day's first rows
+    cut = len(transactions) // 2
+    CustomerFeatureStore(path).update(transactions.iloc[:cut])
+
+    # Reloaded from disk, then fed the whole table again: only unseen rows count
+    reloaded = CustomerFeatureStore(path)
+    applied = reloaded.update(transactions)
+    assert applied == len(transactions) - cut
+    assert CustomerFeatureStore(path).update(transactions) == 0
+
+    pd.testing.assert_frame_equal(
+        CustomerFeatureStore(path).aggregates.sort_index(), _full_recompute(tmp_path, transactions), check_freq=False
+    )
+
+def test_store_agrees_with_customer_features(tmp_path, transactions):
+    store = CustomerFeatureStore(str(tmp_path / "store"))
+    store.update(transactions)
+
+    expected = FeatureEngineer().compute_customer_features(transactions).set_index("customer_id")
+    aggregates = FeatureEngineer(feature_store=store).lookup_customer_aggregates(expected.index)
+
+    np.testing.assert_array_equal(aggregates["count"].to_numpy(), expected["frequency"].to_numpy())
+    np.testing.assert_allclose(aggregates["total"].to_numpy(), expected["monetary_total"].to_numpy())
+    np.testing.assert_allclose(aggregates["monetary_std"].to_numpy(), expected["monetary_std"].to_numpy(), atol=1e-9)
+
+def test_late_rows_are_reported(tmp_path, transactions, caplog):
+    store = CustomerFeatureStore(str(tmp_path / "store"))
+    store.update(transactions)
+
+    late = transactions.iloc[:5].copy()
+    late["invoice_id"] = np.arange(len(transactions), len(transactions) + 5)
+    with caplog.at_level(logging.WARNING):
+        assert store.update(late) == 0
+
+    assert "Skipping 5 transactions dated before the feature store watermark" in caplog.text
+
+def test_lookup_accepts_non_string_ids(tmp_path):
+    df = pd.DataFrame({
+        "customer_id": [7, 7, 8],
+        "invoice_id": [1, 2, 3],
+        "invoice_date": ["2024-01-01", "2024-01-02", "2024-01-02"],
+        "purchase_amount": [10.0, 20.0, 5.0],
+    })
+    store = CustomerFeatureStore(str(tmp_path / "store"))
+    store.update(df)
+
+    assert store.get(7)["total"] == 30.0
+    assert CustomerFeatureStore(str(tmp_path / "store")).lookup([8, "7"])["total"].tolist() == [5.0, 30.0]
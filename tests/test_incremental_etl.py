@@ -0,0 +1,72 @@
+# tests/test_incremental_etl.py
+
+import pandas as pd
+import pytest
+
+import run_pipeline
+import src.pipeline.extract as extract
+import src.pipeline.load as load
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.pipeline.transform import DataTransformer
+from src.pipeline.watermark import WatermarkStore
+
+RAW_TABLE, CLEANED_TABLE = "customer_transactions", "transformed_customer_data"
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeSupabaseClient()
+    monkeypatch.setattr(extract, "get_client", lambda *args, **kwargs: client)
+    monkeypatch.setattr(load, "get_client", lambda *args, **kwargs: client)
+    return client
+
+def _set_raw(client, raw: pd.DataFrame):
+    client.tables.pop(RAW_TABLE, None)
+    client.table(RAW_TABLE).upsert(raw.to_dict(orient="records"), "invoice_id").execute()
+
+def _cleaned(client) -> pd.DataFrame:
+    return client.tables[CLEANED_TABLE].snapshot().sort_values("invoice_id").reset_index(drop=True)
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_incremental_runs_match_full_transform(client, config_path, tmp_path, streaming):
+    etl_config = {"watermark_path": str(tmp_path / "watermark.json")}
+    raw = generate_transactions(600, seed=3)
+    raw = raw[raw["invoice_date"] < "2024-05-01"]
+    _set_raw(client, raw)
+
+    run_pipeline.run_incremental_etl(etl_config, streaming)
+    assert WatermarkStore(etl_config["watermark_path"]).read() == {"invoice_date": raw["invoice_date"].max()}
+
+    # New days plus a late row for the boundary day; both must be picked up
+    later = generate_transactions(200, seed=4)
+    later["invoice_id"] = "LATE_" + later["invoice_id"]
+    later.loc[later.index[0], "invoice_date"] = raw["invoice_date"].max()
+    later.loc[later.index[1:], "invoice_date"] = "2024-06-15"
+    _set_raw(client, pd.concat([raw, later], ignore_index=True))
+
+    run_pipeline.run_incremental_etl(etl_config, streaming)
+
+    expected = DataTransformer(config_path).transform(pd.concat([raw, later], ignore_index=True))
+    cleaned = _cleaned(client)
+    assert sorted(cleaned["invoice_id"]) == sorted(expected["invoice_id"])
+    assert WatermarkStore(etl_config["watermark_path"]).read() == {"invoice_date": "2024-06-15"}
+
+def test_rerun_without_new_rows_is_idempotent(client, tmp_path):
+    etl_config = {"watermark_path": str(tmp_path / "watermark.json")}
+    _set_raw(client, generate_transactions(300, seed=5))
+
+    run_pipeline.run_incremental_etl(etl_config)
+    first = _cleaned(client)
+    run_pipeline.run_incremental_etl(etl_config)
+
+    pd.testing.assert_frame_equal(_cleaned(client), first)
+
+def test_watermark_seeded_from_cleaned_table(client, tmp_path):
+    etl_config = {"watermark_path": str(tmp_path / "watermark.json")}
+    raw = generate_transactions(300, seed=6)
+    _set_raw(client, raw)
+    run_pipeline.run_incremental_etl(etl_config)
+
+    # A fresh runner has no watermark file and falls back to the cleaned table
+    (tmp_path / "watermark.json").unlink()
+    assert load.DataLoader(run_pipeline.config_path).fetch_high_water_mark() == {"invoice_date": raw["invoice_date"].max()}
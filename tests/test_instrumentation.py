@@ -0,0 +1,59 @@
+# tests/test_instrumentation.py
+
+import json
+
+import pytest
+
+from src.utils import instrumentation
+from src.utils.instrumentation import RssSampler, instrumented, track_stage
+
+@pytest.fixture(autouse=True)
+def metrics_path(tmp_path, monkeypatch):
+    path = tmp_path / "stage_metrics.jsonl"
+    monkeypatch.setattr(instrumentation, "METRICS_PATH", str(path))
+    return path
+
+def test_nested_stages_are_recorded_by_path(metrics_path):
+    with track_stage("etl", mode="full") as etl:
+        with track_stage("extract") as stage:
+            stage.rows = 10
+        with track_stage("load", rows=8):
+            pass
+
+    assert [r["path"] for r in etl.records] == ["etl/extract", "etl/load", "etl"]
+    assert etl.records[0]["rows"] == 10 and etl.records[-1]["mode"] == "full"
+
+    lines = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert [r["path"] for r in lines] == ["etl/extract", "etl/load", "etl"]
+    assert all(r["wall_s"] >= 0 and r["peak_rss_mb"] >= 0 for r in lines)
+
+def test_failed_stage_is_recorded_and_reraised():
+    with pytest.raises(ValueError):
+        with track_stage("outer") as outer:
+            with track_stage("inner"):
+                raise ValueError("boom")
+
+    assert [(r["path"], r["status"]) for r in outer.records] == [("outer/inner", "error"), ("outer", "error")]
+
+def test_decorator_counts_rows():
+    @instrumented("build", rows=len)
+    def build():
+        return [1, 2, 3]
+
+    with track_stage("parent") as parent:
+        assert build() == [1, 2, 3]
+
+    assert parent.records[0]["path"] == "parent/build" and parent.records[0]["rows"] == 3
+
+def test_peak_rss_without_resource_module(monkeypatch):
+    monkeypatch.setattr(instrumentation, "resource", None)
+    assert instrumentation.peak_rss_mb() == 0.0
+
+def test_rss_sampler_sees_allocation_inside_block():
+    with RssSampler(interval_s=0.001) as sampler:
+        block = bytearray(64 * 1024 * 1024)
+        block[::4096] = b"x" * len(block[::4096])  # touch every page so it is resident
+        del block
+
+    assert not sampler.is_alive()
+    assert sampler.peak_mb - sampler.baseline_mb > 32
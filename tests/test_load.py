@@ -0,0 +1,151 @@
+# tests/test_load.py
+
+import random
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import run_pipeline
+import src.pipeline.extract as extract
+import src.pipeline.load as load
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.synthetic_data import generate_transactions
+from src.data_access import TableWriter
+from src.pipeline.load import DataLoader
+from src.pipeline.transform import DataTransformer
+from utils.exceptions import ProjectBaseError
+
+CLEANED_TABLE = "transformed_customer_data"
+
+@pytest.fixture
+def loaded(config_path):
+    """
+    Loader whose cleaned table already holds one full load.
+    """
+    # Stock table: no unique constraint on invoice_id
+    client = FakeSupabaseClient(unique_columns={CLEANED_TABLE: []})
+    loader = DataLoader(config_path, client=client)
+    cleaned = DataTransformer(config_path).transform(generate_transactions(300, seed=1))
+    loader.load_data(cleaned)
+    return loader, client, cleaned
+
+def _table(client) -> pd.DataFrame:
+    return client.tables[CLEANED_TABLE].snapshot()
+
+def test_empty_stream_leaves_table_unchanged(loaded):
+    loader, client, cleaned = loaded
+
+    with pytest.raises(ProjectBaseError):
+        loader.load_data(iter([]))
+    assert len(_table(client)) == len(cleaned)
+
+def test_stream_failing_before_first_chunk_leaves_table_unchanged(loaded):
+    loader, client, cleaned = loaded
+
+    def failing_extract():
+        raise ConnectionError("raw table unreachable")
+        yield
+
+    with pytest.raises(ProjectBaseError):
+        loader.load_data(failing_extract())
+    assert len(_table(client)) == len(cleaned)
+
+def test_stream_replaces_table(loaded, config_path):
+    loader, client, _ = loaded
+    replacement = DataTransformer(config_path).transform(generate_transactions(500, seed=2))
+
+    loader.load_data(replacement.iloc[i:i + 64] for i in range(0, len(replacement), 64))
+    assert sorted(_table(client)["invoice_id"]) == sorted(replacement["invoice_id"])
+
+def test_streaming_full_etl_with_empty_raw_table_keeps_cleaned_table(loaded, monkeypatch):
+    loader, client, cleaned = loaded
+    client.table("customer_transactions")  # exists but empty
+    monkeypatch.setattr(extract, "get_client", lambda *args, **kwargs: client)
+    monkeypatch.setattr(load, "get_client", lambda *args, **kwargs: client)
+
+    with pytest.raises(ProjectBaseError):
+        run_pipeline.run_full_etl(streaming=True)
+    assert len(_table(client)) == len(cleaned)
+
+def test_full_load_needs_no_unique_constraint(loaded, config_path):
+    loader, client, _ = loaded
+    replacement = DataTransformer(config_path).transform(generate_transactions(400, seed=3))
+
+    loader.load_data(replacement)
+    assert sorted(_table(client)["invoice_id"]) == sorted(replacement["invoice_id"])
+
+    # Upserts, as used by incremental ETL, do need it
+    with pytest.raises(ProjectBaseError):
+        loader.upsert_data(replacement)
+
+class FlakyClient(FakeSupabaseClient):
+    """
+    Fails writes with a connection error: the first `failures` attempts, then
+    each attempt with probability `failure_rate`. Failed writes are not applied.
+    """
+
+    def __init__(self, failures: int = 0, failure_rate: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.failures = failures
+        self.failure_rate = failure_rate
+        self.attempts = 0
+        self._rng = random.Random(seed)
+        self._flaky_lock = threading.Lock()
+
+    def table(self, name: str):
+        query = super().table(name)
+        execute = query.execute
+
+        def flaky_execute():
+            if query.action == "upsert":
+                with self._flaky_lock:
+                    self.attempts += 1
+                    fail = self.failures > 0 or self._rng.random() < self.failure_rate
+                    self.failures = max(self.failures - 1, 0)
+                    delay = self._rng.random() / 1000
+                time.sleep(delay)  # shuffle completion order across workers
+                if fail:
+                    raise ConnectionError("connection reset by peer")
+            return execute()
+
+        query.execute = flaky_execute
+        return query
+
+def _rows(n_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"invoice_id": [f"INV_{i}" for i in range(n_rows)], "purchase_amount": range(n_rows)})
+
+def test_batch_succeeds_after_transient_failures():
+    client = FlakyClient(failures=3)
+    writer = TableWriter(client, CLEANED_TABLE, batch_size=100, max_concurrency=1, max_retries=3, retry_backoff=0)
+
+    writer.write(_rows(250), upsert=False)
+
+    assert client.attempts == 3 + 3  # the first batch needed four attempts
+    assert sorted(_table(client)["invoice_id"]) == sorted(_rows(250)["invoice_id"])
+
+def test_batch_fails_once_retries_are_exhausted():
+    client = FlakyClient(failures=3)
+    writer = TableWriter(client, CLEANED_TABLE, batch_size=100, max_concurrency=1, max_retries=2, retry_backoff=0)
+
+    with pytest.raises(ConnectionError):
+        writer.write(_rows(100), upsert=False)
+    assert client.attempts == 3
+
+@pytest.mark.parametrize("upsert", [False, True])
+def test_concurrent_batches_are_neither_lost_nor_duplicated(upsert):
+    client = FlakyClient(failure_rate=0.3, seed=7)
+    writer = TableWriter(client, CLEANED_TABLE, batch_size=37, max_concurrency=4, max_retries=12, retry_backoff=0)
+    rows = _rows(5000)
+
+    # Several frames, so batches straddle frame boundaries as in a stream
+    frames = [rows.iloc[i:i + 900] for i in range(0, len(rows), 900)]
+    writer.write(iter(frames), upsert=upsert)
+
+    written = Counter(_table(client)["invoice_id"])
+    assert set(written) == set(rows["invoice_id"])
+    assert max(written.values()) == 1
+    n_batches = sum(-(-len(frame) // 37) for frame in frames)
+    assert client.attempts > n_batches  # some batches were retried
@@ -0,0 +1,91 @@
+# tests/test_model_artifact.py
+
+import json
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmarks.synthetic_data import generate_transactions
+from src.model_artifact import ArrayForestModel, save_model_arrays
+from src.pipeline.transform import normalize_categorical
+from src.preprocessor import PreprocessorBuilder
+from src.utils.exceptions import ProjectBaseError
+from src.utils.schema import CATEGORICAL_COLUMNS
+
+FEATURES = ["purchase_amount"] + CATEGORICAL_COLUMNS
+
+def _normalized(df):
+    df = df.dropna(subset=["purchase_amount"]).reset_index(drop=True)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = normalize_categorical(df[col])
+    return df
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    train = _normalized(generate_transactions(2000, seed=3))
+    preprocessor_path = str(tmp_path_factory.mktemp("artifacts") / "preprocessor.pkl")
+    PreprocessorBuilder(preprocessor_path).build_and_save(train)
+    preprocessor = joblib.load(preprocessor_path)
+
+    rng = np.random.default_rng(0)
+    target = train["purchase_amount"] * (1 + (train["region"] == "north")) + rng.normal(0, 5, len(train))
+    model = RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0)
+    model.fit(preprocessor.transform(train[FEATURES]), target)
+    return model, preprocessor
+
+@pytest.fixture
+def model_dir(fitted, tmp_path):
+    path = str(tmp_path / "model_arrays")
+    save_model_arrays(*fitted, path)
+    return path
+
+def _edit_manifest(model_dir, **changes):
+    path = os.path.join(model_dir, "manifest.json")
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    manifest.update(changes)
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+def test_saved_arrays_predict_like_the_pipeline(fitted, model_dir):
+    model, preprocessor = fitted
+    loaded = ArrayForestModel.load(model_dir)
+
+    scoring = _normalized(generate_transactions(1000, seed=4))
+    expected = model.predict(preprocessor.transform(scoring[FEATURES]))
+    np.testing.assert_allclose(loaded.predict_frame(scoring), expected, atol=1e-6)
+    np.testing.assert_allclose(loaded.predict(preprocessor.transform(scoring[FEATURES])), expected, atol=1e-6)
+    assert loaded.verify_parity(model, preprocessor, scoring) <= 1e-6
+    assert not os.path.exists(f"{model_dir}.tmp")
+
+def test_resave_replaces_previous_arrays(fitted, model_dir):
+    save_model_arrays(*fitted, model_dir)
+
+    assert sorted(os.listdir(os.path.dirname(model_dir))) == ["model_arrays"]
+    assert ArrayForestModel.load(model_dir).manifest["n_trees"] == 8
+
+def test_unknown_format_version_is_rejected(model_dir):
+    _edit_manifest(model_dir, format_version=2)
+
+    with pytest.raises(ProjectBaseError, match="format 2"):
+        ArrayForestModel.load(model_dir)
+
+def test_array_shape_mismatch_is_rejected(model_dir):
+    # A node array from another model, under the manifest of this one
+    threshold = np.load(os.path.join(model_dir, "threshold.npy"))
+    np.save(os.path.join(model_dir, "threshold.npy"), threshold[:-1])
+
+    with pytest.raises(ProjectBaseError, match="threshold"):
+        ArrayForestModel.load(model_dir)
+
+def test_parity_check_fails_above_tolerance(fitted, model_dir):
+    model, preprocessor = fitted
+    value = np.load(os.path.join(model_dir, "value.npy"))
+    np.save(os.path.join(model_dir, "value.npy"), value + 1)
+
+    scoring = _normalized(generate_transactions(100, seed=4))
+    with pytest.raises(ProjectBaseError, match="deviate"):
+        ArrayForestModel.load(model_dir).verify_parity(model, preprocessor, scoring)
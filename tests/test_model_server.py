@@ -0,0 +1,69 @@
+# tests/test_model_server.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import yaml
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from src.serving.model_server import create_app
+
+class PassthroughPreprocessor:
+    def transform(self, input_df):
+        return input_df
+
+class CategoryModel:
+    """
+    Knows only the lower-cased categories produced by the transform step, like
+    the fitted OneHotEncoder, and records the size of every batch it scores.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, X):
+        self.batch_sizes.append(len(X))
+        known = (X["product_category"] == "electronics").to_numpy()
+        return np.where(known, 1000.0, 0.0) + X["purchase_amount"].to_numpy()
+
+def _payload(product_category="electronics", purchase_amount=50.0) -> dict:
+    return {
+        "purchase_amount": purchase_amount,
+        "product_category": product_category,
+        "payment_method": "UPI",
+        "customer_segment": "Loyal",
+        "region": "North",
+    }
+
+@pytest.fixture
+def serving_config(tmp_path):
+    path = tmp_path / "config.yaml"
+    # A long wait so concurrent test requests land in the same batch
+    path.write_text(yaml.safe_dump({"serving": {"max_batch_size": 8, "max_wait_ms": 200}}))
+    return str(path)
+
+def test_capitalized_category_scores_like_training_spelling(serving_config):
+    model = CategoryModel()
+    with TestClient(create_app(model, PassthroughPreprocessor(), serving_config)) as client:
+        canonical = client.post("/predict", json=_payload("electronics")).json()["predicted_clv"]
+        capitalized = client.post("/predict", json=_payload(" Electronics ")).json()["predicted_clv"]
+
+    assert canonical == capitalized == 1050.0
+
+def test_concurrent_requests_are_micro_batched(serving_config):
+    model = CategoryModel()
+    amounts = [float(i) for i in range(16)]
+    with TestClient(create_app(model, PassthroughPreprocessor(), serving_config)) as client:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            responses = list(pool.map(lambda a: client.post("/predict", json=_payload("ELECTRONICS", a)), amounts))
+        metrics = client.get("/metrics").json()
+
+    assert [r.status_code for r in responses] == [200] * 16
+    assert [r.json()["predicted_clv"] for r in responses] == [1000.0 + a for a in amounts]
+    assert max(model.batch_sizes) > 1
+    assert max(model.batch_sizes) <= 8
+    assert metrics["requests"] == 16
+    assert metrics["batches"] == len(model.batch_sizes) < 16
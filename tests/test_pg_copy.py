@@ -0,0 +1,222 @@
+# tests/test_pg_copy.py
+#
+# COPY backend tests. The SQL and CSV the writer emits are checked against a
+# recording cursor; the round trips through a real Postgres run only where
+# SUPABASE_DB_URL points at a database and psycopg2 is installed, each on its
+# own scratch table that is dropped afterwards.
+
+import csv
+import io
+import os
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import generate_transactions
+from src.pg_copy import CopyReader, CopyWriter, get_pg_connection, quote_ident
+from src.pipeline.transform import DataTransformer
+
+requires_postgres = pytest.mark.skipif(not os.getenv("SUPABASE_DB_URL"), reason="SUPABASE_DB_URL is not set")
+
+# Same columns as the cleaned table, which has no unique constraint by default
+COLUMNS_DDL = """
+    invoice_id text,
+    customer_id text,
+    invoice_date timestamp,
+    purchase_amount double precision,
+    product_category text,
+    payment_method text,
+    customer_segment text,
+    region text
+"""
+
+class RecordingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql):
+        if self.connection.fail_on and self.connection.fail_on in sql:
+            raise RuntimeError(f"statement failed: {sql}")
+        self.connection.statements.append(sql)
+
+    def copy_expert(self, sql, file):
+        self.connection.statements.append(sql)
+        if "FROM STDIN" in sql:
+            self.connection.copied.append(file.read())
+        else:
+            file.write(self.connection.copy_out.encode())
+
+class RecordingConnection:
+    """
+    Stand-in for a psycopg2 connection that records statements and COPY payloads.
+    """
+
+    def __init__(self, copy_out: str = "", fail_on: str = None):
+        self.copy_out = copy_out
+        self.fail_on = fail_on
+        self.statements = []
+        self.copied = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    @contextmanager
+    def cursor(self):
+        yield RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+@pytest.fixture
+def scratch_table(request):
+    """
+    :param request.param: Add a unique constraint on invoice_id, as
+                          sql/transformed_customer_data_invoice_id_unique.sql does
+    """
+    pytest.importorskip("psycopg2")
+    connection = get_pg_connection({"postgres_dsn_env": "SUPABASE_DB_URL"})
+    table = f"clv_copy_test_{uuid.uuid4().hex[:8]}"
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {quote_ident(table)} ({COLUMNS_DDL})")
+        if getattr(request, "param", False):
+            cursor.execute(f"ALTER TABLE {quote_ident(table)} ADD CONSTRAINT {quote_ident(table + '_key')} UNIQUE (invoice_id)")
+    connection.commit()
+    try:
+        yield connection, table
+    finally:
+        connection.rollback()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {quote_ident(table)}")
+        connection.commit()
+        connection.close()
+
+@pytest.fixture
+def cleaned(config_path):
+    return DataTransformer(config_path).transform(generate_transactions(2500, seed=21))
+
+def _comparable(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values("invoice_id").reset_index(drop=True)
+    out = df.astype(str)
+    out["invoice_date"] = pd.to_datetime(df["invoice_date"])
+    out["purchase_amount"] = df["purchase_amount"].astype(float)
+    return out
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "invoice_id": ["INV_1", "INV_2", "INV_3"],
+        "customer_id": ['CUST "A"', "CUST, B", "CUST\nC"],
+        "purchase_amount": [1.5, np.nan, 3.0],
+    })
+
+def test_replace_inserts_without_on_conflict():
+    connection = RecordingConnection()
+    CopyWriter(connection, "transformed_customer_data").write(_frame(), replace=True)
+
+    target, stage = '"transformed_customer_data"', '"transformed_customer_data_stage"'
+    columns = '"invoice_id", "customer_id", "purchase_amount"'
+    assert connection.statements == [
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP",
+        f"DELETE FROM {target}",
+        f"COPY {stage} ({columns}) FROM STDIN WITH (FORMAT csv)",
+        f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {stage}",
+        f"TRUNCATE {stage}",
+    ]
+    assert (connection.commits, connection.rollbacks) == (1, 0)
+
+def test_upsert_merges_on_the_key():
+    connection = RecordingConnection()
+    CopyWriter(connection, "transformed_customer_data").write(iter([_frame(), _frame().iloc[:0], _frame()]))
+
+    inserts = [sql for sql in connection.statements if sql.startswith("INSERT")]
+    assert len(inserts) == 2  # the empty frame is skipped
+    assert not any(sql.startswith("DELETE") for sql in connection.statements)
+    assert inserts[0].endswith(
+        'ON CONFLICT ("invoice_id") DO UPDATE SET '
+        '"customer_id" = EXCLUDED."customer_id", "purchase_amount" = EXCLUDED."purchase_amount"'
+    )
+
+def test_copy_payload_is_headerless_csv_with_empty_nulls():
+    connection = RecordingConnection()
+    CopyWriter(connection, "t").write(_frame(), replace=True)
+
+    payload = connection.copied[0]
+    assert list(csv.reader(io.StringIO(payload))) == [
+        ["INV_1", 'CUST "A"', "1.5"],
+        ["INV_2", "CUST, B", ""],  # unquoted empty field: NULL in COPY csv
+        ["INV_3", "CUST\nC", "3.0"],
+    ]
+    assert '"CUST ""A"""' in payload
+
+def test_failed_statement_rolls_back():
+    connection = RecordingConnection(fail_on="INSERT")
+
+    with pytest.raises(RuntimeError):
+        CopyWriter(connection, "t").write(_frame(), replace=True)
+    assert (connection.commits, connection.rollbacks) == (0, 1)
+
+def test_reader_builds_filtered_query_and_chunks():
+    copy_out = "invoice_id,purchase_amount\n" + "".join(f"INV_{i},{i}.5\n" for i in range(5))
+    connection = RecordingConnection(copy_out=copy_out)
+
+    chunks = list(CopyReader(connection, "t").iter_chunks(chunk_size=2, since="2024-03-01"))
+
+    assert connection.statements == [
+        "COPY (SELECT * FROM \"t\" WHERE invoice_date >= '2024-03-01T00:00:00' ORDER BY \"invoice_id\") "
+        "TO STDOUT WITH (FORMAT csv, HEADER true)"
+    ]
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert pd.concat(chunks)["purchase_amount"].tolist() == [0.5, 1.5, 2.5, 3.5, 4.5]
+
+def test_reader_handles_empty_output():
+    assert list(CopyReader(RecordingConnection(), "t").iter_chunks()) == []
+
+@requires_postgres
+def test_copy_write_then_read_round_trips(scratch_table, cleaned):
+    connection, table = scratch_table
+    CopyWriter(connection, table).write(cleaned, replace=True)
+
+    reader = CopyReader(connection, table)
+    chunks = list(reader.iter_chunks(chunk_size=1000))
+
+    assert [len(c) for c in chunks] == [1000, 1000, len(cleaned) - 2000]
+    read_back = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(_comparable(read_back)[list(cleaned.columns)], _comparable(cleaned))
+
+@requires_postgres
+def test_copy_replace_twice_keeps_one_copy(scratch_table, cleaned):
+    connection, table = scratch_table
+    writer = CopyWriter(connection, table)
+    writer.write(cleaned, replace=True)
+    writer.write(iter([cleaned.iloc[:1000], cleaned.iloc[1000:]]), replace=True)
+
+    assert len(CopyReader(connection, table).read_frame()) == len(cleaned)
+
+@requires_postgres
+@pytest.mark.parametrize("scratch_table", [True], indirect=True)
+def test_copy_write_upserts_with_unique_constraint(scratch_table, cleaned):
+    connection, table = scratch_table
+    writer = CopyWriter(connection, table)
+    writer.write(cleaned, replace=True)
+
+    changed = cleaned.iloc[:10].copy()
+    changed["purchase_amount"] = changed["purchase_amount"] + 1
+    writer.write(iter([changed]))
+    read_back = CopyReader(connection, table).read_frame().set_index("invoice_id")
+    assert len(read_back) == len(cleaned)
+    assert read_back.loc[changed["invoice_id"], "purchase_amount"].tolist() == changed["purchase_amount"].tolist()
+
+@requires_postgres
+def test_copy_read_since_watermark(scratch_table, cleaned):
+    connection, table = scratch_table
+    CopyWriter(connection, table).write(cleaned, replace=True)
+
+    since = sorted(cleaned["invoice_date"])[len(cleaned) // 2]
+    read_back = CopyReader(connection, table).read_frame(since=since)
+
+    expected = cleaned[pd.to_datetime(cleaned["invoice_date"]) >= pd.Timestamp(since)]
+    assert sorted(read_back["invoice_id"]) == sorted(expected["invoice_id"])
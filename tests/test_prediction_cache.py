@@ -0,0 +1,123 @@
+# tests/test_prediction_cache.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+import src.model_predict as model_predict
+from src.artifact_registry import atomic_dump, write_manifest
+from src.model_predict import MANIFEST_PATH, MODEL_PATH, PREPROCESSOR_PATH, predict_clv, reset_model_state
+from src.prediction_cache import PredictionCache
+
+def _row(product_category="Electronics", purchase_amount=120.0) -> dict:
+    return {
+        "purchase_amount": purchase_amount,
+        "product_category": product_category,
+        "payment_method": "UPI",
+        "customer_segment": "Loyal",
+        "region": "North",
+    }
+
+def _case_sensitive_model(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Stand-in for a fitted pipeline whose encoder only knows lower-cased categories.
+    """
+    known = frame["product_category"] == "electronics"
+    return np.where(known, 500.0, 0.0) + frame["purchase_amount"].to_numpy()
+
+def test_cold_miss_caches_prediction_of_normalized_row():
+    cache = PredictionCache()
+    cold = cache.predict(pd.DataFrame([_row(" Electronics ")]), _case_sensitive_model)
+
+    fresh = PredictionCache()
+    canonical = fresh.predict(pd.DataFrame([_row("electronics")]), _case_sensitive_model)
+
+    assert cold[0] == canonical[0] == 620.0
+    warm = cache.predict(pd.DataFrame([_row("electronics")]), _case_sensitive_model)
+    assert warm[0] == 620.0
+    assert cache.stats()["hits"] == 1
+
+def test_bucketed_amount_is_what_gets_predicted():
+    cache = PredictionCache(amount_bucket=10)
+    first = cache.predict(pd.DataFrame([_row(purchase_amount=121.0)]), _case_sensitive_model)
+    second = cache.predict(pd.DataFrame([_row(purchase_amount=118.0)]), _case_sensitive_model)
+
+    assert first[0] == second[0] == 620.0
+    assert cache.stats()["hits"] == 1
+
+def test_only_missing_rows_reach_the_model():
+    cache = PredictionCache()
+    cache.predict(pd.DataFrame([_row("Books")]), _case_sensitive_model)
+
+    seen = []
+    def model(frame):
+        seen.append(len(frame))
+        return _case_sensitive_model(frame)
+
+    batch = pd.DataFrame([_row("books"), _row("Electronics"), _row("BOOKS ")])
+    predictions = cache.predict(batch, model)
+
+    assert seen == [1]
+    np.testing.assert_array_equal(predictions, [120.0, 620.0, 120.0])
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+class PassthroughPreprocessor:
+    def transform(self, input_df):
+        return input_df
+
+@pytest.fixture
+def artifacts_dir(tmp_path, monkeypatch):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"prediction_cache": {"enabled": True}}))
+    monkeypatch.setattr(model_predict, "CONFIG_PATH", str(config_path))
+    monkeypatch.chdir(tmp_path)
+    reset_model_state()
+    yield tmp_path
+    reset_model_state()
+
+def _dump_pair(value):
+    atomic_dump(ConstantModel(value), MODEL_PATH)
+    atomic_dump(PassthroughPreprocessor(), PREPROCESSOR_PATH)
+
+def test_pickles_rewritten_before_manifest_leave_nothing_stale(artifacts_dir):
+    _dump_pair(100.0)
+    write_manifest(MANIFEST_PATH, {"model": MODEL_PATH, "preprocessor": PREPROCESSOR_PATH})
+    row = pd.DataFrame([_row()])
+    assert predict_clv(row)[0] == 100.0
+
+    # Mid-save: new pickles, old manifest, so the previous pair is still served
+    _dump_pair(200.0)
+    assert predict_clv(row)[0] == 100.0
+
+    write_manifest(MANIFEST_PATH, {"model": MODEL_PATH, "preprocessor": PREPROCESSOR_PATH})
+    assert predict_clv(row)[0] == 200.0
+
+def test_prediction_finishing_after_artifact_change_is_not_cached(tmp_path):
+    artifact = tmp_path / "manifest.json"
+    artifact.write_text("v1")
+    cache = PredictionCache(artifact_paths=[str(artifact)])
+
+    def model_replaced_mid_request(frame):
+        artifact.write_text("v2")
+        return _case_sensitive_model(frame)
+
+    cache.predict(pd.DataFrame([_row()]), model_replaced_mid_request)
+
+    assert cache.stats()["size"] == 0
+
+def test_missing_artifact_is_tracked_until_it_appears(tmp_path):
+    artifact = tmp_path / "manifest.json"
+    cache = PredictionCache(artifact_paths=[str(artifact)])
+    cache.predict(pd.DataFrame([_row()]), _case_sensitive_model)
+    assert cache.stats()["size"] == 1
+
+    artifact.write_text("v1")
+    cache.get_many([])
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,73 @@
+# tests/test_retraining.py
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from src.retraining import min_new_rows, needs_full_refit, passes_update_gate, stale_label_share
+
+RETRAIN_CONFIG = {
+    "trees_per_update": 5,
+    "min_new_rows": 1000,
+    "min_new_fraction": 0.1,
+    "max_stale_share": 0.05,
+    "max_total_trees": 100,
+    "max_psi": 0.2,
+    "max_rmse_increase": 0.25,
+}
+
+def _history(customers: list) -> pd.DataFrame:
+    return pd.DataFrame({"customer_id": customers, "purchase_amount": np.arange(len(customers), dtype=float)})
+
+def _fitted(n_rows: int = 200):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (n_rows, 1))
+    y = 3 * X[:, 0]
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    snapshot = {
+        "n_rows": n_rows,
+        "baseline_rmse": 5.0,
+        "amount_bin_edges": np.quantile(X[:, 0], np.linspace(0, 1, 11)).tolist(),
+        "amount_bin_shares": [0.1] * 10,
+    }
+    return model, snapshot, X, y
+
+def test_min_new_rows_scales_with_training_set():
+    assert min_new_rows({"n_rows": 5_000}, RETRAIN_CONFIG) == 1000
+    assert min_new_rows({"n_rows": 200_000}, RETRAIN_CONFIG) == 20_000
+
+def test_stale_label_share_counts_old_rows_of_returning_customers():
+    df = _history(["a", "a", "b", "c", "a", "d"])
+    new_df = df.iloc[4:]  # "a" came back, "d" is new
+
+    assert stale_label_share(df, new_df) == 0.5
+
+def test_returning_customers_force_full_refit():
+    model, snapshot, X, y = _fitted()
+    df = _history(["a"] * 50 + ["b"] * 50)
+    new_df = df.iloc[-10:]
+
+    refit, reason = needs_full_refit(model, snapshot, df, new_df, X[:10], y[:10], RETRAIN_CONFIG)
+
+    assert refit
+    assert "stale" in reason
+
+def test_new_customers_only_can_be_absorbed():
+    model, snapshot, X, y = _fitted(n_rows=1000)
+    df = _history([f"old_{i}" for i in range(800)] + [f"new_{i}" for i in range(200)])
+    df["purchase_amount"] = X[:, 0]
+    new_df = df.iloc[-200:]
+
+    refit, reason = needs_full_refit(model, snapshot, df, new_df, X[-200:], y[-200:], RETRAIN_CONFIG)
+
+    assert not refit, reason
+
+def test_update_gate_rejects_degraded_model():
+    model, snapshot, X, y = _fitted()
+
+    passed, _ = passes_update_gate(model, X, y, snapshot, RETRAIN_CONFIG)
+    assert passed
+
+    passed, rmse = passes_update_gate(model, X, y + 50, snapshot, RETRAIN_CONFIG)
+    assert not passed
+    assert rmse > snapshot["baseline_rmse"]
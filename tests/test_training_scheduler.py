@@ -0,0 +1,52 @@
+# tests/test_training_scheduler.py
+
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import cross_val_score
+
+from src.training_scheduler import available_cores, cross_validate_candidates, plan_parallelism
+
+# Fits of very different length, so completions arrive out of submission order
+CANDIDATES = [
+    {"n_estimators": 40, "max_depth": None},
+    {"n_estimators": 5, "max_depth": 3},
+    {"n_estimators": 20, "max_depth": 6},
+    {"n_estimators": 5, "max_depth": None},
+]
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (300, 4)).astype(np.float32)
+    y = 10 * X[:, 0] + np.sin(6 * X[:, 1]) + rng.normal(0, 0.1, 300)
+    return X, y
+
+def test_plan_parallelism_never_oversubscribes():
+    cores = available_cores(-1)
+    for n_tasks in (1, 3, 100):
+        outer, inner = plan_parallelism(n_tasks, -1)
+        assert outer <= n_tasks
+        assert outer * inner <= cores
+
+def test_scores_match_cross_val_score(data):
+    X, y = data
+    results = cross_validate_candidates(X, y, CANDIDATES, cv=3, n_jobs=2)
+
+    assert [r["candidate"] for r in results] == list(range(len(CANDIDATES)))
+    for result, params in zip(results, CANDIDATES):
+        expected = cross_val_score(
+            RandomForestRegressor(random_state=42, **params), X, y, cv=3, scoring="neg_mean_squared_error"
+        ).mean()
+        assert result["params"] == params
+        assert result["mean_test_score"] == pytest.approx(expected)
+        assert len(result["fold_fit_time_s"]) == 3
+
+def test_passed_deadline_stops_submitting_after_first_complete_candidate(data):
+    X, y = data
+    results = cross_validate_candidates(X, y, CANDIDATES, cv=3, n_jobs=2, deadline=time.perf_counter() - 1)
+
+    assert 1 <= len(results) < len(CANDIDATES)
+    assert results[0]["candidate"] == 0